@@ -0,0 +1,51 @@
+"""Benchmark for the cost of crash-safe saving (temp file + fsync + backups) compared to a plain write, for growing file sizes"""
+
+import sys
+import os
+import tempfile
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todo_app.core import storage
+
+
+# --- SETTINGS ---
+FILE_SIZES_MB = [0.1, 1, 5, 20]
+REPEATS = 10
+
+
+# The old way of saving: open the file in "write" mode (which empties it right away) and write into it
+def plain_write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+# Write the text a few times and return the average time per write (in milliseconds)
+def time_writes(path, text, write_function):
+    start = time.perf_counter()
+    for i in range(REPEATS):
+        write_function(path, text)
+
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+def main():
+    # Write to a temporary folder so the real data file isn't touched
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "data.json")
+
+    print(f"{'size (MB)':>10} {'plain (ms)':>12} {'atomic (ms)':>12} {'atomic + backups (ms)':>22}")
+
+    for size_mb in FILE_SIZES_MB:
+        # Some json-like text of (roughly) the wanted size
+        line = '{"text": "Something that needs to be done", "is_checked": false},\n'
+        text = line * int(size_mb * 1024 * 1024 / len(line))
+
+        plain_ms = time_writes(path, text, plain_write)
+        atomic_ms = time_writes(path, text, storage.atomic_write)
+        backup_ms = time_writes(path, text, lambda p, t: storage.atomic_write(p, t, storage.BACKUP_COUNT))
+
+        print(f"{size_mb:>10} {plain_ms:>12.2f} {atomic_ms:>12.2f} {backup_ms:>22.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark comparing the json and the compact binary file format: file size, load time and save time"""
+
+import sys
+import os
+import json
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todo_app.core import binary_format
+import generate_data
+
+
+# --- SETTINGS ---
+PROJECT_COUNTS = [10, 100, 1000]
+CATEGORIES_PER_PROJECT = 5
+TODOS_PER_CATEGORY = 50
+
+
+# Time a function and return (result, milliseconds)
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    print(f"{'projects':>10} {'format':>8} {'size (KB)':>11} {'save (ms)':>11} {'load (ms)':>11}")
+
+    for project_count in PROJECT_COUNTS:
+        projects_data = generate_data.make_projects_data(project_count, CATEGORIES_PER_PROJECT, TODOS_PER_CATEGORY)
+
+        # The current json format (with indent=4, like before the storage backends)
+        json_text, json_save_ms = timed(lambda: json.dumps(projects_data, indent=4))
+        json_loaded, json_load_ms = timed(lambda: json.loads(json_text))
+
+        # Json without the indentation (what the app writes since saves re-use cached json text)
+        compact_text, compact_save_ms = timed(lambda: json.dumps(projects_data))
+        compact_loaded, compact_load_ms = timed(lambda: json.loads(compact_text))
+
+        # The binary format
+        binary_content, binary_save_ms = timed(lambda: binary_format.encode(projects_data))
+        binary_loaded, binary_load_ms = timed(lambda: binary_format.decode(binary_content))
+
+        # Both formats have to give back exactly the same data
+        assert json_loaded == projects_data
+        assert compact_loaded == projects_data
+        assert binary_loaded == projects_data
+
+        print(f"{project_count:>10} {'json':>8} {len(json_text.encode()) / 1024:>11.1f} {json_save_ms:>11.2f} {json_load_ms:>11.2f}")
+        print(f"{project_count:>10} {'compact':>8} {len(compact_text.encode()) / 1024:>11.1f} {compact_save_ms:>11.2f} {compact_load_ms:>11.2f}")
+        print(f"{project_count:>10} {'binary':>8} {len(binary_content) / 1024:>11.1f} {binary_save_ms:>11.2f} {binary_load_ms:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
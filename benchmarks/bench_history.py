@@ -0,0 +1,62 @@
+"""Benchmark for how much memory an undo/redo step takes, for small and big made up datasets (it should stay the same no matter how big the data is)"""
+
+import sys
+import os
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todo_app.core import data
+from todo_app.core.history import History
+import generate_data
+
+
+# --- SETTINGS ---
+TODO_COUNTS = [1000, 100000, 1000000]
+CATEGORIES_PER_PROJECT = 10
+TODOS_PER_CATEGORY = 100
+STEPS = 100
+
+
+# Memory (in bytes) the history uses per step, for STEPS steps made by "make_step"
+def bytes_per_step(projects, make_step):
+    history = History(projects, size=STEPS)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    for i in range(STEPS):
+        make_step(history, i)
+
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    # The changes recorded for the storage aren't part of the history
+    data.take_changes()
+
+    return used / STEPS
+
+
+def check_step(history, i):
+    category = history.projects[0].categories[0]
+    history.set_checked(category, category.todo_items[i % TODOS_PER_CATEGORY], True)
+
+
+def add_step(history, i):
+    category = history.projects[0].categories[1]
+    history.add_todo(category, data.Todo(text=f"New to-do {i}"))
+
+
+def main():
+    print(f"{'to-dos':>9} {'check (bytes/step)':>19} {'add (bytes/step)':>17}")
+
+    for todo_count in TODO_COUNTS:
+        project_count = max(1, todo_count // (CATEGORIES_PER_PROJECT * TODOS_PER_CATEGORY))
+        projects = generate_data.make_projects(project_count, CATEGORIES_PER_PROJECT, TODOS_PER_CATEGORY)
+
+        check_bytes = bytes_per_step(projects, check_step)
+        add_bytes = bytes_per_step(projects, add_step)
+
+        print(f"{todo_count:>9} {check_bytes:>19.0f} {add_bytes:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
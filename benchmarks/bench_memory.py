@@ -0,0 +1,82 @@
+"""Benchmark for how much memory the loaded projects take (bytes per to-do item) for a made up dataset of 1 million to-do items,
+with one object per to-do item compared to the column based TodoArray, plus how long counting done items and saving take"""
+
+import sys
+import os
+import gc
+import time
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todo_app.core import data
+import generate_data
+
+
+# --- SETTINGS ---
+PROJECT_COUNT = 1000
+CATEGORIES_PER_PROJECT = 10
+TODOS_PER_CATEGORY = 100 # 1000 * 10 * 100 = 1 million to-do items
+
+
+# Measure how much memory creating the project objects takes (not counting the dictionaries they are made from)
+def measure_objects(projects_data):
+    gc.collect()
+    tracemalloc.start()
+
+    projects = [data.Project(**project_data) for project_data in projects_data]
+
+    gc.collect()
+    used, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return projects, used
+
+
+# Time how long counting the done items in every category from scratch takes (in milliseconds).
+# (The app itself keeps a running count, see Category.done_count, this is what creating the objects costs for it)
+def time_count_checked(projects):
+    start = time.perf_counter()
+
+    for project in projects:
+        for category in project.categories:
+            if isinstance(category.todo_items, data.TodoArray):
+                category.todo_items.count_checked()
+            else:
+                sum(1 for todo in category.todo_items if todo.is_checked)
+
+    return (time.perf_counter() - start) * 1000
+
+
+# Time how long turning every project into json text takes (in milliseconds)
+def time_to_json(projects):
+    start = time.perf_counter()
+
+    for project in projects:
+        project.to_json()
+
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    todo_count = PROJECT_COUNT * CATEGORIES_PER_PROJECT * TODOS_PER_CATEGORY
+
+    print(f"Creating {todo_count} to-do items...")
+    # As dictionaries, the same way they come out of the data file (every category has its own copy of the theme)
+    projects_data = generate_data.make_projects_data(PROJECT_COUNT, CATEGORIES_PER_PROJECT, TODOS_PER_CATEGORY)
+
+    print(f"{'storage':>8} {'total (MB)':>11} {'bytes per to-do':>16} {'count done (ms)':>16} {'to json (ms)':>13}")
+
+    # "objects" never switches to a TodoArray, "array" always does
+    for name, threshold in (("objects", sys.maxsize), ("array", 1)):
+        data.ARRAY_THRESHOLD = threshold
+
+        projects, used = measure_objects(projects_data)
+        count_ms = time_count_checked(projects)
+        json_ms = time_to_json(projects)
+
+        print(f"{name:>8} {used / 1024 / 1024:>11.1f} {used / todo_count:>16.1f} {count_ms:>16.1f} {json_ms:>13.1f}")
+
+        del projects
+
+
+if __name__ == "__main__":
+    main()
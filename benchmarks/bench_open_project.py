@@ -0,0 +1,61 @@
+"""Benchmark for how long opening a project takes, with every category body created up front compared to creating them when first shown (needs a screen, as it creates real widgets)"""
+
+import sys
+import os
+import time
+import customtkinter as ctk
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todo_app.core import data
+from todo_app.views import category_view
+from todo_app.views.category_view import TabsView
+import generate_data
+
+
+# --- SETTINGS ---
+CATEGORY_COUNTS = [5, 20, 50]
+TODOS_PER_CATEGORY = 20
+REPEATS = 5
+
+
+# Open the project a few times and return the average time (in milliseconds), including drawing it
+def time_open(window, tabs_view, project):
+    total = 0
+
+    for i in range(REPEATS):
+        start = time.perf_counter()
+        tabs_view.load_project(project)
+        window.update_idletasks()
+        total += time.perf_counter() - start
+
+        # Open an empty project in between, so the next open starts from scratch
+        tabs_view.load_project(data.Project(name="Empty"))
+        window.update_idletasks()
+
+    return total / REPEATS * 1000
+
+
+def main():
+    window = ctk.CTk()
+    window.geometry("750x750")
+
+    tabs_view = TabsView(master=window)
+    tabs_view.grid(row=0, column=0, sticky="nsew")
+
+    print(f"{'categories':>11} {'all bodies (ms)':>16} {'lazy bodies (ms)':>17}")
+
+    for category_count in CATEGORY_COUNTS:
+        project = generate_data.make_projects(1, category_count, TODOS_PER_CATEGORY)[0]
+
+        category_view.LAZY_BODIES = False
+        eager_ms = time_open(window, tabs_view, project)
+
+        category_view.LAZY_BODIES = True
+        lazy_ms = time_open(window, tabs_view, project)
+
+        print(f"{category_count:>11} {eager_ms:>16.2f} {lazy_ms:>17.2f}")
+
+    window.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark counting how many widgets are created/destroyed/placed per UI update: destroy-and-rebuild compared to the Reconciler"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todo_app.ui.reconcile import Reconciler
+
+
+# --- SETTINGS ---
+PROJECT_COUNTS = [10, 100, 1000]
+
+# Pretend every widget creation costs this much (in seconds), roughly what creating a CTkButton costs
+WIDGET_COST = 0.0002
+
+
+# Stand-in for a widget (there's no screen here), only counts what is done to it
+class DummyWidget():
+    def __init__(self, item):
+        self.item = item
+        time.sleep(WIDGET_COST)
+
+    def destroy(self):
+        pass
+
+
+# The old update_ui: destroy every widget and create them all again
+class Rebuilder():
+    def __init__(self):
+        self.widgets = []
+        self.created = 0
+        self.destroyed = 0
+        self.placed = 0
+
+    def reconcile(self, items):
+        for widget in self.widgets:
+            widget.destroy()
+            self.destroyed += 1
+
+        self.widgets = []
+        for item in items:
+            self.widgets.append(DummyWidget(item))
+            self.created += 1
+            self.placed += 1
+
+
+def new_reconciler():
+    return Reconciler(
+        create = DummyWidget,
+        destroy = lambda widget: widget.destroy(),
+        place = lambda widget, position: None
+    )
+
+
+# Run one operation on the list, and return (created, destroyed, placed, milliseconds) for it
+def measure(updater, items, operation):
+    before = (updater.created, updater.destroyed, updater.placed)
+
+    start = time.perf_counter()
+    operation(items)
+    updater.reconcile(items)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    return (updater.created - before[0], updater.destroyed - before[1], updater.placed - before[2], elapsed_ms)
+
+
+# The operations the user can do on the list of projects
+OPERATIONS = {
+    "add at end": lambda items: items.append(object()),
+    "remove last": lambda items: items.pop(),
+    "remove first": lambda items: items.pop(0),
+    "no change": lambda items: None,
+}
+
+
+def main():
+    print(f"{'projects':>9} {'operation':>13} {'method':>10} {'created':>8} {'destroyed':>10} {'placed':>7} {'time (ms)':>10}")
+
+    for count in PROJECT_COUNTS:
+        for operation_name, operation in OPERATIONS.items():
+            for method_name, updater in (("rebuild", Rebuilder()), ("reconcile", new_reconciler())):
+
+                # Build the starting list first (not measured)
+                items = [object() for i in range(count)]
+                updater.reconcile(items)
+
+                created, destroyed, placed, elapsed_ms = measure(updater, items, operation)
+                print(f"{count:>9} {operation_name:>13} {method_name:>10} {created:>8} {destroyed:>10} {placed:>7} {elapsed_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark for how long a save takes after a single edit, as the total amount of data grows"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todo_app.core import data
+from todo_app.core import storage
+import generate_data
+
+
+# --- SETTINGS ---
+PROJECT_COUNTS = [10, 100, 1000, 5000]
+CATEGORIES_PER_PROJECT = 5
+TODOS_PER_CATEGORY = 20
+REPEATS = 20
+
+
+# The old way of saving: turn every project into a dictionary and dump everything
+def save_full(projects):
+    generate_data.save_full_dump([project.to_dict() for project in projects])
+
+
+# The new way of saving: only the changed project gets serialized again
+def save_incremental(projects):
+    storage.save_projects(projects)
+
+
+# Only the serializing part of the new way (no file writing), to show it doesn't grow with the amount of data
+def serialize_incremental(projects):
+    for project in projects:
+        project.to_json()
+
+
+# Add one to-do item to the first project, save, and return the average time per save (in milliseconds)
+def time_edit_and_save(projects, save_function):
+    category = projects[0].categories[0]
+
+    start = time.perf_counter()
+    for i in range(REPEATS):
+        category.add_todo(data.Todo(text=f"New to-do {i}"))
+        save_function(projects)
+
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+def main():
+    # Write to a temporary folder so the real data file (and journal) isn't touched
+    generate_data.use_temp_dir()
+
+    print(f"{'projects':>10} {'todos':>10} {'full save (ms)':>16} {'incremental (ms)':>18} {'serialize only (ms)':>21}")
+
+    for project_count in PROJECT_COUNTS:
+        projects = generate_data.make_projects(project_count, CATEGORIES_PER_PROJECT, TODOS_PER_CATEGORY)
+        total_todos = project_count * CATEGORIES_PER_PROJECT * TODOS_PER_CATEGORY
+
+        # The first save fills the caches, just like the first save after launching the app
+        storage.save_projects(projects)
+
+        full_ms = time_edit_and_save(projects, save_full)
+        incremental_ms = time_edit_and_save(projects, save_incremental)
+        serialize_ms = time_edit_and_save(projects, serialize_incremental)
+
+        print(f"{project_count:>10} {total_todos:>10} {full_ms:>16.2f} {incremental_ms:>18.2f} {serialize_ms:>21.2f}")
+
+
+if __name__ == "__main__":
+    main()
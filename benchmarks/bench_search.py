@@ -0,0 +1,63 @@
+"""Benchmark for the search index with a made up dataset of 1 million to-do items: how long building the index takes,
+how long different searches take, and how long keeping the index up to date when adding/removing items takes"""
+
+import sys
+import os
+import gc
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todo_app.core import data
+from todo_app.core import search
+import generate_data
+
+
+# --- SETTINGS ---
+PROJECT_COUNT = 1000
+CATEGORIES_PER_PROJECT = 10
+TODOS_PER_CATEGORY = 100 # 1000 * 10 * 100 = 1 million to-do items
+
+# The to-do texts are made of the words in generate_data.WORDS
+QUERIES = ["a", "buy", "buy mil", "report", "kitchen paint", "pay rent", "zzzz", "project 12", "shopping"]
+REPEATS = 20
+
+
+def timed_ms(function):
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    todo_count = PROJECT_COUNT * CATEGORIES_PER_PROJECT * TODOS_PER_CATEGORY
+
+    print(f"Creating {todo_count} to-do items...")
+    projects = generate_data.make_projects(PROJECT_COUNT, CATEGORIES_PER_PROJECT, TODOS_PER_CATEGORY)
+
+    build_ms = timed_ms(lambda: search.index.build(projects))
+    print(f"Building the index: {build_ms:.0f} ms ({len(search.index.todos.sorted_words)} different words)")
+    print()
+
+    print(f"{'query':>16} {'results':>8} {'time (ms)':>10}")
+    for query in QUERIES:
+        results = search.index.search(query)
+        total_ms = sum(timed_ms(lambda: search.index.search(query)) for i in range(REPEATS))
+        print(f"{query:>16} {len(results):>8} {total_ms / REPEATS:>10.3f}")
+    print()
+
+    # Keeping the index up to date: add and remove to-do items in one category.
+    # (The million existing objects are "frozen" first, otherwise one slow full garbage collection of all of them would be most of what's measured)
+    gc.collect()
+    gc.freeze()
+    category = projects[0].categories[0]
+    todos = [data.Todo(text=f"new item {i} with a brand new word{i}x") for i in range(1000)]
+
+    add_ms = timed_ms(lambda: [category.add_todo(todo) for todo in todos])
+    remove_ms = timed_ms(lambda: [category.remove_todo(todo) for todo in todos])
+    data.take_changes()
+
+    print(f"Adding a to-do item:   {add_ms / len(todos) * 1000:.1f} microseconds (index included)")
+    print(f"Removing a to-do item: {remove_ms / len(todos) * 1000:.1f} microseconds (index included)")
+
+
+if __name__ == "__main__":
+    main()
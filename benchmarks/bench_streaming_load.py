@@ -0,0 +1,110 @@
+"""Benchmark for loading a very big json data file (a few hundred MB) all at once with json.load compared to one project at a time (see json_stream.py):
+the peak memory use of the app and the time until the projects view has what it needs to draw its first frame.
+
+Every way of loading runs in its own process, since the peak memory of a process can only go up (and to start from a clean slate every time).
+The peak memory is read with the "resource" module, which doesn't exist on Windows.
+"""
+
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+import generate_data
+
+
+# --- SETTINGS ---
+PROJECT_COUNT = 1000
+CATEGORIES_PER_PROJECT = 10
+TODOS_PER_CATEGORY = 300 # 1000 * 10 * 300 = 3 million to-do items (about 400 MB)
+
+# The ways of loading that are compared: (name, environment variables)
+WAYS = [
+    ("index, json.load", {"TODOAPP_LAZY": "1", "TODOAPP_STREAMING": "0"}),
+    ("index, streamed", {"TODOAPP_LAZY": "1", "TODOAPP_STREAMING": "1"}),
+    ("everything, json.load", {"TODOAPP_LAZY": "0", "TODOAPP_STREAMING": "0"}),
+    ("everything, streamed", {"TODOAPP_LAZY": "0", "TODOAPP_STREAMING": "1"}),
+]
+
+
+# Peak memory of this process so far, in MB
+def peak_memory_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux gives kilobytes, Mac gives bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+# Runs in the child process: load the data file in the folder the way the app does at launch, and print the measurements as json
+def measure_load(data_dir):
+    from todo_app.core import storage
+    from todo_app.core.service import TodoService
+
+    generate_data.use_temp_dir(data_dir)
+
+    memory_before = peak_memory_mb()
+    start = time.perf_counter()
+
+    # The same as App.__init__: load (only the index with lazy loading), then create the objects
+    loaded_data = storage.load_index() if storage.LAZY_LOADING else storage.iter_data()
+    service = TodoService(loaded_data)
+
+    # At this point the projects view can draw its grid (it only needs the names and counts)
+    ready_ms = (time.perf_counter() - start) * 1000
+
+    # Opening a project (with lazy loading this reads it from the file)
+    start = time.perf_counter()
+    service.projects[len(service.projects) // 2].load()
+    open_ms = (time.perf_counter() - start) * 1000
+
+    print(json.dumps({
+        "ready_ms": ready_ms,
+        "open_ms": open_ms,
+        "memory_before_mb": memory_before,
+        "peak_memory_mb": peak_memory_mb()
+    }))
+
+
+def main():
+    if sys.platform == "win32":
+        print("The peak memory can't be measured on Windows (there is no 'resource' module)")
+        return
+
+    # Write to a temporary folder so the real data file isn't touched
+    data_dir = tempfile.mkdtemp()
+    data_file = os.path.join(data_dir, "data.json")
+
+    todo_count = PROJECT_COUNT * CATEGORIES_PER_PROJECT * TODOS_PER_CATEGORY
+    print(f"Writing a data file with {todo_count} to-do items...")
+
+    # Written one project at a time, so making the file doesn't need all of it in memory either
+    generate_data.write_data_file(data_file, generate_data.iter_projects_data(PROJECT_COUNT, CATEGORIES_PER_PROJECT, TODOS_PER_CATEGORY))
+    print(f"The file is {os.path.getsize(data_file) / 1024 / 1024:.0f} MB")
+    print()
+
+    print(f"{'':>22} {'ready to draw (ms)':>19} {'open project (ms)':>18} {'peak memory (MB)':>17} {'before loading (MB)':>20}")
+
+    for name, environment in WAYS:
+        result = subprocess.run(
+            [sys.executable, __file__, "--child", data_dir],
+            env = {**os.environ, **environment},
+            capture_output = True,
+            text = True,
+            check = True
+        )
+        measured = json.loads(result.stdout.strip().splitlines()[-1])
+
+        print(f"{name:>22} {measured['ready_ms']:>19.0f} {measured['open_ms']:>18.1f} {measured['peak_memory_mb']:>17.0f} {measured['memory_before_mb']:>20.0f}")
+
+    shutil.rmtree(data_dir)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        measure_load(sys.argv[2])
+    else:
+        main()
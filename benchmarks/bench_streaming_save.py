@@ -0,0 +1,103 @@
+"""Benchmark for saving everything (like the first save after launching) with the text of the whole file glued together first, compared to
+writing it piece by piece while it's being made (see iter_json in data.py and storage.atomic_write): the peak memory used while saving and the speed.
+
+"All at once" is the old way: every category turns all of its to-do items into dictionaries at once, and the text of every project is glued
+into one big string before anything is written.
+"""
+
+import sys
+import os
+import time
+import tempfile
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todo_app.core import data
+from todo_app.core import storage
+import generate_data
+
+
+# --- SETTINGS ---
+# (name, projects, categories per project, to-do items per category)
+DATASETS = [
+    ("many projects", 1000, 10, 50),
+    ("one huge category", 1, 1, 1000000),
+]
+REPEATS = 3
+
+# The app's own setting (the "all at once" way changes it, so it's put back for the other way)
+CHUNK_SIZE = data.TODOS_PER_CHUNK
+
+
+# Make every project and category "changed", so everything is turned into text again (like the first save)
+def mark_all_dirty(projects):
+    for project in projects:
+        project.mark_dirty()
+
+        for category in project.categories:
+            category.mark_dirty()
+
+
+def save_all_at_once(projects, path):
+    data.TODOS_PER_CHUNK = sys.maxsize
+    snapshots = [project.snapshot() for project in projects]
+    storage.atomic_write(path, "".join(storage.iter_json_text(snapshots)))
+
+
+def save_in_pieces(projects, path):
+    data.TODOS_PER_CHUNK = CHUNK_SIZE
+    snapshots = [project.snapshot() for project in projects]
+    storage.atomic_write(path, storage.iter_json_text(snapshots))
+
+
+# Peak memory (in MB) used while saving, on top of what was used before
+def peak_memory_mb(save_function, projects, path):
+    mark_all_dirty(projects)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    save_function(projects, path)
+
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return (peak - before) / 1024 / 1024
+
+
+# Average time (in milliseconds) of a save
+def save_time_ms(save_function, projects, path):
+    total = 0
+
+    for i in range(REPEATS):
+        mark_all_dirty(projects)
+
+        start = time.perf_counter()
+        save_function(projects, path)
+        total += time.perf_counter() - start
+
+    return total / REPEATS * 1000
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "data.json")
+
+    print(f"{'':>18} {'file (MB)':>10} {'way':>14} {'peak memory (MB)':>17} {'save (ms)':>10} {'MB/s':>7}")
+
+    for name, project_count, categories_per_project, todos_per_category in DATASETS:
+        projects = generate_data.make_projects(project_count, categories_per_project, todos_per_category)
+
+        # Once, so the file size is known
+        save_in_pieces(projects, path)
+        file_mb = os.path.getsize(path) / 1024 / 1024
+
+        for way, save_function in [("all at once", save_all_at_once), ("in pieces", save_in_pieces)]:
+            memory_mb = peak_memory_mb(save_function, projects, path)
+            ms = save_time_ms(save_function, projects, path)
+
+            print(f"{name:>18} {file_mb:>10.1f} {way:>14} {memory_mb:>17.1f} {ms:>10.0f} {file_mb / (ms / 1000):>7.1f}")
+
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""All the main benchmarks in one run, on a made up data file (see generate_data.py): loading, creating the project objects,
+turning them into dictionaries (to_dict), saving, and opening a project/switching category in the UI.
+
+The results are written to benchmarks/results/ as a json file (with the commit they were measured on), so two commits can be compared.
+The results files are committed, but the numbers depend on the machine, so to compare with another machine's result, measure its commit again first:
+    python benchmarks/bench_suite.py                                         measure and save the results
+    python benchmarks/bench_suite.py --compare benchmarks/results/old.json   also show how much faster/slower each one got
+
+The UI part needs a screen. On a machine without one, run it under a virtual X server: xvfb-run python benchmarks/bench_suite.py
+(without a screen the UI part is skipped). The storage mode can be picked like in the app, e.g. TODOAPP_STORAGE=sqlite.
+"""
+
+import sys
+import os
+import gc
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todo_app.core import data
+from todo_app.core import storage
+import generate_data
+
+
+# --- SETTINGS --- (can be changed with arguments)
+PROJECT_COUNT = 200
+CATEGORIES_PER_PROJECT = 10
+TODOS_PER_CATEGORY = 50 # 200 * 10 * 50 = 100,000 to-do items
+
+REPEATS = 5 # How many times each thing is measured (the median is used)
+UI_REPEATS = 20
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+
+# Run "function" a few times and return how long each run took (in milliseconds).
+# "setup" runs before each run without being timed, and what it returns is passed to "function".
+def measure(function, repeats, setup=lambda: None):
+    times = []
+
+    for i in range(repeats):
+        argument = setup()
+        gc.collect()
+
+        start = time.perf_counter()
+        function(argument)
+        times.append((time.perf_counter() - start) * 1000)
+
+    return times
+
+
+# A fresh ProjectCollection made from dictionaries (like at launch)
+def build_projects(projects_data):
+    return data.ProjectCollection([data.Project(**project_data) for project_data in projects_data])
+
+
+
+def measure_storage(projects_data, repeats):
+    """Loading, creating the objects, to_dict and saving. Returns {name: [times in ms]}."""
+    results = {}
+
+    # The file the app would find at launch (other storage modes turn it into their own format on the first load/save)
+    generate_data.write_data_file(storage.DATA_FILE, projects_data)
+    storage.save_projects(build_projects(storage.load_data()))
+
+    results["load"] = measure(lambda _: storage.load_data(), repeats)
+    results["load index (lazy loading)"] = measure(lambda _: storage.load_index(), repeats)
+
+    loaded_data = storage.load_data()
+    results["model construction"] = measure(lambda _: build_projects(loaded_data), repeats)
+
+    projects = build_projects(loaded_data)
+    results["to_dict"] = measure(lambda _: [project.to_dict() for project in projects], repeats)
+
+    # The first save after launching (nothing is cached yet)
+    results["save (first)"] = measure(lambda new_projects: storage.save_projects(new_projects), repeats, lambda: build_projects(loaded_data))
+
+    # Saving after one small change, the common case while using the app
+    storage.save_projects(projects)
+    category = projects[0].categories[0]
+    results["save (after one change)"] = measure(lambda _: storage.save_projects(projects), repeats, lambda: category.add_todo(data.Todo(text="New to-do")))
+
+    # Dumping everything as dictionaries (how saving worked before the storage backends)
+    projects_dicts = [project.to_dict() for project in projects]
+    results["save_data (full json dump)"] = measure(lambda _: generate_data.save_full_dump(projects_dicts), repeats)
+
+    return results
+
+
+
+def measure_ui(projects_data, repeats):
+    """Opening a project and switching category, with real widgets. Returns {name: [times in ms]} (empty if there is no screen)."""
+
+    try:
+        import tkinter
+        import customtkinter as ctk
+        from todo_app.views.category_view import TabsView
+    except ImportError as error:
+        print(f"Skipping the UI benchmarks ({error})")
+        return {}
+
+    try:
+        window = ctk.CTk()
+    except tkinter.TclError:
+        print("Skipping the UI benchmarks, there is no screen (run with xvfb-run to use a virtual one)")
+        return {}
+
+    window.geometry("750x750")
+    tabs_view = TabsView(master=window)
+    tabs_view.grid(row=0, column=0, sticky="nsew")
+
+    # Only the first two projects are opened, so only those are created
+    first, second = build_projects(projects_data[:2])
+    results = {}
+
+    # Switch between two projects, so every open starts from another project (like in the app)
+    def open_project(project):
+        tabs_view.load_project(project)
+        window.update_idletasks()
+
+    open_project(second)
+    results["open project"] = measure(open_project, repeats, lambda: first if tabs_view.active_project is second else second)
+
+    # Go through the categories of the open project one after the other
+    categories = tabs_view.active_project.categories
+    next_index = [0]
+
+    def next_category():
+        next_index[0] = (next_index[0] + 1) % len(categories)
+        return categories[next_index[0]]
+
+    def switch_category(category):
+        tabs_view.change_category(category.id)
+        window.update_idletasks()
+
+    results["switch category"] = measure(switch_category, repeats, next_category)
+
+    window.destroy()
+    return results
+
+
+
+# The commit the results were measured on ("-dirty" if there were uncommitted changes)
+def current_commit():
+    folder = os.path.dirname(os.path.abspath(__file__))
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=folder, capture_output=True, text=True, check=True).stdout.strip()
+        changes = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=folder, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+    return commit + "-dirty" if changes else commit
+
+
+
+def print_results(results, old_results=None):
+    if old_results is None:
+        print(f"{'':>28} {'median (ms)':>12} {'min (ms)':>10}")
+    else:
+        print(f"{'':>28} {'median (ms)':>12} {'min (ms)':>10} {'before (ms)':>12} {'change':>8}")
+
+    for name, result in results.items():
+        line = f"{name:>28} {result['median_ms']:>12.2f} {min(result['runs_ms']):>10.2f}"
+
+        if old_results is not None and name in old_results:
+            old_median = old_results[name]["median_ms"]
+            line += f" {old_median:>12.2f} {(result['median_ms'] - old_median) / old_median * 100:>+7.0f}%"
+
+        print(line)
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmarks and save the results as json.")
+    parser.add_argument("--projects", type=int, default=PROJECT_COUNT)
+    parser.add_argument("--categories", type=int, default=CATEGORIES_PER_PROJECT)
+    parser.add_argument("--todos", type=int, default=TODOS_PER_CATEGORY, help="to-do items per category")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--no-ui", action="store_true", help="skip opening a window")
+    parser.add_argument("--compare", help="a results file from an earlier run to compare with")
+    parser.add_argument("--output", help="where to write the results (default: benchmarks/results/<date>_<commit>.json)")
+    args = parser.parse_args()
+
+    # Point the storage at a temporary folder, so the real data isn't touched
+    generate_data.use_temp_dir()
+
+    todo_count = args.projects * args.categories * args.todos
+    print(f"Creating {args.projects} projects with {todo_count} to-do items ({storage.STORAGE_MODE} storage)...")
+    projects_data = generate_data.make_projects_data(args.projects, args.categories, args.todos)
+
+    times = measure_storage(projects_data, args.repeats)
+
+    if not args.no_ui:
+        times.update(measure_ui(projects_data, UI_REPEATS))
+
+    results = {name: {"median_ms": statistics.median(runs), "runs_ms": runs} for name, runs in times.items()}
+
+    # Everything needed to know what was measured
+    commit = current_commit()
+    report = {
+        "commit": commit,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "storage_mode": storage.STORAGE_MODE,
+        "settings": {"projects": args.projects, "categories_per_project": args.categories, "todos_per_category": args.todos, "repeats": args.repeats},
+        "results": results
+    }
+
+    old_results = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            old_report = json.load(f)
+
+        if old_report["settings"] != report["settings"] or old_report["storage_mode"] != report["storage_mode"]:
+            print(f"WARNING: '{args.compare}' was measured with different settings, the numbers can't be compared directly")
+
+        old_results = old_report["results"]
+        print(f"Compared with {old_report['commit']} ({old_report['date']})")
+
+    print()
+    print_results(results, old_results)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{datetime.now():%Y-%m-%d_%H%M%S}_{commit}.json")
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+
+    print()
+    print(f"Results written to '{output}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Creates made up (but realistic looking) projects for the benchmarks: any number of projects x categories x to-do items,
+to-do texts of different lengths, a mix of themes and done items.
+
+The other benchmarks import it (make_projects_data/make_projects), and it can also be run on its own to write a data file, e.g.
+    python benchmarks/generate_data.py big_data.json --projects 1000 --categories 10 --todos 100
+"""
+
+import sys
+import os
+import json
+import random
+import argparse
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todo_app.core import data
+from todo_app.core import storage
+from todo_app.ui import themes
+
+
+# --- SETTINGS --- (the defaults, most can be changed with arguments when run on its own)
+PROJECT_COUNT = 100
+CATEGORIES_PER_PROJECT = 5
+TODOS_PER_CATEGORY = 50
+
+# The fewest/most words in a to-do text. Most texts are short, a few are long (like real to-do lists).
+MIN_WORDS = 1
+MAX_WORDS = 15
+
+# How many of the to-do items are done/checked (0.3 = 30%)
+CHECKED_RATIO = 0.3
+
+THEME_NAMES = ["Default", "Red", "Green", "Blue", "Yellow", "Purple"]
+
+# The same seed always gives the same data, so results can be compared between runs
+SEED = 1
+
+# The words the to-do texts are made of
+WORDS = [
+    "buy", "milk", "bread", "call", "mom", "email", "report", "fix", "sink", "clean", "kitchen", "paint", "fence", "book",
+    "tickets", "pay", "rent", "bills", "water", "plants", "walk", "dog", "write", "essay", "read", "chapter", "meeting",
+    "notes", "update", "budget", "plan", "trip", "pack", "bags", "wash", "car", "cook", "dinner", "order", "new", "charger",
+    "send", "invoice", "review", "code", "deploy", "server", "backup", "photos", "renew", "passport", "dentist", "appointment",
+    "gym", "run", "laundry", "groceries", "birthday", "gift", "garden", "mow", "lawn", "recycle", "boxes", "tax", "return",
+    "print", "documents", "schedule", "bank", "about", "the", "for", "with", "before", "after", "monday", "friday",
+    "weekend", "tomorrow", "today", "next", "week", "project", "draft", "slides", "prepare", "presentation", "team", "lunch",
+]
+
+CATEGORY_NAMES = ["To do", "Doing", "Done", "Ideas", "Shopping", "Work", "Home", "Someday", "Errands", "Bugs", "Reading", "Travel"]
+
+
+
+def make_text(random_generator, min_words=MIN_WORDS, max_words=MAX_WORDS):
+    """A made up to-do text, e.g. "Pay rent before friday". Short texts are more common than long ones."""
+    word_count = round(random_generator.triangular(min_words, max_words, min_words))
+    return " ".join(random_generator.choice(WORDS) for w in range(word_count)).capitalize()
+
+
+
+def iter_projects_data(
+        project_count=PROJECT_COUNT,
+        categories_per_project=CATEGORIES_PER_PROJECT,
+        todos_per_category=TODOS_PER_CATEGORY,
+        min_words=MIN_WORDS,
+        max_words=MAX_WORDS,
+        checked_ratio=CHECKED_RATIO,
+        theme_names=THEME_NAMES,
+        seed=SEED):
+    """Made up project dictionaries, one at a time, the same shape as in data.json (every category has its own copy of its theme settings)"""
+
+    random_generator = random.Random(seed)
+
+    for p in range(project_count):
+        categories = []
+
+        for c in range(categories_per_project):
+            theme_name = random_generator.choice(theme_names)
+
+            # Category names repeat between projects but not inside one
+            category_name = CATEGORY_NAMES[c % len(CATEGORY_NAMES)]
+            if c >= len(CATEGORY_NAMES):
+                category_name += f" {c // len(CATEGORY_NAMES) + 1}"
+
+            categories.append({
+                "id": data.new_id(),
+                "name": category_name,
+                "theme_name": theme_name,
+                "theme_settings": dict(themes.get_theme(theme_name)),
+                "todo_items": [
+                    {
+                        "id": data.new_id(),
+                        "text": make_text(random_generator, min_words, max_words),
+                        "is_checked": random_generator.random() < checked_ratio
+                    }
+                    for t in range(todos_per_category)
+                ]
+            })
+
+        yield {"id": data.new_id(), "name": f"Project {p}", "categories": categories}
+
+
+
+def make_projects_data(project_count=PROJECT_COUNT, categories_per_project=CATEGORIES_PER_PROJECT, todos_per_category=TODOS_PER_CATEGORY, **settings):
+    """A list of made up project dictionaries (see iter_projects_data)"""
+    return list(iter_projects_data(project_count, categories_per_project, todos_per_category, **settings))
+
+
+
+def make_projects(project_count=PROJECT_COUNT, categories_per_project=CATEGORIES_PER_PROJECT, todos_per_category=TODOS_PER_CATEGORY, **settings):
+    """The same as make_projects_data, but as a ProjectCollection of project objects (the way they are after loading)"""
+    projects_data = make_projects_data(project_count, categories_per_project, todos_per_category, **settings)
+    return data.ProjectCollection([data.Project(**project_data) for project_data in projects_data])
+
+
+
+def write_data_file(path, projects_data):
+    """
+    Writes the projects to a file in the same format as data.json.
+    The projects are written one at a time, so they can come from iter_projects_data without all of them being in memory (for very big files).
+    """
+    with open(path, "w") as f:
+        f.write("[\n")
+
+        for number, project_data in enumerate(projects_data):
+            if number > 0:
+                f.write(",\n")
+            f.write(json.dumps(project_data, indent=4))
+
+        f.write("\n]")
+
+
+
+def use_temp_dir(data_dir=None):
+    """
+    Points every file the storage uses (data file, journal, database, ...) at a temporary folder, so a benchmark never touches the real data.
+    (Saving in json mode removes the journal, so leaving even one of them pointing at the real folder would lose changes.) Returns the folder.
+    """
+    if data_dir is None:
+        data_dir = tempfile.mkdtemp()
+
+    storage.DATA_DIR = data_dir
+    storage.DATA_FILE = os.path.join(data_dir, "data.json")
+    storage.JOURNAL_FILE = os.path.join(data_dir, "data.journal")
+    storage.HISTORY_FILE = os.path.join(data_dir, "data.history")
+    storage.DB_FILE = os.path.join(data_dir, "data.db")
+    storage.BINARY_FILE = os.path.join(data_dir, "data.bin")
+    storage.SHARD_DIR = os.path.join(data_dir, "projects")
+
+    # A backend that was already created still uses the old paths
+    storage.backend = None
+
+    return data_dir
+
+
+
+def save_full_dump(projects_data):
+    """The way saving worked before the storage backends (a baseline to compare with): every project dumped again, as indented json."""
+    os.makedirs(storage.DATA_DIR, exist_ok=True)
+
+    # Written piece by piece as it's made, like the real saves
+    storage.atomic_write(storage.DATA_FILE, json.JSONEncoder(indent=4).iterencode(projects_data), storage.BACKUP_COUNT)
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a data file with made up projects.")
+    parser.add_argument("file")
+    parser.add_argument("--projects", type=int, default=PROJECT_COUNT)
+    parser.add_argument("--categories", type=int, default=CATEGORIES_PER_PROJECT)
+    parser.add_argument("--todos", type=int, default=TODOS_PER_CATEGORY, help="to-do items per category")
+    parser.add_argument("--min-words", type=int, default=MIN_WORDS)
+    parser.add_argument("--max-words", type=int, default=MAX_WORDS)
+    parser.add_argument("--checked", type=float, default=CHECKED_RATIO, help="how many items are done, from 0 to 1")
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    projects_data = iter_projects_data(
+        args.projects, args.categories, args.todos,
+        min_words=args.min_words, max_words=args.max_words, checked_ratio=args.checked, seed=args.seed
+    )
+    write_data_file(args.file, projects_data)
+
+    todo_count = args.projects * args.categories * args.todos
+    print(f"Wrote {args.projects} projects with {todo_count} to-do items to '{args.file}' ({os.path.getsize(args.file) / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,30 @@
 
 import sys
 import os
-import customtkinter as ctk
+import tkinter
+import tkinter.messagebox
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+# Imported first, so the startup timing (TODOAPP_PROFILE_STARTUP=1) includes the other imports
+from todo_app.core import startup_profiler
+
+import customtkinter as ctk
 from todo_app.views.projects_view import ProjectsView
 from todo_app.views.category_view import TabsView
+from todo_app.ui import widgets as ui
+from todo_app.ui import themes
 from todo_app.core import storage
+from todo_app.core.save_scheduler import SaveScheduler, PRINT_STATS
+from todo_app.core.service import TodoService
 from todo_app.core.utils import resource_path
 
+startup_profiler.mark("imports")
+
+
+# Show the projects view as soon as possible, and only create the tabs view (and load the icon) after the first frame is drawn.
+# TODOAPP_FAST_START=0 creates everything before the window is shown.
+FAST_START = os.environ.get("TODOAPP_FAST_START", "1") != "0"
+
 
 
 
@@ -19,14 +36,31 @@ class App(ctk.CTk):
     def __init__(self):
         super().__init__()
 
-        loaded_data = storage.load_data()
+        startup_profiler.mark("window creation")
+
+        # Add the user's own themes (if they made any) before any of the views are created
+        themes.load_user_themes(os.path.join(storage.DATA_DIR, "themes.json"))
+
+        # With lazy loading, only the project names/counts are loaded here, the rest is loaded when a project is opened
+        if storage.LAZY_LOADING:
+            loaded_data = storage.load_index()
+            startup_profiler.mark("storage.load_index")
+        else:
+            # The projects are read one at a time while the service creates their objects (so the reading is part of "model construction")
+            loaded_data = storage.iter_data()
+            startup_profiler.mark("storage.iter_data")
+
+        # The service holds the projects and makes every change to them (the views call it, see core/service.py)
+        self.service = TodoService(loaded_data)
+        startup_profiler.mark("model construction")
 
 
 
         # --- DEFAULT WINDOW SETTINGS ---
 
-        # Window title
-        self.iconbitmap(resource_path("src/todo_app/assets/icon_main.ico"))
+        # Window icon (loaded after the first frame in fast start mode) and title
+        if not FAST_START:
+            self.iconbitmap(resource_path("src/todo_app/assets/icon_main.ico"))
         self.title("My To-Do manager")
         
         # Define the starting size of the main application
@@ -44,6 +78,8 @@ class App(ctk.CTk):
         # Create window at the center of the screen by entering "<width>x<height>+<x_pos>+<y_pos>"
         self.geometry(str(app_width)+"x"+str(app_height)+"+"+str(pos_x)+"+"+str(pos_y))
 
+        startup_profiler.mark("window settings")
+
 
         # --- GRID SETTINGS ---
         self.grid_rowconfigure(0, weight=1)
@@ -58,7 +94,7 @@ class App(ctk.CTk):
             # Create a variable that acts as the instance/object of the ProjectsView class. When variable is created/defined, so is an instance/object.
         self.projects_view = ProjectsView(
             master=self,
-            loaded_data = loaded_data
+            service = self.service
             )
 
         # Place the new view instance/object on the grid to make it visible
@@ -67,11 +103,37 @@ class App(ctk.CTk):
         # Create a dictionary key/value (string to object/instance) item
         self.views["projects"] = self.projects_view
 
+        startup_profiler.mark("ProjectsView.__init__")
+
         # --- Tabs view ---
-        # (same setup as "Projects view")
-        self.tabs_view = TabsView(master=self) 
-        self.tabs_view.grid(row=0, column=0, sticky="nsew")
-        self.views["tabs"] = self.tabs_view
+        # (In fast start mode it's created after the first frame, see after_first_frame)
+        self.tabs_view = None
+
+        if not FAST_START:
+            self.create_tabs_view()
+
+
+
+        # --- SAVING ---
+        # Saves are collected and written on a background thread, so quick bursts of changes don't freeze the UI
+        self.save_scheduler = SaveScheduler(
+            master = self,
+            get_projects = lambda: self.service.projects,
+            on_error = self.show_save_error
+            )
+
+
+
+        # --- UNDO / REDO ---
+        # Every change made through the service goes into its history, so it can be undone (Ctrl+Z) and redone (Ctrl+Y)
+        # Put back the history from the last time the app was used
+        if storage.KEEP_HISTORY:
+            history_data = storage.load_history()
+            if history_data is not None:
+                self.service.history.load_dict(history_data)
+
+        self.bind_all("<Control-z>", lambda event: self.on_history_key(self.undo))
+        self.bind_all("<Control-y>", lambda event: self.on_history_key(self.redo))
 
 
 
@@ -82,34 +144,110 @@ class App(ctk.CTk):
         # --- Define what happens when program is closed (with X)
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+        # Runs once the window has been drawn for the first time
+        self.after_idle(self.after_first_frame)
+
 
 
 
 
     # --- FUNCTIONS / METHODS ---
 
+    # Create the tabs view (hidden behind the projects view until a project is opened)
+    def create_tabs_view(self):
+        # (same setup as "Projects view")
+        self.tabs_view = TabsView(master=self)
+        self.tabs_view.grid(row=0, column=0, sticky="nsew")
+        self.views["tabs"] = self.tabs_view
+
+        # Keep the projects view on top
+        self.projects_view.tkraise()
+
+        startup_profiler.mark("TabsView.__init__")
+
+
+
+    # Called once the first frame has been drawn: create what was put off until now (fast start mode), and print the startup times
+    def after_first_frame(self):
+        startup_profiler.mark("first paint")
+
+        if self.tabs_view is None:
+            self.create_tabs_view()
+
+        if FAST_START:
+            self.iconbitmap(resource_path("src/todo_app/assets/icon_main.ico"))
+            startup_profiler.mark("icon (after first paint)")
+
+        startup_profiler.report()
+
+
+
     def save(self):
 
-        # Get/store a list of all the projects
-        all_projects = self.projects_view.all_projects
+        # Ask for the projects to be saved. The save happens shortly after, once no more changes come in.
+        # Only projects/categories that changed since the last save are converted to json again, the rest re-use their saved text.
+        self.save_scheduler.request_save()
+
+
+    # If a save failed (e.g. the disk is full), the changes are kept and saved again with the next change (see save_scheduler.py)
+    def show_save_error(self, error):
+        tkinter.messagebox.showerror(
+            title = "Saving failed",
+            message = f"Your latest changes could not be saved:\n{error}\n\nThey are kept and saved again with the next change (closing the app tries again too).",
+            parent = self
+            )
+
+
 
-        # Initialize the list of dictionaries that will be saved out
-        save_dicts = []
+    # Ctrl+Z/Ctrl+Y while typing (in the search field or a dialog) are meant for the text, so the projects are only changed otherwise
+    def on_history_key(self, undo_or_redo):
+        try:
+            focused_widget = self.focus_get()
+        except KeyError:
+            # (Tkinter can't tell which widget has focus for some built-in popups, e.g. an open dropdown)
+            focused_widget = None
 
-        # Go over all projects and create dictionaries of all of them.
-        # Calling the projects "to_dict" method in turn calls the category's "to_dict" method and so on, resulting in a top level dictionary that contains several layers of dictionaries.
-        for project in all_projects:
-            project_dict = project.to_dict()
+        if isinstance(focused_widget, (tkinter.Entry, tkinter.Text)):
+            return
 
-            save_dicts.append(project_dict)
+        undo_or_redo()
 
-        # Save the list of dictionaries to the file
-        storage.save_data(save_dicts)
+
+    # Undo the last change (Ctrl+Z)
+    def undo(self):
+        if self.service.undo() is not None:
+            self.after_history_change()
+
+
+    # Redo the last undone change (Ctrl+Y)
+    def redo(self):
+        if self.service.redo() is not None:
+            self.after_history_change()
+
+
+    # Save and show the data as it is after an undo/redo
+    def after_history_change(self):
+        self.save()
+        self.projects_view.update_ui()
+
+        if self.tabs_view is not None and self.tabs_view.active_project is not None:
+
+            # The open project was removed (e.g. adding it was undone), go back to the projects
+            if self.service.projects.get_by_id(self.tabs_view.active_project.id) is None:
+                self.tabs_view.active_project = None
+                self.set_view("projects", None)
+            else:
+                self.tabs_view.reload()
 
 
 
     # Function for toggling views/pages
     def set_view(self, view_name, project_data):
+
+        # In fast start mode the tabs view might not exist yet if a project is opened right away
+        if view_name == "tabs" and self.tabs_view is None:
+            self.create_tabs_view()
+
         # Check if the view (key) is in the views dictionary
         if view_name in self.views:
 
@@ -121,6 +259,10 @@ class App(ctk.CTk):
                 # Go into tabs view and call the internal function/method to let it load the project data/information.
                 target_view.load_project(project_data)
 
+            # Coming back from a project: its button shows how many to-do items are done, which may have changed while it was open
+            if view_name == "projects" and self.tabs_view is not None and self.tabs_view.active_project is not None:
+                target_view.refresh_project(self.tabs_view.active_project)
+
             # Regardless of which view we're going to, raise/show it.
             target_view.tkraise()
 
@@ -133,8 +275,24 @@ class App(ctk.CTk):
     # When the program closes (with X)
     def on_closing(self):
 
-        # Save the data
+        # Save the data, and wait until everything is written.
+        # If that failed, the app stays open so the changes aren't lost (closing it again tries again).
         self.save()
+        if not self.save_scheduler.flush():
+            return
+
+        # Keep the undo/redo history for the next launch
+        if storage.KEEP_HISTORY:
+            storage.save_history(self.service.history.to_dict())
+
+        # Print how many saves were combined etc.
+        if PRINT_STATS:
+            print(self.save_scheduler.stats_text())
+            print(ui.pool_stats_text())
+
+            open_times = self.tabs_view.open_times if self.tabs_view is not None else []
+            if open_times:
+                print(f"Opened {len(open_times)} project(s), {sum(open_times) / len(open_times):.1f} ms on average, slowest {max(open_times):.1f} ms")
         
         # Actually destroy the window
         self.destroy()
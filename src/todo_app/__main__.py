@@ -0,0 +1,233 @@
+'''
+Command line tool for the to-do data, without opening the app (e.g. on a server, or for scripts).
+Run from the "src" folder (or with "src" on the PYTHONPATH):
+
+    python -m todo_app list                                 all projects
+    python -m todo_app list "Home"                          the categories of a project
+    python -m todo_app list "Home" "Kitchen"                the to-do items of a category (numbered)
+    python -m todo_app add project "Home"
+    python -m todo_app add category "Home" "Kitchen" [--theme Red]
+    python -m todo_app add todo "Home" "Kitchen" "Buy milk"
+    python -m todo_app remove project "Home"
+    python -m todo_app remove category "Home" "Kitchen"
+    python -m todo_app remove todo "Home" "Kitchen" 3
+    python -m todo_app rename project "Home" "House"
+    python -m todo_app rename category "Home" "Kitchen" "Cooking"
+    python -m todo_app toggle "Home" "Kitchen" 3
+    python -m todo_app check-all "Home" "Kitchen"           (and uncheck-all)
+    python -m todo_app import backup.json                   replaces all projects
+    python -m todo_app export backup.json
+    python -m todo_app batch commands.txt                   one command per line ("-" reads them from the input)
+
+Every command saves once when it's done. "batch" runs all its commands first and then saves a single time,
+and if one of them fails nothing is saved.
+'''
+
+import argparse
+import shlex
+import sys
+from todo_app.core.service import TodoService
+
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m todo_app", description="Change the to-do data without opening the app.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="list projects, categories or to-do items")
+    list_parser.add_argument("project", nargs="?")
+    list_parser.add_argument("category", nargs="?")
+
+    # "add" and "remove" have a sub-command for each kind of thing
+    for command in ("add", "remove"):
+        command_parser = commands.add_parser(command, help=f"{command} a project, category or to-do item")
+        kinds = command_parser.add_subparsers(dest="kind", required=True)
+
+        kinds.add_parser("project").add_argument("name")
+
+        category_parser = kinds.add_parser("category")
+        category_parser.add_argument("project")
+        category_parser.add_argument("name")
+        if command == "add":
+            category_parser.add_argument("--theme", default="Default")
+
+        todo_parser = kinds.add_parser("todo")
+        todo_parser.add_argument("project")
+        todo_parser.add_argument("category")
+        if command == "add":
+            todo_parser.add_argument("text")
+        else:
+            todo_parser.add_argument("number", type=int)
+
+    rename_parser = commands.add_parser("rename", help="rename a project or category")
+    kinds = rename_parser.add_subparsers(dest="kind", required=True)
+
+    project_parser = kinds.add_parser("project")
+    project_parser.add_argument("name")
+    project_parser.add_argument("new_name")
+
+    category_parser = kinds.add_parser("category")
+    category_parser.add_argument("project")
+    category_parser.add_argument("name")
+    category_parser.add_argument("new_name")
+
+    toggle_parser = commands.add_parser("toggle", help="check/uncheck a to-do item")
+    toggle_parser.add_argument("project")
+    toggle_parser.add_argument("category")
+    toggle_parser.add_argument("number", type=int)
+
+    for command in ("check-all", "uncheck-all"):
+        check_all_parser = commands.add_parser(command, help=f"{command.replace('-all', '')} every to-do item of a category")
+        check_all_parser.add_argument("project")
+        check_all_parser.add_argument("category")
+
+    commands.add_parser("import", help="replace all projects with the ones in a json file").add_argument("file")
+    commands.add_parser("export", help="write all projects to a json file").add_argument("file")
+    commands.add_parser("batch", help="run the commands in a file (one per line), then save once").add_argument("file")
+
+    return parser
+
+
+
+def run_command(service, args):
+    """Runs one command. Returns True if it changed something (so it needs saving). Raises a ValueError if it can't be done."""
+
+    if args.command == "list":
+        list_data(service, args.project, args.category)
+        return False
+
+    if args.command == "export":
+        service.export_json(args.file)
+        return False
+
+    if args.command == "import":
+        service.import_json(args.file)
+        return True
+
+    if args.command == "toggle":
+        category = service.get_category(service.get_project(args.project), args.category)
+        service.toggle(category, service.get_todo(category, args.number))
+        return True
+
+    if args.command in ("check-all", "uncheck-all"):
+        category = service.get_category(service.get_project(args.project), args.category)
+        service.set_all_checked(category, args.command == "check-all")
+        return True
+
+    if args.command == "rename":
+        project = service.get_project(args.name if args.kind == "project" else args.project)
+
+        if args.kind == "project":
+            service.rename_project(project, args.new_name)
+        else:
+            service.rename_category(project, service.get_category(project, args.name), args.new_name)
+        return True
+
+    # add/remove
+    if args.kind == "project":
+        if args.command == "add":
+            service.add_project(args.name)
+        else:
+            service.remove_project(service.get_project(args.name))
+        return True
+
+    project = service.get_project(args.project)
+
+    if args.kind == "category":
+        if args.command == "add":
+            service.add_category(project, args.name, args.theme)
+        else:
+            service.remove_category(project, service.get_category(project, args.name))
+        return True
+
+    category = service.get_category(project, args.category)
+
+    if args.command == "add":
+        service.add_todo(category, args.text)
+    else:
+        service.remove_todo(category, service.get_todo(category, args.number))
+    return True
+
+
+
+def list_data(service, project_name=None, category_name=None):
+    """Prints the projects, the categories of a project, or the to-do items of a category"""
+
+    if project_name is None:
+        for project in service.projects:
+            print(f"{project.project_name}   ({project.category_count()} categories, {project.done_count()}/{project.todo_count()} to-dos done)")
+        return
+
+    project = service.get_project(project_name)
+
+    if category_name is None:
+        for category in project.categories:
+            print(f"{category.category_name}   ({category.count_checked()}/{len(category.todo_items)} done, theme: {category.theme_name})")
+        return
+
+    category = service.get_category(project, category_name)
+
+    for number, todo in enumerate(category.todo_items, start=1):
+        print(f"{number:>4}. [{'x' if todo.is_checked else ' '}] {todo.text}")
+
+
+
+def run_batch(service, parser, batch_file):
+    """Runs every command in the file (empty lines and lines starting with # are skipped). Returns True if something changed."""
+
+    batch = sys.stdin if batch_file == "-" else open(batch_file, "r")
+    changed = False
+
+    with batch:
+        for line_number, line in enumerate(batch, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            try:
+                args = parser.parse_args(shlex.split(line))
+            except SystemExit:
+                raise ValueError(f"line {line_number}: '{line}' is not a valid command")
+
+            if args.command == "batch":
+                raise ValueError(f"line {line_number}: a batch can't run another batch")
+
+            try:
+                changed = run_command(service, args) or changed
+            except ValueError as error:
+                raise ValueError(f"line {line_number}: {error}")
+
+    return changed
+
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    service = TodoService()
+
+    try:
+        if args.command == "batch":
+            changed = run_batch(service, parser, args.file)
+        else:
+            changed = run_command(service, args)
+
+    # The output was cut off (e.g. "list ... | head"), that's fine
+    except BrokenPipeError:
+        return 0
+
+    except (ValueError, OSError) as error:
+        print(f"Error: {error} (nothing was saved)", file=sys.stderr)
+        return 1
+
+    # Save everything at once
+    if changed:
+        service.save()
+
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,357 @@
+'''
+A compact binary file format for the projects, as an alternative to json (used by the "binary" storage mode).
+
+Instead of writing every name/text/key out in full (like json does), each project stores a "string table": a list of every unique piece of text in the project.
+Everything else is just numbers pointing into that table, stored as 4 byte integers, which can be read back in one go (array.frombytes) instead of character by character.
+Theme settings are not stored at all, only the theme name (the settings are looked up again when loading), unless they don't match a built-in theme.
+
+File layout:
+    b"TODB" + format version (1 byte)
+    number of projects (4 bytes)
+    for every project: size of the project block (4 bytes) + the project block
+
+Project block layout:
+    number of strings, size of the text blob, number of integers (4 bytes each)
+    the byte size of every string (4 bytes each)
+    the text blob (all the strings glued together, utf-8)
+    the integers:
+        project name, project id, number of categories
+        for every category: name, id, theme name, custom theme settings (0 = use the theme name, otherwise string number + 1), number of to-do items
+            for every to-do item: (text * 2) + is_checked, id
+
+Version 1 files (from before ids existed) don't have the ids, they can still be read.
+'''
+
+import json
+import struct
+import sys
+from array import array
+from todo_app.ui import themes
+
+
+MAGIC = b"TODB"
+FORMAT_VERSION = 2
+
+# The file is always little-endian, swap the bytes around on the (rare) big-endian computers
+SWAP_BYTES = sys.byteorder != "little"
+
+
+
+# --- WRITING ---
+
+def encode_project(project_data):
+    """Turns a project dictionary into a project block (bytes)."""
+
+    strings = []
+    string_numbers = {}
+
+    # Returns the number of a string in the table, adding it the first time it's seen
+    def string_number(text):
+        number = string_numbers.get(text)
+
+        if number is None:
+            number = len(strings)
+            string_numbers[text] = number
+            strings.append(text)
+
+        return number
+
+    # Data without ids (e.g. converted from an old json file) stores an empty id, which is read back as "no id"
+    ints = [string_number(project_data["name"]), string_number(project_data.get("id", "")), len(project_data["categories"])]
+
+    for category in project_data["categories"]:
+        theme_name = category["theme_name"]
+
+        # Only store the theme settings if they can't be looked up from the theme name.
+        # User themes are always stored, as the user's theme file might be gone the next time the file is read.
+        if themes.is_builtin(theme_name) and category["theme_settings"] == themes.get_theme(theme_name):
+            custom_theme = 0
+        else:
+            custom_theme = string_number(json.dumps(category["theme_settings"])) + 1
+
+        todo_items = category["todo_items"]
+
+        ints.extend((string_number(category["name"]), string_number(category.get("id", "")), string_number(theme_name), custom_theme, len(todo_items)))
+
+        for todo in todo_items:
+            ints.extend((string_number(todo["text"]) * 2 + bool(todo["is_checked"]), string_number(todo.get("id", ""))))
+
+    encoded_strings = [text.encode("utf-8") for text in strings]
+
+    sizes = array("I", [len(text) for text in encoded_strings])
+    numbers = array("I", ints)
+
+    if SWAP_BYTES:
+        sizes.byteswap()
+        numbers.byteswap()
+
+    blob = b"".join(encoded_strings)
+
+    return b"".join((
+        struct.pack("<III", len(strings), len(blob), len(numbers)),
+        sizes.tobytes(),
+        blob,
+        numbers.tobytes()
+    ))
+
+
+
+def build_file(project_blocks):
+    """Glues project blocks together into the content of a whole file."""
+    return b"".join(iter_file(project_blocks))
+
+
+
+def iter_file(project_blocks):
+    """The same as build_file, but hands over the content in pieces (so it can be written without gluing it together first)."""
+
+    yield MAGIC
+    yield struct.pack("<BI", FORMAT_VERSION, len(project_blocks))
+
+    for block in project_blocks:
+        yield struct.pack("<I", len(block))
+        yield block
+
+
+
+def encode(projects_data):
+    """Turns a list of project dictionaries into the content of a whole file."""
+    return build_file([encode_project(project_data) for project_data in projects_data])
+
+
+
+# --- READING ---
+
+def decode_project(block, format_version = FORMAT_VERSION):
+    """Turns a project block back into a project dictionary."""
+
+    string_count, blob_size, int_count = struct.unpack_from("<III", block, 0)
+    position = 12
+
+    # Read all the sizes and integers in one go
+    sizes = array("I")
+    sizes.frombytes(block[position:position + string_count * 4])
+    position += string_count * 4
+
+    blob = block[position:position + blob_size]
+    position += blob_size
+
+    ints = array("I")
+    ints.frombytes(block[position:position + int_count * 4])
+
+    if SWAP_BYTES:
+        sizes.byteswap()
+        ints.byteswap()
+
+    # Cut the blob back up into the strings
+    strings = []
+    start = 0
+    for size in sizes:
+        strings.append(blob[start:start + size].decode("utf-8"))
+        start += size
+
+    # Adds the id to a dictionary, unless it's empty (the data had no id)
+    def add_id(dictionary, id_number):
+        if strings[id_number]:
+            dictionary["id"] = strings[id_number]
+        return dictionary
+
+    # Walk through the integers in the same order they were written (version 1 has no ids)
+    project_data = {"name": strings[ints[0]]}
+
+    if format_version == 1:
+        category_count = ints[1]
+        i = 2
+    else:
+        add_id(project_data, ints[1])
+        category_count = ints[2]
+        i = 3
+
+    categories = []
+    for _ in range(category_count):
+        if format_version == 1:
+            category_name, theme_name, custom_theme, todo_count = ints[i:i + 4]
+            category_id = None
+            i += 4
+        else:
+            category_name, category_id, theme_name, custom_theme, todo_count = ints[i:i + 5]
+            i += 5
+
+        theme_name = strings[theme_name]
+
+        if custom_theme == 0:
+            theme_settings = dict(themes.get_theme(theme_name)) # A normal (writable) copy, the registry's settings are read-only
+        else:
+            theme_settings = json.loads(strings[custom_theme - 1])
+
+        if format_version == 1:
+            todo_items = [{"text": strings[value >> 1], "is_checked": bool(value & 1)} for value in ints[i:i + todo_count]]
+            i += todo_count
+        else:
+            values = ints[i:i + todo_count * 2]
+            todo_items = [
+                add_id({"text": strings[value >> 1], "is_checked": bool(value & 1)}, todo_id)
+                for value, todo_id in zip(values[0::2], values[1::2])
+            ]
+            i += todo_count * 2
+
+        category = {
+            "name": strings[category_name],
+            "theme_name": theme_name,
+            "theme_settings": theme_settings,
+            "todo_items": todo_items
+        }
+
+        if category_id is not None:
+            add_id(category, category_id)
+
+        categories.append(category)
+
+    project_data["categories"] = categories
+
+    return project_data
+
+
+
+def decode(content):
+    """Turns the content of a whole file back into a list of project dictionaries."""
+
+    if content[:4] != MAGIC:
+        raise ValueError("Not a to-do binary file")
+
+    format_version, project_count = struct.unpack_from("<BI", content, 4)
+
+    if format_version not in (1, FORMAT_VERSION):
+        raise ValueError(f"Unknown binary format version {format_version}")
+
+    position = 9
+    projects_data = []
+
+    for _ in range(project_count):
+        (block_size,) = struct.unpack_from("<I", content, position)
+        position += 4
+
+        projects_data.append(decode_project(content[position:position + block_size], format_version))
+        position += block_size
+
+    return projects_data
+
+
+
+def iter_blocks(path):
+    """
+    Reads a binary data file one project block at a time, without keeping the blocks that were already handed over.
+    Yields (block, start, end, format version) for every project, where start/end are the byte positions of the block in the file.
+    Raises a ValueError if the file is damaged or cut off (possibly after some blocks were already handed over).
+    """
+    with open(path, "rb") as f:
+        header = f.read(9)
+
+        if header[:4] != MAGIC or len(header) < 9:
+            raise ValueError(f"'{path}' is not a to-do binary file")
+
+        format_version, project_count = struct.unpack_from("<BI", header, 4)
+
+        if format_version not in (1, FORMAT_VERSION):
+            raise ValueError(f"Unknown binary format version {format_version}")
+
+        for _ in range(project_count):
+            size_bytes = f.read(4)
+            if len(size_bytes) < 4:
+                raise ValueError(f"'{path}' is shorter than expected")
+
+            (block_size,) = struct.unpack("<I", size_bytes)
+            start = f.tell()
+            block = f.read(block_size)
+
+            if len(block) < block_size:
+                raise ValueError(f"'{path}' is shorter than expected")
+
+            yield block, start, start + block_size, format_version
+
+
+
+def read_block(path, start, end, format_version = FORMAT_VERSION):
+    """Reads a single project again, using the start/end positions iter_blocks gave for it (raises a ValueError if it can't be read)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        block = f.read(end - start)
+
+    try:
+        return decode_project(block, format_version)
+    except (IndexError, struct.error, UnicodeDecodeError) as error:
+        raise ValueError(f"The project at byte {start} of '{path}' is damaged ({error})")
+
+
+
+def summarize_project(block, format_version = FORMAT_VERSION):
+    """
+    The name, id and counts of a project block, without turning the whole block into a dictionary
+    (only the name/id strings are decoded, the counts come from the integers).
+    """
+    string_count, blob_size, int_count = struct.unpack_from("<III", block, 0)
+    position = 12
+
+    sizes = array("I")
+    sizes.frombytes(block[position:position + string_count * 4])
+    position += string_count * 4
+    blob_start = position
+
+    ints = array("I")
+    ints.frombytes(block[blob_start + blob_size:blob_start + blob_size + int_count * 4])
+
+    if SWAP_BYTES:
+        sizes.byteswap()
+        ints.byteswap()
+
+    # Decodes a single string of the table (its position in the blob is the size of all the strings before it)
+    def get_string(number):
+        start = blob_start + sum(sizes[:number])
+        return block[start:start + sizes[number]].decode("utf-8")
+
+    summary = {"name": get_string(ints[0])}
+
+    # Same order as in decode_project, but only the number of to-do items and their "checked" bit are looked at
+    if format_version == 1:
+        category_count = ints[1]
+        i = 2
+        category_size, todo_size = 4, 1
+    else:
+        project_id = get_string(ints[1])
+        if project_id:
+            summary["id"] = project_id
+
+        category_count = ints[2]
+        i = 3
+        category_size, todo_size = 5, 2
+
+    todo_count = 0
+    done_count = 0
+
+    for _ in range(category_count):
+        category_todo_count = ints[i + category_size - 1]
+        i += category_size
+
+        todo_count += category_todo_count
+        done_count += sum(value & 1 for value in ints[i:i + category_todo_count * todo_size:todo_size])
+        i += category_todo_count * todo_size
+
+    summary["category_count"] = category_count
+    summary["todo_count"] = todo_count
+    summary["done_count"] = done_count
+
+    return summary
+
+
+
+# --- CONVERTING ---
+
+def json_to_binary(json_file, binary_file):
+    """Converts a json data file into a binary one."""
+
+    with open(json_file, "r") as f:
+        projects_data = json.load(f)
+
+    with open(binary_file, "wb") as f:
+        f.write(encode(projects_data))
+
@@ -3,26 +3,373 @@
 
 '''
 These are the different objects that store data. E.g., the project class/object stores information about it's name and which categories it contains.
+
+Each project and category keeps track of whether it has changed since the last save ("dirty").
+When saving, only the dirty ones are converted to json text again, the rest re-use the text from the previous save.
+
+To save without freezing the UI, a "snapshot" (a frozen copy of what needs to be saved) is taken on the main thread, and is converted to json text on another thread (see ProjectSnapshot/CategorySnapshot).
+The text is made in pieces (iter_json), so it can be written to the file while it's being made, instead of first building the text of everything.
+The cached text is kept in those pieces too, so a project's cached text shares the pieces of its categories' cached texts instead of being a second copy.
+
+Every project, category and to-do item has an "id" that never changes (not even when it's renamed) and is saved together with it.
+Data saved before ids existed simply gets new ids the first time it's loaded.
+
+Everything that adds, removes or renames something also tells the search index (see search.py), so searches stay up to date.
+
+To keep memory low with many to-do items, the classes use __slots__ (no per-object __dict__), and categories don't keep their own copy of the theme settings,
+they look up the shared settings by theme name (see themes.get_theme). Only categories with settings that don't match any theme keep their own.
 '''
 
+import json
+import os
+import sys
+import uuid
+from itertools import islice
+from todo_app.ui import themes
+from todo_app.core import search
+
+
+# Store every to-do text only once in memory, even if many to-do items have the same text (TODOAPP_INTERN_TEXT=1).
+# Saves memory when texts repeat a lot, but costs a little time when loading.
+INTERN_TEXT = os.environ.get("TODOAPP_INTERN_TEXT", "0") == "1"
+
+# Categories with at least this many to-do items store them as columns (see TodoArray) instead of one object per item
+ARRAY_THRESHOLD = int(os.environ.get("TODOAPP_ARRAY_THRESHOLD", "5000"))
+
+# How many to-do items are turned into dictionaries/json text at a time when saving (so a huge category never exists as dictionaries all at once)
+TODOS_PER_CHUNK = 1000
+
+
+
+# --- CHANGE RECORDING ---
+# Every change to the data is also described as a small dictionary, e.g. {"op": "add_todo", "project": ..., "category": ..., "todo": {...}}.
+# Storage modes that save change by change (like the journal) write these out, the others don't need them.
+pending_changes = []
+
+# If changes are recorded at all. The storage turns it off for the modes that don't use them (see storage.get_backend),
+# so e.g. finding the position of a checked to-do item isn't done on every click for nothing.
+recording_changes = True
+
+
+def record_change(op, make_details=None, **details):
+    """
+    Stores a description of a change so the storage can save just that change.
+    Details that take work to make (e.g. a dictionary of what was added) are given as a function, which is only called if changes are recorded.
+    """
+    if not recording_changes:
+        return
+
+    if make_details is not None:
+        details.update(make_details())
+
+    details["op"] = op
+    pending_changes.append(details)
+
+
+def take_changes():
+    """Returns all changes recorded since the last call and starts a new list"""
+    global pending_changes
+
+    changes = pending_changes
+    pending_changes = []
+
+    return changes
+
+
+def put_back_changes(changes):
+    """Puts changes that couldn't be saved back in front of the ones recorded since, so the next save tries them again"""
+    global pending_changes
+
+    pending_changes = changes + pending_changes
+
+
+def new_id():
+    """Creates a new, unique id (a random uuid as text)"""
+    return uuid.uuid4().hex
+
+
+def position(index):
+    """The extra details for a change that adds something at a position ({"index": ...}), nothing if it's added at the end"""
+    return {} if index is None else {"index": index}
+
+
+# --- PROJECT COLLECTION ---
+class ProjectCollection():
+    """
+    The list of all projects, in order, plus dictionaries of project name -> project and project id -> project.
+    Finding a project by name or id (or checking if a name is taken) is instant, no matter how many projects there are.
+    Can be looped over and indexed like a list.
+    """
+    __slots__ = ("projects", "by_name", "by_id")
+
+    def __init__(self, projects=None):
+        self.projects = []
+        self.by_name = {}
+        self.by_id = {}
+
+        for project in projects or []:
+            self.projects.append(project)
+            self.by_name[project.project_name] = project
+            self.by_id[project.id] = project
+
+
+    def __iter__(self):
+        return iter(self.projects)
+
+    def __len__(self):
+        return len(self.projects)
+
+    def __getitem__(self, index):
+        return self.projects[index]
+
+
+    # The project with this name, or None
+    def get(self, name):
+        return self.by_name.get(name)
+
+
+    # The project with this id, or None
+    def get_by_id(self, project_id):
+        return self.by_id.get(project_id)
+
+
+    # Check if a project with this name exists
+    def has_name(self, name):
+        return name in self.by_name
+
+
+    # Add a project to the end (or at a position, e.g. when a removed project is put back)
+    def add(self, project, index=None):
+        if index is None:
+            self.projects.append(project)
+        else:
+            self.projects.insert(index, project)
+
+        self.by_name[project.project_name] = project
+        self.by_id[project.id] = project
+        search.index.add_project(project)
+
+        record_change("add_project", lambda: {"project": project.to_dict()}, **position(index))
+
+
+    # Remove a project
+    def remove(self, project):
+        self.projects.remove(project)
+        del self.by_name[project.project_name]
+        del self.by_id[project.id]
+        search.index.remove_project(project)
+
+        record_change("remove_project", project=project.project_name)
+
+
+    # Give a project a new name (the caller checks that the name isn't taken)
+    def rename(self, project, new_name):
+        old_name = project.project_name
+
+        del self.by_name[old_name]
+        project.project_name = new_name
+        self.by_name[new_name] = project
+        project.mark_dirty()
+        search.index.rename_project(project)
+
+        record_change("rename_project", project=old_name, name=new_name)
+
+
+
 # --- PROJECT ---
 class Project():
     """
     The object that stores the data/information about a project
     """
-    def __init__(self, name, categories=None):
+    __slots__ = (
+        "project_name", "id", "version", "json_cache", "binary_cache",
+        "loader", "stub_category_count", "loaded_categories",
+        "category_index", "category_by_id", "todos_total", "todos_done"
+    )
+
+    def __init__(self, name, categories=None, loader=None, category_count=0, todo_count=0, done_count=0, id=None):
         self.project_name = name # Holds the name of the project
+        self.id = id or new_id() # Never changes, even if the project is renamed
+
+        # Goes up by one every time the project changes.
+        # The cached json text is stored together with the version it was made from, so it's only used if nothing changed since.
+        self.version = 0
+        self.json_cache = None # (version, text in pieces)
+        self.binary_cache = None # (version, bytes), only used by the binary storage mode
+
+        # LAZY LOADING
+            # If a loader (a function that returns the project's dictionary) is given, this is just a "stub" with the name and counts.
+            # The categories and to-do items are only created the first time they are needed (see the "categories" property below).
+        self.loader = loader
+        self.stub_category_count = category_count
+        self.loaded_categories = None
+
+        # The number of to-do items and done to-do items in all the categories.
+        # Kept up to date by the categories every time an item is added/removed/checked, so they never have to be counted again.
+        # (A stub gets them from the index, they are saved in the file together with the project)
+        self.todos_total = todo_count
+        self.todos_done = done_count
+
+        # Category name -> category and category id -> category, kept up to date together with the list of categories
+        self.category_index = {}
+        self.category_by_id = {}
 
         # If categories data exists, convert it into a list of Category objects
         if categories is not None:
-            self.categories = [Category(**cat_data) for cat_data in categories]
+            self.categories = [Category(project=self, **cat_data) for cat_data in categories]
+        elif loader is None:
+            self.categories = []
+
+
+    # The list of categories, created from the loader the first time it's used
+    @property
+    def categories(self):
+        if self.loaded_categories is None:
+            self.load()
+
+        return self.loaded_categories
+
+    @categories.setter
+    def categories(self, categories):
+        self.loaded_categories = categories
+        self.category_index = {category.category_name: category for category in categories}
+        self.category_by_id = {category.id: category for category in categories}
+
+        # Count once, from then on the categories keep the counts up to date
+        self.todos_total = sum(len(category.todo_items) for category in categories)
+        self.todos_done = sum(category.done_count for category in categories)
+
+
+    # Check if the categories have been created yet
+    def is_loaded(self):
+        return self.loaded_categories is not None
+
+
+    # Create the category and to-do objects from the loader (if that hasn't been done already)
+    def load(self):
+        if self.is_loaded():
+            return
+
+        project_data = self.loader() if self.loader is not None else None
+
+        if project_data is not None:
+            self.categories = [Category(project=self, **cat_data) for cat_data in project_data["categories"]]
         else:
             self.categories = []
 
+        # The loader isn't needed anymore (this also lets go of the project's dictionary)
+        self.loader = None
+
+
+    # Number of categories, to-do items and done to-do items, without creating the objects if they aren't loaded yet
+    def category_count(self):
+        if not self.is_loaded():
+            return self.stub_category_count
+
+        return len(self.categories)
+
+    def todo_count(self):
+        return self.todos_total
+
+    def done_count(self):
+        return self.todos_done
+
+
+    # Called by a category when to-do items were added/removed or checked/unchecked
+    def change_counts(self, todo_change, done_change):
+        self.todos_total += todo_change
+        self.todos_done += done_change
+
+
+    # Flag the project as changed so it gets re-serialized on the next save
+    def mark_dirty(self):
+        self.version += 1
+
+
+    # Check if the project changed since its json text was last made
+    def is_dirty(self):
+        return self.json_cache is None or self.json_cache[0] != self.version
+
+
+    # The category with this name, or None
+    def get_category(self, name):
+        self.load()
+        return self.category_index.get(name)
+
+
+    # The category with this id, or None
+    def get_category_by_id(self, category_id):
+        self.load()
+        return self.category_by_id.get(category_id)
+
+
+    # Check if a category with this name exists
+    def has_category(self, name):
+        return self.get_category(name) is not None
+
+
+    # Add a category to the project (at the end, or at a position)
+    def add_category(self, category, index=None):
+        category.project = self
+
+        if index is None:
+            self.categories.append(category)
+        else:
+            self.categories.insert(index, category)
+
+        self.category_index[category.category_name] = category
+        self.category_by_id[category.id] = category
+        self.change_counts(len(category.todo_items), category.done_count)
+        self.mark_dirty()
+        search.index.add_category(category)
+
+        record_change("add_category", lambda: {"category": category.to_dict()}, project=self.project_name, **position(index))
+
+
+    # Remove a category from the project
+    def remove_category(self, category):
+        self.categories.remove(category)
+        del self.category_index[category.category_name]
+        del self.category_by_id[category.id]
+        self.change_counts(-len(category.todo_items), -category.done_count)
+        search.index.remove_category(category)
+        category.project = None
+        self.mark_dirty()
+
+        record_change("remove_category", project=self.project_name, category=category.category_name)
+
+
+    # Give a category a new name (the caller checks that the name isn't taken)
+    def rename_category(self, category, new_name):
+        old_name = category.category_name
+
+        del self.category_index[old_name]
+        category.category_name = new_name
+        self.category_index[new_name] = category
+        category.mark_dirty()
+        search.index.rename_category(category)
+
+        record_change("rename_category", project=self.project_name, category=old_name, name=new_name)
+
 
     # Convert the project to a dictionary so it can be saved out as json
     def to_dict(self):
 
+        # If the project was never opened, its dictionary is what the loader returns
+        # (with the project's id, in case the saved data doesn't have one yet, and its name, in case it was renamed)
+        if not self.is_loaded():
+            project_data = self.loader()
+
+            # If its saved data couldn't be read (e.g. a damaged file), it's an empty project, the same as when it's opened
+            if project_data is None:
+                return {"id": self.id, "name": self.project_name, "todo_count": 0, "done_count": 0, "categories": []}
+
+            project_data["id"] = self.id
+            project_data["name"] = self.project_name
+            project_data["todo_count"] = self.todos_total
+            project_data["done_count"] = self.todos_done
+            return project_data
+
         # Initialize the list that will hold all the category dictionaries
         category_dicts = []
 
@@ -33,61 +380,644 @@ class Project():
 
         # Return a dictionary
         return {
+        "id": self.id,
         "name": self.project_name,
+        "todo_count": self.todos_total, # (So the counts can be shown without reading the categories, see load_index in storage.py)
+        "done_count": self.todos_done,
         "categories": category_dicts
         }
 
 
+    # Take a snapshot of what is needed to save the project.
+    # Returns the cached json text if nothing changed, otherwise a ProjectSnapshot that can make the text (on any thread).
+    def snapshot(self):
+        if not self.is_dirty():
+            return self.json_cache[1]
+
+        return ProjectSnapshot(self)
+
+
+    # Convert the project to json text, re-using the text from the last save if nothing changed
+    def to_json(self):
+        return snapshot_to_json(self.snapshot())
+
+
+    # The same as to_json, but the text is handed over in pieces (e.g. to write them to a file as they come)
+    def iter_json(self):
+        return snapshot_iter_json(self.snapshot())
+
+
 
 class Category():
     """
     The object that stores the data/information about a category
     """
+    __slots__ = (
+        "category_name", "id", "theme_name", "custom_theme_settings", "project",
+        "version", "json_cache", "todo_items", "todo_by_id", "done_count"
+    )
 
-    def __init__(self, name, theme_name, theme_settings, todo_items=None):
+    def __init__(self, name, theme_name, theme_settings, todo_items=None, project=None, id=None):
         self.category_name = name
-        self.theme_name = theme_name
-        self.theme_settings = theme_settings
-        
-        # If todo_items data exists, convert it into a list of Todo objects
-        if todo_items is not None:
+        self.id = id or new_id() # Never changes, even if the category is renamed
+
+        # The theme name is shared by many categories, so only one copy of each name is kept
+        self.theme_name = sys.intern(theme_name)
+
+        # Only kept if the settings don't match the theme's settings, otherwise the shared settings are used (see the theme_settings property)
+        self.custom_theme_settings = None
+        self.store_theme_settings(theme_settings)
+
+        # The project this category belongs to (gets told when the category changes)
+        self.project = project
+
+        # Goes up by one every time the category changes (see the project's version above)
+        self.version = 0
+        self.json_cache = None # (version, text in pieces)
+
+        # If todo_items data exists, convert it into a list of Todo objects (or a TodoArray if there are a lot of them)
+        if todo_items is not None and len(todo_items) >= ARRAY_THRESHOLD:
+            self.todo_items = TodoArray(todo_items)
+        elif todo_items is not None:
             self.todo_items = [Todo(**todo_data) for todo_data in todo_items]
         else:
             self.todo_items = []
 
+        # To-do id -> to-do item (a TodoArray finds items by id itself, so it's None then)
+        if isinstance(self.todo_items, TodoArray):
+            self.todo_by_id = None
+        else:
+            self.todo_by_id = {todo.id: todo for todo in self.todo_items}
+
+        # The number of checked/done to-do items (the total is just the length of the list).
+        # Counted once here, then kept up to date by add_todo/remove_todo/set_checked/set_all_checked.
+        if isinstance(self.todo_items, TodoArray):
+            self.done_count = self.todo_items.count_checked()
+        else:
+            self.done_count = sum(1 for todo in self.todo_items if todo.is_checked)
+
+
+    # The theme settings: the shared (read-only) settings of the theme, or the category's own if they don't match any theme
+    @property
+    def theme_settings(self):
+        if self.custom_theme_settings is not None:
+            return self.custom_theme_settings
+
+        return themes.get_theme(self.theme_name)
+
+
+    # Only keep the settings if they are different from the shared settings of the theme
+    def store_theme_settings(self, theme_settings):
+        if theme_settings == themes.get_theme(self.theme_name):
+            self.custom_theme_settings = None
+        else:
+            self.custom_theme_settings = theme_settings
+
+
+    # Flag the category (and the project it's in) as changed
+    def mark_dirty(self):
+        self.version += 1
+
+        if self.project is not None:
+            self.project.mark_dirty()
+
+
+    # Check if the category changed since its json text was last made
+    def is_dirty(self):
+        return self.json_cache is None or self.json_cache[0] != self.version
+
+
+    # Record a change to this category, but only if it's part of a project (changes before that are saved with the project itself)
+    def record_change(self, op, make_details=None, **details):
+        if self.project is not None:
+            record_change(op, make_details, project=self.project.project_name, category=self.category_name, **details)
+
+
+    # Change the done count (and the counts of the project it's in) when to-do items are added/removed or checked/unchecked
+    def change_counts(self, todo_change, done_change):
+        self.done_count += done_change
+
+        if self.project is not None:
+            self.project.change_counts(todo_change, done_change)
+
+
+    # The to-do item with this id, or None
+    def get_todo(self, todo_id):
+        if self.todo_by_id is None:
+            return self.todo_items.get(todo_id)
+
+        return self.todo_by_id.get(todo_id)
+
+
+    # Add a to-do item to the end of the list (or at a position)
+    def add_todo(self, todo, index=None):
+        if index is None:
+            self.todo_items.append(todo)
+        else:
+            self.todo_items.insert(index, todo)
+
+        if self.todo_by_id is not None:
+            self.todo_by_id[todo.id] = todo
+
+            # Switch to a TodoArray once the list gets big
+            if len(self.todo_items) >= ARRAY_THRESHOLD:
+                self.todo_items = TodoArray([todo.to_dict() for todo in self.todo_items])
+                self.todo_by_id = None
+
+        self.change_counts(1, 1 if todo.is_checked else 0)
+        self.mark_dirty()
+        search.index.add_todo(self, todo)
+
+        self.record_change("add_todo", lambda: {"todo": todo.to_dict()}, **position(index))
+
+
+    # Remove a to-do item from the list
+    def remove_todo(self, todo):
+        index = self.todo_items.index(todo)
+
+        # (Read before removing it, an item of a TodoArray reads its value from the array)
+        was_checked = todo.is_checked
+        del self.todo_items[index]
+
+        if self.todo_by_id is not None:
+            del self.todo_by_id[todo.id]
+
+        self.change_counts(-1, -1 if was_checked else 0)
+        self.mark_dirty()
+        search.index.remove_todo(todo)
+
+        self.record_change("remove_todo", index=index)
+
+
+    # Check/uncheck a to-do item
+    def set_checked(self, todo, is_checked):
+        if bool(todo.is_checked) != bool(is_checked):
+            self.change_counts(0, 1 if is_checked else -1)
+
+        todo.is_checked = is_checked
+        self.mark_dirty()
+
+        # (Finding the item's position means going through the list, so it's only done if the change is recorded)
+        self.record_change("set_checked", lambda: {"index": self.todo_items.index(todo)}, is_checked=is_checked)
+
+
+    # Check/uncheck every to-do item at once
+    def set_all_checked(self, is_checked):
+        if isinstance(self.todo_items, TodoArray):
+            self.todo_items.set_all_checked(is_checked)
+        else:
+            for todo in self.todo_items:
+                todo.is_checked = is_checked
+
+        self.change_counts(0, (len(self.todo_items) if is_checked else 0) - self.done_count)
+        self.mark_dirty()
+
+        self.record_change("set_all_checked", is_checked=is_checked)
+
+
+    # The number of checked/done to-do items
+    def count_checked(self):
+        return self.done_count
+
+
+    # Change the theme of the category
+    def set_theme(self, theme_name, theme_settings):
+        self.theme_name = sys.intern(theme_name)
+        self.store_theme_settings(theme_settings)
+        self.mark_dirty()
+
+        self.record_change("set_theme", lambda: {"theme_settings": dict(theme_settings)}, theme_name=theme_name)
+
+
     # Convert the category to a dictionary so it can be saved out as json
     def to_dict(self):
 
-        # Initialize the list that will hold all the todo dictionaries
-        todo_dicts = []
+        # A TodoArray makes all the dictionaries straight from its columns
+        if isinstance(self.todo_items, TodoArray):
+            todo_dicts = self.todo_items.to_dicts()
+
+        else:
+            # Initialize the list that will hold all the todo dictionaries
+            todo_dicts = []
 
-        # For every to_do item, create a dict of it and add it to a new list
-        for todo in self.todo_items:
-            todo_dict = todo.to_dict()
-            todo_dicts.append(todo_dict)
+            # For every to_do item, create a dict of it and add it to a new list
+            for todo in self.todo_items:
+                todo_dict = todo.to_dict()
+                todo_dicts.append(todo_dict)
 
         # Return a dictionary
         return {
+        "id": self.id,
         "name": self.category_name,
         "theme_name": self.theme_name,
-        "theme_settings": self.theme_settings,
+        "theme_settings": dict(self.theme_settings), # A normal (writable) copy, the shared settings are read-only
         "todo_items": todo_dicts
         }
 
 
+    # Take a snapshot of what is needed to save the category (the cached json text if nothing changed)
+    def snapshot(self):
+        if not self.is_dirty():
+            return self.json_cache[1]
+
+        return CategorySnapshot(self)
+
+
+    # Convert the category to json text, re-using the text from the last save if nothing changed
+    def to_json(self):
+        return snapshot_to_json(self.snapshot())
+
+
+    # The same as to_json, but the text is handed over in pieces
+    def iter_json(self):
+        return snapshot_iter_json(self.snapshot())
+
+
 
 class Todo():
     """
     The object that stores the data/information about an indvidual to do item
     """
-    def __init__(self, text, is_checked=False):
-        self.text = text
+    __slots__ = ("text", "is_checked", "id")
+
+    def __init__(self, text, is_checked=False, id=None):
+        self.text = sys.intern(text) if INTERN_TEXT else text
         self.is_checked = is_checked
+        self.id = id or new_id()
 
 
     # Convert the todo item to a dictionary so it can be saved out as json
     def to_dict(self):
         return {
+            "id": self.id,
             "text": self.text,
             "is_checked": self.is_checked
-        }
\ No newline at end of file
+        }
+
+
+
+# --- TO-DO ARRAY ---
+class TodoArray():
+    """
+    Stores a (big) list of to-do items as "columns" instead of one object per item: one list with all the ids, one with all the texts, and one byte per item for checked/not checked.
+    From the outside it works like a list of to-do items (len, loops, index, slices, append, del), single items are handed out as TodoRef objects.
+    Counting done items, checking/unchecking everything and saving work on whole columns at once instead of item by item.
+    """
+    __slots__ = ("ids", "texts", "checked", "positions", "correct_until")
+
+    def __init__(self, todo_dicts=()):
+        self.ids = [todo_data.get("id") or new_id() for todo_data in todo_dicts]
+
+        # Id -> position, so an item is found by its id without going through the whole list.
+        # Adding/removing an item in the middle moves every item after it, so instead of fixing all of their positions right away,
+        # only the positions before "correct_until" are known to be right. The rest are fixed the first time one of them is looked up.
+        self.positions = {todo_id: position for position, todo_id in enumerate(self.ids)}
+        self.correct_until = len(self.ids)
+
+        if INTERN_TEXT:
+            self.texts = [sys.intern(todo_data["text"]) for todo_data in todo_dicts]
+        else:
+            self.texts = [todo_data["text"] for todo_data in todo_dicts]
+
+        self.checked = bytearray(bool(todo_data.get("is_checked", False)) for todo_data in todo_dicts)
+
+
+    def __len__(self):
+        return len(self.ids)
+
+
+    def __iter__(self):
+        for position in range(len(self.ids)):
+            yield TodoRef(self, position)
+
+
+    # A single item (TodoRef) or a list of them for a slice
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TodoRef(self, position) for position in range(*index.indices(len(self.ids)))]
+
+        if index < 0:
+            index += len(self.ids)
+
+        return TodoRef(self, index)
+
+
+    def __delitem__(self, index):
+        if index < 0:
+            index += len(self.ids)
+
+        del self.positions[self.ids[index]]
+        self.correct_until = min(self.correct_until, index)
+
+        del self.ids[index]
+        del self.texts[index]
+        del self.checked[index]
+
+
+    # Add a to-do item (a Todo or TodoRef) to the end
+    def append(self, todo):
+        # (If every position is right so far, the new one is too)
+        if self.correct_until == len(self.ids):
+            self.correct_until += 1
+        self.positions[todo.id] = len(self.ids)
+
+        self.ids.append(todo.id)
+        self.texts.append(todo.text)
+        self.checked.append(bool(todo.is_checked))
+
+
+    # Add a to-do item at a position (like list.insert, a position past the end adds it at the end)
+    def insert(self, index, todo):
+        if index < 0:
+            index = max(0, index + len(self.ids))
+        index = min(index, len(self.ids))
+
+        self.positions[todo.id] = index
+        self.correct_until = min(self.correct_until, index)
+
+        self.ids.insert(index, todo.id)
+        self.texts.insert(index, todo.text)
+        self.checked.insert(index, bool(todo.is_checked))
+
+
+    # The position of the item with this id, or None if there is none
+    def position_of(self, todo_id):
+        position = self.positions.get(todo_id)
+
+        if position is None:
+            return None
+
+        if position >= self.correct_until:
+            # Fix the positions that were moved by adding/removing items in the middle (once for all of them)
+            ids = self.ids
+            for new_position in range(self.correct_until, len(ids)):
+                self.positions[ids[new_position]] = new_position
+            self.correct_until = len(ids)
+
+            position = self.positions[todo_id]
+
+        return position
+
+
+    # The position of a to-do item
+    def index(self, todo):
+        if isinstance(todo, TodoRef) and todo.array is self:
+            return todo.find()
+
+        position = self.position_of(todo.id)
+
+        if position is None:
+            raise ValueError(f"{todo.id!r} is not in the list")
+
+        return position
+
+
+    # The item with this id, or None
+    def get(self, todo_id):
+        position = self.position_of(todo_id)
+        return TodoRef(self, position) if position is not None else None
+
+
+    def count_checked(self):
+        return self.checked.count(1)
+
+
+    def set_all_checked(self, is_checked):
+        self.checked[:] = (b"\x01" if is_checked else b"\x00") * len(self.checked)
+
+
+    # Copies of the columns, used for snapshots (copying a whole list is much faster than copying item by item)
+    def copy_columns(self):
+        return list(self.ids), list(self.texts), bytes(self.checked)
+
+
+    def to_dicts(self):
+        return [
+            {"id": todo_id, "text": text, "is_checked": bool(is_checked)}
+            for todo_id, text, is_checked in zip(self.ids, self.texts, self.checked)
+        ]
+
+
+
+class TodoRef():
+    """
+    A single to-do item inside a TodoArray. Reading/changing it reads/changes the array's columns.
+    """
+    __slots__ = ("array", "position", "id")
+
+    def __init__(self, array, position):
+        self.array = array
+        self.position = position
+        self.id = array.ids[position]
+
+
+    # The item's current position. If items before it were removed it has moved, so it's looked up by its id again.
+    def find(self):
+        ids = self.array.ids
+
+        if self.position >= len(ids) or ids[self.position] is not self.id:
+            position = self.array.position_of(self.id)
+
+            if position is None:
+                raise ValueError(f"{self.id!r} is not in the list")
+
+            self.position = position
+
+        return self.position
+
+
+    @property
+    def text(self):
+        return self.array.texts[self.find()]
+
+
+    @property
+    def is_checked(self):
+        return bool(self.array.checked[self.find()])
+
+    @is_checked.setter
+    def is_checked(self, is_checked):
+        self.array.checked[self.find()] = bool(is_checked)
+
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "text": self.text,
+            "is_checked": self.is_checked
+        }
+
+
+
+# --- SNAPSHOTS ---
+
+def snapshot_to_json(snapshot):
+    """Turns a snapshot into json text (a snapshot is either already text in pieces (a tuple), or a Project/CategorySnapshot)"""
+    if isinstance(snapshot, tuple):
+        return "".join(snapshot)
+
+    return snapshot.to_json()
+
+
+
+def snapshot_iter_json(snapshot):
+    """The same as snapshot_to_json, but hands over the text in pieces"""
+    if isinstance(snapshot, tuple):
+        yield from snapshot
+    else:
+        yield from snapshot.iter_json()
+
+
+
+class ProjectSnapshot():
+    """
+    A frozen copy of a project's data, taken on the main thread. Turning it into json text can then be done on another thread.
+    """
+    def __init__(self, project):
+        self.project = project
+        self.version = project.version
+        self.id = project.id
+        self.name = project.project_name
+        self.todo_count = project.todo_count()
+        self.done_count = project.done_count()
+
+        # A project that was never opened is saved straight from its dictionary, which never changes.
+        # The dictionary is only read (with the loader) when the text is made, so the dictionaries of all unopened projects never exist at the same time.
+        if not project.is_loaded():
+            self.loader = project.loader
+            self.categories = None
+
+        # Otherwise, snapshot the categories (the ones that didn't change just hand over their cached text)
+        else:
+            self.loader = None
+            self.categories = [category.snapshot() for category in project.categories]
+
+
+    def to_json(self):
+        return "".join(self.iter_json())
+
+
+    # Make the json text piece by piece, handing over every piece as soon as it's made
+    def iter_json(self):
+
+        # The text of a project that was never opened isn't cached, it would keep the whole project in memory (which lazy loading avoids).
+        # (The json storage copies it from the data file instead, see JsonBackend.snapshot_project in storage.py)
+        if self.categories is None:
+            yield from self.make_pieces()
+            return
+
+        pieces = []
+
+        for piece in self.make_pieces():
+            pieces.append(piece)
+            yield piece
+
+        # Cache the text, marked with the version it was made from.
+        # If the project was changed in the meantime, the version won't match and the text won't be used.
+        # (The pieces made by the categories are the same ones the categories cache, so they aren't stored twice)
+        self.project.json_cache = (self.version, tuple(pieces))
+
+
+    def make_pieces(self):
+        if self.categories is None:
+            project_data = self.loader()
+
+            # (An empty project if its saved data couldn't be read, see Project.to_dict)
+            if project_data is None:
+                project_data = {"categories": []}
+                self.todo_count = self.done_count = 0
+
+            # Categories and to-do items from before ids existed get one here, so they keep it from the next launch on
+            for category in project_data["categories"]:
+                category.setdefault("id", new_id())
+
+                for todo in category["todo_items"]:
+                    todo.setdefault("id", new_id())
+
+            # (With the project's id, in case the saved data doesn't have one yet, its name, in case it was renamed, and its counts, in case the data is from before they were saved)
+            yield json.dumps({
+                "id": self.id,
+                "name": self.name,
+                "todo_count": self.todo_count,
+                "done_count": self.done_count,
+                "categories": project_data["categories"]
+            })
+            return
+
+        yield (
+            '{"id": ' + json.dumps(self.id) + ', "name": ' + json.dumps(self.name)
+            + ', "todo_count": ' + str(self.todo_count) + ', "done_count": ' + str(self.done_count) + ', "categories": ['
+        )
+
+        for number, category in enumerate(self.categories):
+            if number > 0:
+                yield ", "
+            yield from snapshot_iter_json(category)
+
+        yield ']}'
+
+
+
+class CategorySnapshot():
+    """
+    A frozen copy of a category's data (see ProjectSnapshot)
+    """
+    def __init__(self, category):
+        self.category = category
+        self.version = category.version
+        self.id = category.id
+        self.name = category.category_name
+        self.theme_name = category.theme_name
+        self.theme_settings = category.theme_settings
+
+        # Copy just the values of the to-do items, so later changes to the items don't affect the snapshot
+        if isinstance(category.todo_items, TodoArray):
+            self.todo_values = category.todo_items.copy_columns() # (ids, texts, checked), turned into items on the save thread
+        else:
+            self.todo_values = [(todo.id, todo.text, todo.is_checked) for todo in category.todo_items]
+
+
+    def to_json(self):
+        return "".join(self.iter_json())
+
+
+    # Make the json text piece by piece (see ProjectSnapshot.iter_json)
+    def iter_json(self):
+        pieces = []
+
+        for piece in self.make_pieces():
+            pieces.append(piece)
+            yield piece
+
+        self.category.json_cache = (self.version, tuple(pieces))
+
+
+    def make_pieces(self):
+        if isinstance(self.todo_values, tuple):
+            ids, texts, checked = self.todo_values
+            todo_values = zip(ids, texts, map(bool, checked))
+        else:
+            todo_values = iter(self.todo_values)
+
+        # Everything before the to-do items (the text of the category with no items, without the closing "]}")
+        yield json.dumps({
+            "id": self.id,
+            "name": self.name,
+            "theme_name": self.theme_name,
+            "theme_settings": dict(self.theme_settings),
+            "todo_items": []
+        })[:-2]
+
+        # The to-do items, TODOS_PER_CHUNK at a time (the text is the same as if they were all turned into json at once)
+        is_first_chunk = True
+
+        while True:
+            todo_dicts = [{"id": todo_id, "text": text, "is_checked": is_checked} for todo_id, text, is_checked in islice(todo_values, TODOS_PER_CHUNK)]
+            if not todo_dicts:
+                break
+
+            chunk_json = json.dumps(todo_dicts)[1:-1] # Without the [ ]
+            yield chunk_json if is_first_chunk else ", " + chunk_json
+            is_first_chunk = False
+
+        yield ']}'
@@ -0,0 +1,339 @@
+'''
+Undo/redo for the changes made in the app (Ctrl+Z / Ctrl+Y).
+
+Every change the user makes goes through a "command" here (e.g. history.remove_todo(category, todo)), which makes the change and
+remembers a "step": a small description of how to do the change again and how to undo it, e.g. {"op": "add_todo", "todo": {...}, "index": 3}
+to undo removing a to-do item. Only the thing that changed is remembered (never a copy of all the data), and things are found by their ids,
+so a step stays small no matter how much data there is, and still works after a project/category was renamed.
+
+Only the last HISTORY_SIZE steps are kept (the oldest ones are dropped). The steps can be saved to a file when the app closes
+and loaded again at the next launch (see storage.save_history/load_history).
+'''
+
+import os
+from collections import deque
+from todo_app.core import data
+from todo_app.ui import themes
+
+
+# How many steps can be undone
+HISTORY_SIZE = int(os.environ.get("TODOAPP_HISTORY_SIZE", "100"))
+
+
+
+class History():
+    """
+    The list of steps that can be undone, and the list of undone steps that can be redone.
+    """
+    def __init__(self, projects, size=None):
+        self.projects = projects # The ProjectCollection the changes are made to
+
+        size = HISTORY_SIZE if size is None else size
+
+        # A deque with a maxlen drops the oldest step by itself once it's full
+        self.undo_steps = deque(maxlen=size)
+        self.redo_steps = deque(maxlen=size)
+
+
+
+    # --- COMMANDS (make a change and remember how to undo it) ---
+    # Adding keeps the object itself (so it's the same one the caller has), plus its dictionary from right now, which is what gets saved
+    # (a new project/category is still empty, so the saved history doesn't grow with everything that's added to it later, see action_to_dict)
+
+    def add_project(self, project):
+        self.run(
+            "add project",
+            do = {"op": "add_project", "project": project, "index": None, "saved": {"project": project.to_dict()}},
+            undo = {"op": "remove_project", "project_id": project.id}
+        )
+
+
+    def remove_project(self, project):
+        # Keep the project's data in memory, its saved data might be deleted once it's removed (e.g. its file in "sharded" mode)
+        project.load()
+
+        self.run(
+            "remove project",
+            do = {"op": "remove_project", "project_id": project.id},
+            undo = {"op": "add_project", "project": project, "index": self.projects.projects.index(project)}
+        )
+
+
+    def rename_project(self, project, new_name):
+        self.run(
+            "rename project",
+            do = {"op": "rename_project", "project_id": project.id, "name": new_name},
+            undo = {"op": "rename_project", "project_id": project.id, "name": project.project_name}
+        )
+
+
+    def add_category(self, project, category):
+        self.run(
+            "add category",
+            do = {"op": "add_category", "project_id": project.id, "category": category, "index": None, "saved": {"category": category.to_dict()}},
+            undo = {"op": "remove_category", "project_id": project.id, "category_id": category.id}
+        )
+
+
+    def remove_category(self, project, category):
+        self.run(
+            "remove category",
+            do = {"op": "remove_category", "project_id": project.id, "category_id": category.id},
+            undo = {"op": "add_category", "project_id": project.id, "category": category, "index": project.categories.index(category)}
+        )
+
+
+    def rename_category(self, category, new_name):
+        self.run(
+            "rename category",
+            do = {**category_ids(category), "op": "rename_category", "name": new_name},
+            undo = {**category_ids(category), "op": "rename_category", "name": category.category_name}
+        )
+
+
+    def set_theme(self, category, theme_name, theme_settings):
+        self.run(
+            "change theme",
+            do = theme_action(category, theme_name, theme_settings),
+            undo = theme_action(category, category.theme_name, category.theme_settings)
+        )
+
+
+    def add_todo(self, category, todo):
+        self.run(
+            "add to-do",
+            do = {**category_ids(category), "op": "add_todo", "todo": todo, "index": None, "saved": {"todo": todo.to_dict()}},
+            undo = {**category_ids(category), "op": "remove_todo", "todo_id": todo.id}
+        )
+
+
+    def remove_todo(self, category, todo):
+        self.run(
+            "remove to-do",
+            do = {**category_ids(category), "op": "remove_todo", "todo_id": todo.id},
+            undo = {**category_ids(category), "op": "add_todo", "todo": todo.to_dict(), "index": category.todo_items.index(todo)}
+        )
+
+
+    def set_checked(self, category, todo, is_checked):
+        self.run(
+            "check to-do",
+            do = {**category_ids(category), "op": "set_checked", "todo_id": todo.id, "is_checked": is_checked},
+            undo = {**category_ids(category), "op": "set_checked", "todo_id": todo.id, "is_checked": todo.is_checked}
+        )
+
+
+    def set_all_checked(self, category, is_checked):
+        # Undoing only changes back the items that this changed (the ones that already were checked/unchecked stay that way)
+        changed_ids = [todo.id for todo in category.todo_items if todo.is_checked != is_checked]
+
+        self.run(
+            "check all to-dos" if is_checked else "uncheck all to-dos",
+            do = {**category_ids(category), "op": "set_all_checked", "is_checked": is_checked},
+            undo = {**category_ids(category), "op": "set_checked_many", "todo_ids": changed_ids, "is_checked": not is_checked}
+        )
+
+
+
+    # --- UNDO / REDO ---
+
+    # Make the change and remember the step (a new change means the undone steps can't be redone anymore)
+    def run(self, label, do, undo):
+        self.apply(do)
+        self.undo_steps.append({"label": label, "do": do, "undo": undo})
+        self.redo_steps.clear()
+
+
+    # Forget every step (e.g. after all projects were replaced by an import)
+    def clear(self):
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+
+
+    def can_undo(self):
+        return len(self.undo_steps) > 0
+
+    def can_redo(self):
+        return len(self.redo_steps) > 0
+
+
+    def undo(self):
+        """Undoes the last step. Returns the step, or None if there was nothing (that could be) undone."""
+
+        if not self.undo_steps:
+            return None
+
+        step = self.undo_steps.pop()
+
+        if not self.apply(step["undo"]):
+            return None
+
+        self.redo_steps.append(step)
+        return step
+
+
+    def redo(self):
+        """Does the last undone step again. Returns the step, or None if there was nothing (that could be) redone."""
+
+        if not self.redo_steps:
+            return None
+
+        step = self.redo_steps.pop()
+
+        if not self.apply(step["do"]):
+            return None
+
+        self.undo_steps.append(step)
+        return step
+
+
+    def apply(self, action):
+        """
+        Makes the change an action describes (through the data objects, so the storage and search index find out about it too).
+        Returns False if it can't be done anymore, e.g. the project it's about doesn't exist or a project with the same name was created since.
+        """
+        op = action["op"]
+
+        if op == "add_project":
+            project = as_project(action["project"])
+            if self.projects.has_name(project.project_name) or self.projects.get_by_id(project.id) is not None:
+                return failed(action)
+
+            self.projects.add(project, action["index"])
+            return True
+
+        project = self.projects.get_by_id(action["project_id"])
+        if project is None:
+            return failed(action)
+
+        if op == "remove_project":
+            self.projects.remove(project)
+            return True
+
+        if op == "rename_project":
+            if self.projects.has_name(action["name"]) and self.projects.get(action["name"]) is not project:
+                return failed(action)
+
+            self.projects.rename(project, action["name"])
+            return True
+
+        if op == "add_category":
+            category = as_category(action["category"])
+            if project.has_category(category.category_name) or project.get_category_by_id(category.id) is not None:
+                return failed(action)
+
+            project.add_category(category, action["index"])
+            return True
+
+        category = project.get_category_by_id(action["category_id"])
+        if category is None:
+            return failed(action)
+
+        if op == "remove_category":
+            project.remove_category(category)
+
+        elif op == "rename_category":
+            if project.has_category(action["name"]) and project.get_category(action["name"]) is not category:
+                return failed(action)
+
+            project.rename_category(category, action["name"])
+
+        elif op == "set_theme":
+            category.set_theme(action["theme_name"], action["theme_settings"] or themes.get_theme(action["theme_name"]))
+
+        elif op == "add_todo":
+            category.add_todo(as_todo(action["todo"]), action["index"])
+
+        elif op == "set_all_checked":
+            category.set_all_checked(action["is_checked"])
+
+        elif op == "set_checked_many":
+            for todo_id in action["todo_ids"]:
+                todo = category.get_todo(todo_id)
+
+                # (An item that was removed since is skipped, the others are still changed back)
+                if todo is not None:
+                    category.set_checked(todo, action["is_checked"])
+
+        else:
+            todo = category.get_todo(action["todo_id"])
+            if todo is None:
+                return failed(action)
+
+            if op == "remove_todo":
+                category.remove_todo(todo)
+            elif op == "set_checked":
+                category.set_checked(todo, action["is_checked"])
+
+        return True
+
+
+
+    # --- SAVING ---
+
+    def to_dict(self):
+        """The history as a dictionary that can be saved as json (removed projects/categories are turned into dictionaries)"""
+        return {
+            "undo": [step_to_dict(step) for step in self.undo_steps],
+            "redo": [step_to_dict(step) for step in self.redo_steps]
+        }
+
+
+    def load_dict(self, history_data):
+        """Puts back the steps from a dictionary made by to_dict"""
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+
+        self.undo_steps.extend(history_data.get("undo", []))
+        self.redo_steps.extend(history_data.get("redo", []))
+
+
+
+# --- HELPERS ---
+
+# The ids that lead to a category (used by the to-do actions)
+def category_ids(category):
+    return {"project_id": category.project.id, "category_id": category.id}
+
+
+# An action that sets a category's theme. Only custom settings are stored, the settings of a theme are looked up by name.
+def theme_action(category, theme_name, theme_settings):
+    custom_settings = None if theme_settings == themes.get_theme(theme_name) else dict(theme_settings)
+
+    return {**category_ids(category), "op": "set_theme", "theme_name": theme_name, "theme_settings": custom_settings}
+
+
+# Projects/categories in actions are the objects themselves (no copy is needed, they aren't used anymore after being removed),
+# or dictionaries when the history was loaded from a file
+def as_project(project):
+    return data.Project(**project) if isinstance(project, dict) else project
+
+def as_category(category):
+    return data.Category(**category) if isinstance(category, dict) else category
+
+def as_todo(todo):
+    return data.Todo(**todo) if isinstance(todo, dict) else todo
+
+
+def step_to_dict(step):
+    return {"label": step["label"], "do": action_to_dict(step["do"]), "undo": action_to_dict(step["undo"])}
+
+def action_to_dict(action):
+
+    # An action that adds an object it holds itself also has the object's dictionary from when the action was made, which is saved instead.
+    # (The object might have changed since, but by the time the action is done again those later changes have been undone)
+    if "saved" in action:
+        return {**{key: value for key, value in action.items() if key != "saved"}, **action["saved"]}
+
+    if isinstance(action.get("project"), data.Project):
+        return {**action, "project": action["project"].to_dict()}
+
+    if isinstance(action.get("category"), data.Category):
+        return {**action, "category": action["category"].to_dict()}
+
+    return action
+
+
+def failed(action):
+    print(f"WARNING: Could not undo/redo '{action['op']}', what it changed doesn't exist anymore")
+    return False
@@ -0,0 +1,215 @@
+'''
+The journal is an alternative way of saving. Instead of re-writing the whole data file on every change, each change is added (appended) as a single line to a journal file next to the data file.
+
+When loading, the data file (the "snapshot") is read first and then every change in the journal is replayed on top of it.
+Once the journal grows too big, it's folded into a fresh snapshot in the background ("compaction") and a new, empty journal is started.
+'''
+
+import json
+import os
+import threading
+
+
+# Start folding the journal into the snapshot when it's bigger than this (in bytes)
+COMPACT_SIZE = 1024 * 1024
+
+# The thread that is currently compacting the journal (None if no compaction is running)
+compaction_thread = None
+
+
+
+# --- WRITING ---
+
+def append_changes(journal_file, changes):
+    """Appends the changes to the end of the journal, one json line per change."""
+
+    # Nothing changed, nothing to write
+    if not changes:
+        return
+
+    lines = "".join(json.dumps(change) + "\n" for change in changes)
+
+    # Open in "append" mode, so the existing content of the file is never touched
+    with open(journal_file, "a") as f:
+        f.write(lines)
+
+        # Make sure the changes are actually on the disk before the save counts as done (like storage.atomic_write),
+        # otherwise they could still be lost if the computer loses power
+        f.flush()
+        os.fsync(f.fileno())
+
+
+
+def needs_compaction(journal_file):
+    """Checks if the journal has grown big enough to be folded into the snapshot."""
+
+    # Don't start a new compaction while one is still running
+    if is_compacting():
+        return False
+
+    return os.path.exists(journal_file) and os.path.getsize(journal_file) > COMPACT_SIZE
+
+
+
+def is_compacting():
+    """Checks if a compaction is still running in the background."""
+    return compaction_thread is not None and compaction_thread.is_alive()
+
+
+
+def compact(journal_file, snapshot_text, write_snapshot_file):
+    """Starts a new journal and writes the snapshot text (using the write_snapshot_file function) in a background thread."""
+    global compaction_thread
+
+    old_journal_file = journal_file + ".old"
+
+    # Move the current journal out of the way, new changes go to a fresh journal from now on.
+    # If an old journal is still around (the app closed before the last compaction finished), add to the end of it instead of overwriting it.
+    if os.path.exists(old_journal_file):
+        with open(journal_file, "r") as f:
+            lines = f.read()
+
+        with open(old_journal_file, "a") as f:
+            f.write(lines)
+
+            # (On the disk before the journal they came from is removed)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.remove(journal_file)
+    else:
+        os.replace(journal_file, old_journal_file)
+
+
+    # Write the snapshot and remove the old journal without blocking the UI
+    def write_snapshot():
+
+        # The data file is swapped in one step, so it's never half written (see storage.atomic_write)
+        write_snapshot_file(snapshot_text)
+
+        # Everything in the old journal is now part of the snapshot
+        os.remove(old_journal_file)
+
+    compaction_thread = threading.Thread(target=write_snapshot)
+    compaction_thread.start()
+
+
+
+# --- READING ---
+
+def read_changes(journal_file):
+    """Reads all the changes from a journal file."""
+
+    changes = []
+
+    if not os.path.exists(journal_file):
+        return changes
+
+    with open(journal_file, "r") as f:
+        for line in f:
+
+            # A line that was cut off (e.g. the app crashed mid-write) can't be read, skip it
+            try:
+                changes.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"WARNING: Skipped a broken line in '{journal_file}'")
+
+    return changes
+
+
+
+def load_changes(journal_file, data_file):
+    """Reads the changes that are not part of the snapshot yet (from the old and the current journal)."""
+
+    old_journal_file = journal_file + ".old"
+    changes = []
+
+    if os.path.exists(old_journal_file):
+
+        # If the snapshot was written after the old journal, the compaction finished and only the removal of the old journal was missed
+        if os.path.exists(data_file) and os.path.getmtime(data_file) > os.path.getmtime(old_journal_file):
+            os.remove(old_journal_file)
+        else:
+            changes.extend(read_changes(old_journal_file))
+
+    changes.extend(read_changes(journal_file))
+
+    return changes
+
+
+
+def replay(projects_data, changes):
+    """Applies the changes, in order, on top of a list of project dictionaries (as loaded from the snapshot)."""
+
+    # Look up projects by name instead of searching the list for every change
+    projects_by_name = {project["name"]: project for project in projects_data}
+
+    for change in changes:
+        op = change["op"]
+
+        if op == "add_project":
+            project = change["project"]
+            projects_data.insert(change.get("index", len(projects_data)), project)
+            projects_by_name[project["name"]] = project
+            continue
+
+        if op == "remove_project":
+            project = projects_by_name.pop(change["project"], None)
+            if project is not None:
+                projects_data.remove(project)
+            continue
+
+        if op == "rename_project":
+            project = projects_by_name.pop(change["project"], None)
+            if project is not None:
+                project["name"] = change["name"]
+                projects_by_name[change["name"]] = project
+            continue
+
+        # Every other change happens inside a project
+        project = projects_by_name.get(change["project"])
+        if project is None:
+            continue
+
+        if op == "add_category":
+            project["categories"].insert(change.get("index", len(project["categories"])), change["category"])
+            continue
+
+        if op == "remove_category":
+            project["categories"] = [c for c in project["categories"] if c["name"] != change["category"]]
+            continue
+
+        # Every other change happens inside a category
+        category = None
+        for existing_category in project["categories"]:
+            if existing_category["name"] == change["category"]:
+                category = existing_category
+                break
+
+        if category is None:
+            continue
+
+        if op == "set_theme":
+            category["theme_name"] = change["theme_name"]
+            category["theme_settings"] = change["theme_settings"]
+
+        elif op == "rename_category":
+            category["name"] = change["name"]
+
+        elif op == "add_todo":
+            category["todo_items"].insert(change.get("index", len(category["todo_items"])), change["todo"])
+
+        elif op == "remove_todo":
+            del category["todo_items"][change["index"]]
+
+        elif op == "set_checked":
+            category["todo_items"][change["index"]]["is_checked"] = change["is_checked"]
+
+        elif op == "set_all_checked":
+            for todo in category["todo_items"]:
+                todo["is_checked"] = change["is_checked"]
+
+        else:
+            print(f"WARNING: Unknown journal change '{op}'")
+
+    return projects_data
@@ -0,0 +1,155 @@
+'''
+Reads a json data file one project at a time, instead of turning the whole file into dictionaries at once (like json.load does).
+
+The data file is one big json list: [ {project}, {project}, ... ]. json.load creates the dictionaries of every project before anything
+can be done with them, so right after loading, the whole file exists twice in memory (as dictionaries and as the objects made from them).
+Here the file is read in chunks, and every project is handed over as soon as it has been read, so it can be turned into objects
+(or just counted) and forgotten before the next one is read. Only one project's dictionary exists at a time.
+
+Every project also comes with where it starts and ends in the file (in bytes), so it can be read again later on its own (see read_item).
+'''
+
+import codecs
+import json
+import re
+
+
+# How much of the file is read at a time (in bytes). A project that is bigger than this is read in bigger and bigger pieces.
+CHUNK_SIZE = 1024 * 1024
+
+# The whitespace json allows between values
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+
+class ListReader():
+    """
+    Reads the items of a json list from a file one after the other, keeping only the part of the file that hasn't been read yet in memory.
+    """
+    def __init__(self, file, chunk_size=CHUNK_SIZE):
+        self.file = file # Opened in binary mode
+        self.chunk_size = chunk_size
+
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")() # Handles characters that are split between two chunks
+
+        self.buffer = "" # The text read so far that hasn't been used yet
+        self.position = 0 # Where in the buffer reading continues
+        self.file_position = 0 # The same place, but as a byte position in the file
+        self.at_end = False
+
+
+    # Add the next chunk of the file to the buffer. Returns False if the whole file has already been read.
+    def read_more(self):
+        if self.at_end:
+            return False
+
+        # The part of the buffer that was already used isn't needed anymore
+        self.buffer = self.buffer[self.position:]
+        self.position = 0
+
+        # Read at least as much as is already waiting, so a big project doesn't get re-parsed again and again
+        chunk = self.file.read(max(self.chunk_size, len(self.buffer)))
+
+        if not chunk:
+            self.at_end = True
+            self.buffer += self.text_decoder.decode(b"", final=True)
+            return False
+
+        self.buffer += self.text_decoder.decode(chunk)
+        return True
+
+
+    # Move forward in the buffer, keeping the byte position in the file up to date
+    def move_to(self, new_position):
+
+        # Only text with other characters than a-z, 0-9 etc. has characters that take more than one byte (checking this is instant)
+        if self.buffer.isascii():
+            self.file_position += new_position - self.position
+        else:
+            self.file_position += len(self.buffer[self.position:new_position].encode("utf-8"))
+
+        self.position = new_position
+
+
+    # Skip any whitespace and return the next character ("" at the end of the file)
+    def next_char(self):
+        while True:
+            self.move_to(WHITESPACE.match(self.buffer, self.position).end())
+
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+
+            if not self.read_more():
+                return ""
+
+
+    # Read one json value (reading more of the file until the whole value is in the buffer)
+    def read_value(self):
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+
+            except json.JSONDecodeError:
+                # The value probably just doesn't fit in the buffer yet. If the file has no more, it's really broken.
+                if self.read_more():
+                    continue
+                raise
+
+            self.move_to(end)
+            return value
+
+
+
+def iter_list(path, chunk_size=CHUNK_SIZE):
+    """
+    Yields (item, start, end) for every item of the json list in the file, where start/end are the byte positions of the item in the file.
+    Raises a ValueError if the file isn't a json list or is damaged/cut off (possibly after some items were already handed over).
+    """
+    with open(path, "rb") as f:
+        reader = ListReader(f, chunk_size)
+
+        if reader.next_char() != "[":
+            raise ValueError(f"'{path}' doesn't contain a json list")
+        reader.move_to(reader.position + 1)
+
+        # An empty list
+        if reader.next_char() == "]":
+            return
+
+        while True:
+            reader.next_char() # (Skips the whitespace after the comma)
+            start = reader.file_position
+            item = reader.read_value()
+            yield item, start, reader.file_position
+
+            # After every item comes either a comma (more items) or the end of the list
+            next_char = reader.next_char()
+
+            if next_char == "]":
+                return
+
+            if next_char != ",":
+                raise ValueError(f"'{path}' is damaged (expected ',' or ']' at byte {reader.file_position})")
+
+            reader.move_to(reader.position + 1)
+
+
+
+def read_item(path, start, end):
+    """Reads a single item again, using the start/end positions iter_list gave for it."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        return json.loads(f.read(end - start))
+
+
+
+def ends_like_list(path):
+    """
+    Quick check that the file ends with a "]", i.e. it wasn't cut off in the middle of writing.
+    (So a damaged file is usually noticed before anything has been read from it.)
+    """
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        f.seek(max(0, f.tell() - 64))
+        return f.read().rstrip(b" \t\n\r").endswith(b"]")
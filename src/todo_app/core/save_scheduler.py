@@ -0,0 +1,155 @@
+'''
+Saves in the background instead of freezing the UI on every change.
+
+When something changes, a save is only "requested". The actual save happens once no new requests have come in for a short while,
+so a burst of changes (e.g. clicking many checkboxes quickly) becomes a single save.
+The main thread only takes a quick snapshot of the data, turning it into text and writing it to disk happens on a separate "worker" thread.
+
+If a save fails, the changes it took (see data.take_changes) are put back so the next save writes them again, and the error is shown to the user.
+'''
+
+import os
+import queue
+import threading
+import time
+from todo_app.core import data
+from todo_app.core import storage
+
+
+# How long to wait (in milliseconds) after the last change before saving. 0 saves right away on the main thread (like before).
+SAVE_DELAY_MS = int(os.environ.get("TODOAPP_SAVE_DELAY", "500"))
+
+# How often (in milliseconds) the main thread checks if a save on the worker thread failed
+FAILURE_CHECK_MS = 250
+
+# Print the save statistics when the app closes
+PRINT_STATS = os.environ.get("TODOAPP_SAVE_STATS", "0") == "1"
+
+
+
+class SaveScheduler():
+    """
+    Collects save requests and performs them on a worker thread after a short delay
+    """
+    def __init__(self, master, get_projects, delay_ms=SAVE_DELAY_MS, on_error=None):
+        self.master = master # Needed for "after", which runs a function on the main thread after a delay
+        self.get_projects = get_projects # Function that returns the list of projects to save
+        self.delay_ms = delay_ms
+        self.on_error = on_error # Function that shows the user why a save failed (called on the main thread)
+
+        # The id of the waiting "after" call (None if no save is waiting)
+        self.pending_id = None
+
+        # Save jobs ("write" functions, and the changes they write) waiting for the worker thread
+        self.jobs = queue.Queue()
+
+        # Saves that failed on the worker thread (their changes and the error), handled on the main thread (see check_failed_saves)
+        self.failed_saves = queue.Queue()
+
+        # Statistics
+        self.requests = 0 # How many times a save was asked for
+        self.saves = 0 # How many saves actually happened
+        self.main_thread_time = 0.0 # Seconds spent on the main thread (taking snapshots)
+        self.worker_time = 0.0 # Seconds spent on the worker thread (which would have frozen the UI before)
+
+        # The worker thread that writes the saves. "daemon" means it doesn't keep the program alive on its own (flush takes care of that).
+        self.worker = threading.Thread(target=self.work, daemon=True)
+        self.worker.start()
+
+        # (tkinter may only be used from the main thread, so the main thread keeps checking for failed saves instead of the worker telling it)
+        self.master.after(FAILURE_CHECK_MS, self.watch_failed_saves)
+
+
+    # Ask for a save. If another request comes in before the delay is over, the timer starts over.
+    def request_save(self):
+        self.requests += 1
+
+        # Without a delay, just save right away (same as before the scheduler existed)
+        if self.delay_ms <= 0:
+            self.save_now()
+            self.flush()
+            return
+
+        if self.pending_id is not None:
+            self.master.after_cancel(self.pending_id)
+
+        self.pending_id = self.master.after(self.delay_ms, self.save_now)
+
+
+    # Take the snapshot (main thread) and hand the writing over to the worker thread
+    def save_now(self):
+        self.pending_id = None
+
+        start = time.perf_counter()
+        changes = data.take_changes()
+        write = storage.prepare_save(self.get_projects(), changes)
+        self.main_thread_time += time.perf_counter() - start
+
+        self.saves += 1
+        self.jobs.put((write, changes))
+
+
+    # Runs on the worker thread: write the saves one after another
+    def work(self):
+        while True:
+            write, changes = self.jobs.get()
+
+            start = time.perf_counter()
+            try:
+                write()
+            except Exception as error:
+                print(f"ERROR: Saving failed: {error}")
+                self.failed_saves.put((changes, error))
+            self.worker_time += time.perf_counter() - start
+
+            self.jobs.task_done()
+
+
+    # Save anything that is still waiting, and wait until it's written (used when closing the app).
+    # Returns False if a save failed.
+    def flush(self):
+        if self.pending_id is not None:
+            self.master.after_cancel(self.pending_id)
+            self.save_now()
+
+        # Wait for the worker thread to finish every job
+        self.jobs.join()
+
+        return not self.check_failed_saves()
+
+
+    # Runs on the main thread every FAILURE_CHECK_MS
+    def watch_failed_saves(self):
+        self.check_failed_saves()
+        self.master.after(FAILURE_CHECK_MS, self.watch_failed_saves)
+
+
+    # Put the changes of the saves that failed back (so the next save writes them), and tell the user.
+    # Returns True if a save failed.
+    def check_failed_saves(self):
+        failed_changes = []
+        error = None
+
+        while not self.failed_saves.empty():
+            changes, error = self.failed_saves.get()
+            failed_changes.extend(changes)
+
+        if error is None:
+            return False
+
+        # (In the order they were made, before anything that changed since)
+        data.put_back_changes(failed_changes)
+
+        if self.on_error is not None:
+            self.on_error(error)
+
+        return True
+
+
+    # A short summary of how the saving went
+    def stats_text(self):
+        return (
+            f"Saves requested: {self.requests}, performed: {self.saves}, coalesced: {self.requests - self.saves}\n"
+            f"Main thread time: {self.main_thread_time * 1000:.1f} ms, "
+            f"moved off the main thread: {self.worker_time * 1000:.1f} ms"
+        )
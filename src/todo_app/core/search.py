@@ -0,0 +1,373 @@
+'''
+Full-text search over all project names, category names and to-do texts.
+
+The search index is an "inverted index": for every word it knows which projects/categories/to-do items contain it,
+so a search looks up the words instead of going through every to-do item.
+Every word of the search is also allowed to be the start of a word ("buy mil" finds "Buy milk"), and all words have to match.
+
+The index is built the first time something is searched for (see build), after that it is kept up to date by the data objects
+(data.py tells it about every project/category/to-do item that is added, removed or renamed), so searching stays fast.
+Projects that haven't been opened yet (lazy loading) are indexed straight from their saved data, without creating their objects.
+'''
+
+import os
+import re
+from bisect import bisect_left
+from todo_app.core import data
+
+
+# The most results a single search returns
+RESULT_LIMIT = int(os.environ.get("TODOAPP_SEARCH_LIMIT", "50"))
+
+# When a search word is the start of more than this many different words, the matches are checked against their text instead of the index
+MAX_LOOKUP_SETS = 16
+
+# What counts as a word: letters/numbers (e.g. "to-do list #2" -> "to", "do", "list", "2")
+WORD_PATTERN = re.compile(r"\w+")
+
+
+
+def split_words(text):
+    """The (lowercase) words in a text, each word only once"""
+    return set(WORD_PATTERN.findall(text.lower()))
+
+
+
+class SearchResult():
+    """
+    One thing that matched a search. "kind" is "project", "category" or "todo", the ids say where it is.
+    """
+    __slots__ = ("kind", "text", "project_id", "category_id", "todo_id")
+
+    def __init__(self, kind, text, project_id, category_id=None, todo_id=None):
+        self.kind = kind
+        self.text = text
+        self.project_id = project_id
+        self.category_id = category_id
+        self.todo_id = todo_id
+
+
+
+class InvertedIndex():
+    """
+    Word -> the keys (ids) of everything that contains the word, plus a sorted list of all words, so every word starting with
+    some letters can be found with a binary search.
+    """
+    __slots__ = ("entries", "postings", "sorted_words")
+
+    def __init__(self):
+        self.entries = {}       # key -> (text, project id, category id)
+        self.postings = {}      # word -> set of keys
+        self.sorted_words = []  # All the words in "postings", in alphabetical order (None while the index is being built)
+
+
+    def __len__(self):
+        return len(self.entries)
+
+
+    # Adding lots of entries at once: the sorted list of words is only made at the end (see finish_building)
+    def start_building(self):
+        self.sorted_words = None
+
+    def finish_building(self):
+        self.sorted_words = sorted(self.postings)
+
+
+    def add(self, key, text, project_id, category_id=None):
+        self.entries[key] = (text, project_id, category_id)
+
+        for word in split_words(text):
+            keys = self.postings.get(word)
+
+            # A new word, put it into the sorted list at the right place (while building, the list is sorted once at the end instead)
+            if keys is None:
+                keys = self.postings[word] = set()
+                if self.sorted_words is not None:
+                    self.sorted_words.insert(bisect_left(self.sorted_words, word), word)
+
+            keys.add(key)
+
+
+    # Add many entries at once: (key, text, project id, category id) for each. Does the same as "add", but faster (used when building the index).
+    def add_many(self, items):
+        entries = self.entries
+        postings = self.postings
+        findall = WORD_PATTERN.findall
+        new_words = []
+
+        for key, text, project_id, category_id in items:
+            entries[key] = (text, project_id, category_id)
+
+            for word in set(findall(text.lower())):
+                keys = postings.get(word)
+
+                if keys is None:
+                    postings[word] = {key}
+                    new_words.append(word)
+                else:
+                    keys.add(key)
+
+        if self.sorted_words is not None:
+            for word in new_words:
+                self.sorted_words.insert(bisect_left(self.sorted_words, word), word)
+
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+
+        for word in split_words(entry[0]):
+            keys = self.postings[word]
+            keys.discard(key)
+
+            # Nothing contains the word anymore
+            if not keys:
+                del self.postings[word]
+                del self.sorted_words[bisect_left(self.sorted_words, word)]
+
+
+    # Change the text of an entry (e.g. a renamed project)
+    def update(self, key, text):
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+
+        self.remove(key)
+        self.add(key, text, entry[1], entry[2])
+
+
+    # The sets of keys of every word that starts with "prefix"
+    def prefix_sets(self, prefix):
+        sets = []
+        position = bisect_left(self.sorted_words, prefix)
+
+        while position < len(self.sorted_words) and self.sorted_words[position].startswith(prefix):
+            sets.append(self.postings[self.sorted_words[position]])
+            position += 1
+
+        return sets
+
+
+    def search(self, words, limit):
+        """Returns up to "limit" keys whose text has a word starting with every one of the words"""
+
+        if not words or limit <= 0:
+            return []
+
+        # Start from the search word with the fewest matches, and check the other words only for those
+        word_sets = [(word, self.prefix_sets(word)) for word in words]
+        word_sets.sort(key = lambda item: sum(len(keys) for keys in item[1]))
+
+        first_sets = word_sets[0][1]
+
+        # The other words are checked by looking the candidate up in their sets of keys,
+        # unless a word is the start of very many different words, then checking the words of the candidate's text is faster
+        other_sets = [sets for word, sets in word_sets[1:] if len(sets) <= MAX_LOOKUP_SETS]
+        other_words = [word for word, sets in word_sets[1:] if len(sets) > MAX_LOOKUP_SETS]
+
+        results = []
+        seen = set()
+
+        for keys in first_sets:
+            for key in keys:
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                if not all(any(key in word_keys for word_keys in sets) for sets in other_sets):
+                    continue
+
+                if other_words:
+                    text_words = split_words(self.entries[key][0])
+                    if not all(any(text_word.startswith(word) for text_word in text_words) for word in other_words):
+                        continue
+
+                results.append(key)
+                if len(results) >= limit:
+                    return results
+
+        return results
+
+
+
+class SearchIndex():
+    """
+    The search index for everything. Project and category names are kept apart from the (many more) to-do texts,
+    so matching names always show up first in the results.
+    """
+
+    def __init__(self):
+        self.names = InvertedIndex()    # Projects and categories
+        self.todos = InvertedIndex()    # To-do items
+        self.is_built = False
+
+
+    # Index every project (called the first time something is searched for)
+    def build(self, projects):
+        self.names = InvertedIndex()
+        self.todos = InvertedIndex()
+        self.names.start_building()
+        self.todos.start_building()
+
+        for project in projects:
+            self.index_project(project)
+
+        self.names.finish_building()
+        self.todos.finish_building()
+        self.is_built = True
+
+
+    def index_project(self, project):
+        self.names.add(project.id, project.project_name, project.id)
+
+        # A project that hasn't been opened is indexed from its saved data (if that has ids, otherwise the ids are only made when it's loaded)
+        if not project.is_loaded():
+            project_data = project.to_dict()
+
+            if all_have_ids(project_data):
+                for category_data in project_data["categories"]:
+                    self.names.add(category_data["id"], category_data["name"], project.id, category_data["id"])
+
+                    self.todos.add_many(
+                        (todo_data["id"], todo_data["text"], project.id, category_data["id"]) for todo_data in category_data["todo_items"]
+                    )
+                return
+
+        for category in project.categories:
+            self.index_category(category)
+
+
+    def index_category(self, category):
+        project_id = category.project.id
+        self.names.add(category.id, category.category_name, project_id, category.id)
+
+        # A TodoArray has the ids and texts as columns already
+        todo_items = category.todo_items
+        if isinstance(todo_items, data.TodoArray):
+            pairs = zip(todo_items.ids, todo_items.texts)
+        else:
+            pairs = ((todo.id, todo.text) for todo in todo_items)
+
+        self.todos.add_many((todo_id, text, project_id, category.id) for todo_id, text in pairs)
+
+
+    def unindex_category(self, category):
+        self.names.remove(category.id)
+
+        for todo_id in todo_ids(category):
+            self.todos.remove(todo_id)
+
+
+
+    # --- CHANGES (called by the data objects, only do something once the index is built) ---
+
+    def add_project(self, project):
+        if self.is_built:
+            self.index_project(project)
+
+
+    def remove_project(self, project):
+        if not self.is_built:
+            return
+
+        self.names.remove(project.id)
+
+        if project.is_loaded():
+            for category in project.categories:
+                self.unindex_category(category)
+        else:
+            for category_data in project.to_dict()["categories"]:
+                self.names.remove(category_data.get("id"))
+                for todo_data in category_data["todo_items"]:
+                    self.todos.remove(todo_data.get("id"))
+
+
+    def rename_project(self, project):
+        if self.is_built:
+            self.names.update(project.id, project.project_name)
+
+
+    def add_category(self, category):
+        if self.is_built and category.project.id in self.names.entries:
+            self.index_category(category)
+
+
+    def remove_category(self, category):
+        if self.is_built:
+            self.unindex_category(category)
+
+
+    def rename_category(self, category):
+        if self.is_built:
+            self.names.update(category.id, category.category_name)
+
+
+    def add_todo(self, category, todo):
+        # Only to-do items of categories that are in the index (a category that isn't part of a project yet is indexed when it's added)
+        if self.is_built and category.id in self.names.entries:
+            self.todos.add(todo.id, todo.text, category.project.id, category.id)
+
+
+    def remove_todo(self, todo):
+        if self.is_built:
+            self.todos.remove(todo.id)
+
+
+
+    # --- SEARCHING ---
+
+    # The name of a project or category by its id (without loading the project)
+    def name_of(self, key):
+        entry = self.names.entries.get(key)
+        return entry[0] if entry is not None else ""
+
+
+    def search(self, query, limit=RESULT_LIMIT):
+        """Returns up to "limit" SearchResults for the query: matching projects and categories first, then to-do items"""
+
+        words = sorted(split_words(query))
+        results = []
+
+        for key in self.names.search(words, limit):
+            text, project_id, category_id = self.names.entries[key]
+
+            if category_id is None:
+                results.append(SearchResult("project", text, project_id))
+            else:
+                results.append(SearchResult("category", text, project_id, category_id))
+
+        for key in self.todos.search(words, limit - len(results)):
+            text, project_id, category_id = self.todos.entries[key]
+            results.append(SearchResult("todo", text, project_id, category_id, key))
+
+        return results
+
+
+
+# The ids of all to-do items in a category (a TodoArray has them as a column)
+def todo_ids(category):
+    todo_items = category.todo_items
+
+    if isinstance(todo_items, data.TodoArray):
+        return list(todo_items.ids)
+
+    return [todo.id for todo in todo_items]
+
+
+# Check if every category and to-do item in a project's saved data has an id (data saved before ids existed doesn't)
+def all_have_ids(project_data):
+    for category_data in project_data["categories"]:
+        if not category_data.get("id"):
+            return False
+
+        for todo_data in category_data["todo_items"]:
+            if not todo_data.get("id"):
+                return False
+
+    return True
+
+
+
+# The one search index of the app
+index = SearchIndex()
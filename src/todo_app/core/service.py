@@ -0,0 +1,212 @@
+'''
+The "service": everything you can do with projects, categories and to-do items, without any UI.
+
+The views (and the command line tool in __main__.py) call these methods instead of changing the data objects themselves.
+The service checks the input (e.g. that a name isn't taken), makes the change through the undo/redo history (see history.py)
+and leaves the saving to the caller. That way a script can make thousands of changes and save once at the end.
+
+Input that isn't allowed raises a ValueError with a message that can be shown to the user as it is.
+'''
+
+import json
+from todo_app.core import data
+from todo_app.core import storage
+from todo_app.core.history import History
+from todo_app.ui import themes
+
+
+
+class TodoService():
+    """
+    Holds all the projects and makes every change to them.
+    """
+    def __init__(self, projects_data=None):
+
+        # Load the projects from the storage if they aren't given (with lazy loading only the names/counts, the rest is loaded when needed).
+        # Without lazy loading they are read one at a time, and each one is turned into objects before the next one is read.
+        if projects_data is None:
+            projects_data = storage.load_index() if storage.LAZY_LOADING else storage.iter_data()
+
+        try:
+            projects = [data.Project(**project_data) for project_data in projects_data]
+
+        # Reading one project at a time (see storage.iter_data) only notices damage in the middle of the data file once it gets there,
+        # after some projects were already read. Those are dropped, and everything is read again the normal way, which falls back to the backups.
+        except ValueError as error:
+            print(f"WARNING: The projects could not be read one at a time ({error}), reading them again from the newest file that isn't damaged")
+            projects = [data.Project(**project_data) for project_data in storage.load_data()]
+
+        self.projects = data.ProjectCollection(projects)
+
+        # Every change goes through the history, so it can be undone
+        self.history = History(self.projects)
+
+
+
+    # --- FINDING THINGS ---
+
+    def get_project(self, name):
+        """The project with this name (raises a ValueError if there is none)"""
+        project = self.projects.get(name)
+
+        if project is None:
+            raise ValueError(f"There is no project called '{name}'")
+
+        return project
+
+
+    def get_category(self, project, name):
+        """The category of the project with this name (raises a ValueError if there is none)"""
+        category = project.get_category(name)
+
+        if category is None:
+            raise ValueError(f"There is no category called '{name}' in '{project.project_name}'")
+
+        return category
+
+
+    def get_todo(self, category, number):
+        """The to-do item at this number in the list (starting at 1, like in "list")"""
+        if not 1 <= number <= len(category.todo_items):
+            raise ValueError(f"There is no to-do number {number} in '{category.category_name}'")
+
+        return category.todo_items[number - 1]
+
+
+
+    # --- CHANGES ---
+
+    def add_project(self, name):
+        if not name:
+            raise ValueError("Project needs a name!")
+
+        if self.projects.has_name(name):
+            raise ValueError("A project with that name already exists!")
+
+        project = data.Project(name = name)
+        self.history.add_project(project)
+
+        return project
+
+
+    def remove_project(self, project):
+        self.history.remove_project(project)
+
+
+    def rename_project(self, project, name):
+        if not name:
+            raise ValueError("Project needs a name!")
+
+        if name == project.project_name:
+            return
+
+        if self.projects.has_name(name):
+            raise ValueError("A project with that name already exists!")
+
+        self.history.rename_project(project, name)
+
+
+    def add_category(self, project, name, theme_name="Default"):
+        if not name:
+            raise ValueError("Category needs a name!")
+
+        if project.has_category(name):
+            raise ValueError("Name is taken")
+
+        theme_settings = themes.get_theme(theme_name)
+        if theme_settings is None:
+            raise ValueError(f"There is no theme called '{theme_name}'")
+
+        category = data.Category(name = name, theme_name = theme_name, theme_settings = theme_settings)
+        self.history.add_category(project, category)
+
+        return category
+
+
+    def remove_category(self, project, category):
+        self.history.remove_category(project, category)
+
+
+    def rename_category(self, project, category, name):
+        if not name:
+            raise ValueError("Category needs a name!")
+
+        if name == category.category_name:
+            return
+
+        if project.has_category(name):
+            raise ValueError("Name is taken")
+
+        self.history.rename_category(category, name)
+
+
+    def set_theme(self, category, theme_name):
+        theme_settings = themes.get_theme(theme_name)
+        if theme_settings is None:
+            raise ValueError(f"There is no theme called '{theme_name}'")
+
+        self.history.set_theme(category, theme_name, theme_settings)
+
+
+    def add_todo(self, category, text):
+        if not text:
+            raise ValueError("To-do item needs a name!")
+
+        todo = data.Todo(text = text)
+        self.history.add_todo(category, todo)
+
+        return todo
+
+
+    def remove_todo(self, category, todo):
+        self.history.remove_todo(category, todo)
+
+
+    def set_checked(self, category, todo, is_checked):
+        self.history.set_checked(category, todo, is_checked)
+
+
+    def toggle(self, category, todo):
+        self.set_checked(category, todo, not todo.is_checked)
+
+
+    def set_all_checked(self, category, is_checked):
+        self.history.set_all_checked(category, is_checked)
+
+
+    # Undo/redo the last change, returns the step (or None if there was nothing to undo/redo)
+    def undo(self):
+        return self.history.undo()
+
+    def redo(self):
+        return self.history.redo()
+
+
+
+    # --- IMPORT / EXPORT ---
+
+    def import_json(self, json_file):
+        """Replaces all projects with the ones in a json file (can't be undone)"""
+        with open(json_file, "r") as f:
+            projects_data = json.load(f)
+
+        for project in list(self.projects):
+            self.projects.remove(project)
+
+        for project_data in projects_data:
+            self.projects.add(data.Project(**project_data))
+
+        self.history.clear()
+
+
+    def export_json(self, json_file):
+        """Writes all projects (including changes that haven't been saved yet) to a readable json file"""
+        storage.write_readable_json(json_file, (project.to_dict() for project in self.projects))
+
+
+
+    # --- SAVING ---
+
+    def save(self):
+        """Saves right away (the app saves in the background instead, see save_scheduler.py)"""
+        storage.save_projects(self.projects)
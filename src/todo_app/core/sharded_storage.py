@@ -0,0 +1,235 @@
+'''
+Stores every project in its own file (a "shard"), plus a small index file with the names, order and counts of all projects.
+
+    projects/index.json - the list of projects, in order: id, name, file name, number of categories, to-do items and done to-do items
+    projects/1.json, projects/2.json ... - one file per project, in the same format as a project in data.json
+
+At launch only the index is read, a project's file is read when it is opened.
+When saving, only the files of the projects that changed are re-written (plus the index), so a broken file can only ever affect one project.
+'''
+
+import json
+import os
+from todo_app.core import data
+from todo_app.core import storage
+
+
+
+class ShardedBackend():
+    """
+    Saves every project as its own file, with an index file that lists them
+    """
+
+    # The changed projects are found by their version, not by the recorded changes
+    uses_changes = False
+
+    def __init__(self, shard_dir, json_file=None):
+        self.shard_dir = shard_dir
+        self.index_file = os.path.join(shard_dir, "index.json")
+
+        # Which file every project is stored in (project id -> file name). Using the id means a renamed project keeps its file.
+        self.files = {}
+
+        # The version of every project the last time its file was written (project id -> version)
+        # Projects that are loaded but never changed keep version 0, so their files aren't re-written.
+        self.saved_versions = {}
+
+        # The number used for the next new file
+        self.next_file_number = 1
+
+        os.makedirs(shard_dir, exist_ok=True)
+
+        # The first time, split the old single json file (if there is one) into shards
+        if not os.path.exists(self.index_file) and json_file is not None and os.path.exists(json_file):
+            migrate_from_json(json_file, self)
+
+
+    # --- LOADING ---
+
+    # Read the index file as it is, without remembering anything from it
+    def read_index_data(self):
+        if not os.path.exists(self.index_file):
+            return {"projects": [], "next_file_number": 1}
+
+        index_data = storage.read_json_file(self.index_file)
+
+        # If the index is broken, fall back to the newest backup of it
+        if index_data is None:
+            index_data = storage.load_newest_backup(self.index_file)
+
+            # The backups store the same dictionary as the index, an empty list means nothing could be read
+            if index_data == []:
+                index_data = {"projects": [], "next_file_number": 1}
+
+        return index_data
+
+
+    # Read the index file (a list of dictionaries with id, name, file and counts) and remember which file belongs to which project
+    def read_index(self):
+        index_data = self.read_index_data()
+
+        self.next_file_number = index_data["next_file_number"]
+
+        for entry in index_data["projects"]:
+
+            # Index files from before ids existed get an id for every project (saved with the next save)
+            if "id" not in entry:
+                entry["id"] = data.new_id()
+
+            self.files[entry["id"]] = entry["file"]
+            self.saved_versions[entry["id"]] = 0
+
+        return index_data["projects"]
+
+
+    # Read one project's file
+    def read_shard(self, file_name):
+        project_data = storage.read_json_file(os.path.join(self.shard_dir, file_name))
+
+        if project_data is None:
+            print(f"ERROR: The project file '{file_name}' is damaged, the project will be empty")
+
+        return project_data
+
+
+    # Read all the projects (as dictionaries)
+    def load(self):
+        return list(self.iter_load())
+
+
+    # Read the projects one at a time (every project has its own file, so only one is read at a time)
+    def iter_load(self):
+        for entry in self.read_index():
+            project_data = self.read_shard(entry["file"])
+
+            if project_data is None:
+                project_data = {"name": entry["name"], "categories": []}
+
+            # The index decides the project's id (project files from before ids existed don't have one)
+            project_data["id"] = entry["id"]
+
+            yield project_data
+
+
+    # Read only the index. The project's file is read when its loader is called.
+    def load_index(self):
+        return [
+            {
+                "id": entry["id"],
+                "name": entry["name"],
+                "category_count": entry["category_count"],
+                "todo_count": entry["todo_count"],
+                "done_count": self.get_done_count(entry),
+                "loader": lambda file_name=entry["file"]: self.read_shard(file_name)
+            }
+            for entry in self.read_index()
+        ]
+
+
+    # The number of done to-do items of a project in the index.
+    # An index from before it was saved doesn't have it, so the project's file is read once to count them (the next save adds it to the index).
+    def get_done_count(self, entry):
+        if "done_count" in entry:
+            return entry["done_count"]
+
+        project_data = self.read_shard(entry["file"])
+        return storage.count_done(project_data) if project_data is not None else 0
+
+
+    # --- SAVING ---
+
+    # Snapshot the changed projects and return the function that writes them (plus the index)
+    def prepare_save(self, all_projects, changes):
+        index_entries = []
+        changed_shards = []
+
+        for project in all_projects:
+            project_id = project.id
+
+            # Give new projects a file of their own
+            if project_id not in self.files:
+                self.files[project_id] = f"{self.next_file_number}.json"
+                self.next_file_number += 1
+
+            index_entries.append({
+                "id": project_id,
+                "name": project.project_name,
+                "file": self.files[project_id],
+                "category_count": project.category_count(),
+                "todo_count": project.todo_count(),
+                "done_count": project.done_count()
+            })
+
+            # Only projects that changed since their file was written need a snapshot
+            if self.saved_versions.get(project_id) != project.version:
+                changed_shards.append((project_id, project.version, self.files[project_id], project.snapshot()))
+
+        # Projects that were removed since the last save
+        current_ids = {project.id for project in all_projects}
+        removed_files = [self.files.pop(project_id) for project_id in list(self.files) if project_id not in current_ids]
+
+        for project_id in list(self.saved_versions):
+            if project_id not in current_ids:
+                del self.saved_versions[project_id]
+
+        index_data = {
+            "next_file_number": self.next_file_number,
+            "projects": index_entries
+        }
+
+        def write():
+            # Write the changed projects first, so the index never points at a file that doesn't exist yet
+            for project_id, version, file_name, snapshot in changed_shards:
+                storage.atomic_write(os.path.join(self.shard_dir, file_name), data.snapshot_to_json(snapshot))
+                self.saved_versions[project_id] = version
+
+            storage.atomic_write(self.index_file, json.dumps(index_data), storage.BACKUP_COUNT)
+
+            # Remove the files of removed projects last (once the index no longer points at them)
+            for file_name in removed_files:
+                path = os.path.join(self.shard_dir, file_name)
+                if os.path.exists(path):
+                    os.remove(path)
+
+        return write
+
+
+    # Save right away
+    def save(self, all_projects, changes):
+        self.prepare_save(all_projects, changes)()
+
+
+
+# --- MIGRATION / EXPORT ---
+
+def migrate_from_json(json_file, backend):
+    """Splits an existing single data.json file into one file per project (plus the index)."""
+
+    with open(json_file, "r") as f:
+        projects_data = json.load(f)
+
+    index_entries = []
+
+    for project_data in projects_data:
+        file_name = f"{backend.next_file_number}.json"
+        backend.next_file_number += 1
+
+        storage.atomic_write(os.path.join(backend.shard_dir, file_name), json.dumps(project_data))
+
+        index_entries.append({
+            "id": project_data.get("id") or data.new_id(),
+            "name": project_data["name"],
+            "file": file_name,
+            "category_count": len(project_data["categories"]),
+            "todo_count": storage.count_todos(project_data),
+            "done_count": storage.count_done(project_data)
+        })
+
+    storage.atomic_write(
+        backend.index_file,
+        json.dumps({"next_file_number": backend.next_file_number, "projects": index_entries}),
+        storage.BACKUP_COUNT
+    )
+
+    print(f"Split '{json_file}' into {len(index_entries)} project file(s) in '{backend.shard_dir}'")
+
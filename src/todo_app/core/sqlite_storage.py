@@ -0,0 +1,374 @@
+'''
+Stores the projects, categories and to-do items as rows in a SQLite database (one table for each).
+
+Instead of writing everything on each save, only the rows touched by the recorded changes (see data.record_change) are inserted/updated/deleted.
+Each project can also be loaded on its own, which only reads that project's rows.
+The "uid" columns hold the ids of the project/category/to-do objects (see data.py), the "id" columns are only used inside the database.
+'''
+
+import json
+import os
+import sqlite3
+import threading
+from todo_app.core import data
+
+
+# The tables and the indexes used for looking up rows by their parent/name
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    uid TEXT,
+    name TEXT NOT NULL UNIQUE,
+    position INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    uid TEXT,
+    name TEXT NOT NULL,
+    theme_name TEXT NOT NULL,
+    theme_settings TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY,
+    category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
+    uid TEXT,
+    text TEXT NOT NULL,
+    is_checked INTEGER NOT NULL,
+    position INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_categories_project ON categories(project_id, name);
+CREATE INDEX IF NOT EXISTS idx_todos_category ON todos(category_id, position);
+"""
+
+
+
+class SQLiteBackend():
+    """
+    Saves everything in a SQLite database
+    """
+
+    # Only the rows touched by the recorded changes are written (see data.record_change)
+    uses_changes = True
+
+    def __init__(self, db_file, json_file=None):
+        self.db_file = db_file
+
+        # Check before connecting, since connecting creates the file
+        is_new = not os.path.exists(db_file)
+
+        os.makedirs(os.path.dirname(db_file), exist_ok=True)
+
+        # The connection is shared between the main thread (loading) and the save thread (writing), the lock makes sure only one uses it at a time
+        self.connection = sqlite3.connect(db_file, check_same_thread=False)
+        self.lock = threading.RLock()
+
+        # Needed for "ON DELETE CASCADE" to remove a project's categories and to-do items with it
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+        self.add_id_columns()
+
+        # The first time, copy over the projects from the old json file (if there is one)
+        if is_new and json_file is not None and os.path.exists(json_file):
+            migrate_from_json(json_file, self)
+
+
+    # Databases from before ids existed don't have the "uid" columns yet: add them, and give every existing row an id
+    def add_id_columns(self):
+        with self.connection:
+            for table in ("projects", "categories", "todos"):
+                columns = [row[1] for row in self.connection.execute(f"PRAGMA table_info({table})")]
+
+                if "uid" not in columns:
+                    self.connection.execute(f"ALTER TABLE {table} ADD COLUMN uid TEXT")
+                    self.connection.execute(f"UPDATE {table} SET uid = lower(hex(randomblob(16))) WHERE uid IS NULL")
+
+
+    # --- LOADING ---
+
+    # Read all the projects (as dictionaries)
+    def load(self):
+        return list(self.iter_load())
+
+
+    # Read the projects one at a time (only one project's rows are turned into dictionaries at a time)
+    def iter_load(self):
+        with self.lock:
+            rows = self.connection.execute("SELECT id, uid, name FROM projects ORDER BY position").fetchall()
+
+        for project_id, uid, name in rows:
+            with self.lock:
+                project_data = self.read_project(project_id, uid, name)
+
+            yield project_data
+
+
+    # Read the name and counts of every project, without reading any category/to-do rows themselves
+    def load_index(self):
+        with self.lock:
+            rows = self.connection.execute(
+                """
+                SELECT projects.id, projects.uid, projects.name,
+                    (SELECT COUNT(*) FROM categories WHERE categories.project_id = projects.id),
+                    (SELECT COUNT(*) FROM todos JOIN categories ON todos.category_id = categories.id WHERE categories.project_id = projects.id),
+                    (SELECT COUNT(*) FROM todos JOIN categories ON todos.category_id = categories.id WHERE categories.project_id = projects.id AND todos.is_checked = 1)
+                FROM projects
+                ORDER BY projects.position
+                """
+            ).fetchall()
+
+        return [
+            {
+                "id": uid,
+                "name": name,
+                "category_count": category_count,
+                "todo_count": todo_count,
+                "done_count": done_count,
+                # The project's rows are only read when the loader is called.
+                # (Found by the row's id, not the name, so a project renamed before it was opened is still found)
+                "loader": lambda project_id=project_id: self.load_project_row(project_id)
+            }
+            for project_id, uid, name, category_count, todo_count, done_count in rows
+        ]
+
+
+    # Read a single project by its row id (as a dictionary), or None if it doesn't exist
+    def load_project_row(self, project_id):
+        with self.lock:
+            row = self.connection.execute("SELECT id, uid, name FROM projects WHERE id = ?", (project_id,)).fetchone()
+
+            if row is None:
+                return None
+
+            return self.read_project(*row)
+
+
+    # Build the dictionary for a project, reading only that project's categories and to-do items
+    def read_project(self, project_id, project_uid, project_name):
+        categories = []
+
+        category_rows = self.connection.execute(
+            "SELECT id, uid, name, theme_name, theme_settings FROM categories WHERE project_id = ? ORDER BY position",
+            (project_id,)
+        ).fetchall()
+
+        for category_id, category_uid, name, theme_name, theme_settings in category_rows:
+            todo_rows = self.connection.execute(
+                "SELECT uid, text, is_checked FROM todos WHERE category_id = ? ORDER BY position",
+                (category_id,)
+            ).fetchall()
+
+            categories.append({
+                "id": category_uid,
+                "name": name,
+                "theme_name": theme_name,
+                "theme_settings": json.loads(theme_settings),
+                "todo_items": [{"id": uid, "text": text, "is_checked": bool(is_checked)} for uid, text, is_checked in todo_rows]
+            })
+
+        return {
+            "id": project_uid,
+            "name": project_name,
+            "categories": categories
+        }
+
+
+    # --- SAVING ---
+
+    # Return the function that saves the recorded changes as row updates (the project objects themselves aren't needed)
+    def prepare_save(self, all_projects, changes):
+
+        def write():
+            # "with self.connection" makes all the changes one transaction, so either all or none of them are saved
+            with self.lock, self.connection:
+                for change in changes:
+                    self.apply_change(change)
+
+        return write
+
+
+    # Save the recorded changes right away
+    def save(self, all_projects, changes):
+        self.prepare_save(all_projects, changes)()
+
+
+    # Turn a single change into the matching SQL statement(s)
+    def apply_change(self, change):
+        op = change["op"]
+        db = self.connection
+
+        if op == "add_project":
+            self.insert_project(change["project"], change.get("index"))
+            return
+
+        if op == "remove_project":
+            db.execute("DELETE FROM projects WHERE name = ?", (change["project"],))
+            return
+
+        if op == "rename_project":
+            db.execute("UPDATE projects SET name = ? WHERE name = ?", (change["name"], change["project"]))
+            return
+
+        # Every other change happens inside a project
+        project_id = self.find_project_id(change["project"])
+        if project_id is None:
+            return
+
+        if op == "add_category":
+            self.insert_category(project_id, change["category"], change.get("index"))
+            return
+
+        if op == "remove_category":
+            db.execute("DELETE FROM categories WHERE project_id = ? AND name = ?", (project_id, change["category"]))
+            return
+
+        # Every other change happens inside a category
+        category_id = self.find_category_id(project_id, change["category"])
+        if category_id is None:
+            return
+
+        if op == "set_theme":
+            db.execute(
+                "UPDATE categories SET theme_name = ?, theme_settings = ? WHERE id = ?",
+                (change["theme_name"], json.dumps(change["theme_settings"]), category_id)
+            )
+
+        elif op == "rename_category":
+            db.execute("UPDATE categories SET name = ? WHERE id = ?", (change["name"], category_id))
+
+        elif op == "add_todo":
+            self.insert_todo(category_id, change["todo"], self.position_for("todos", "category_id", category_id, change.get("index")))
+
+        elif op == "remove_todo":
+            db.execute("DELETE FROM todos WHERE category_id = ? AND position = ?", (category_id, change["index"]))
+
+            # Move the items after the removed one up a spot
+            db.execute("UPDATE todos SET position = position - 1 WHERE category_id = ? AND position > ?", (category_id, change["index"]))
+
+        elif op == "set_checked":
+            db.execute(
+                "UPDATE todos SET is_checked = ? WHERE category_id = ? AND position = ?",
+                (int(change["is_checked"]), category_id, change["index"])
+            )
+
+        elif op == "set_all_checked":
+            db.execute("UPDATE todos SET is_checked = ? WHERE category_id = ?", (int(change["is_checked"]), category_id))
+
+        else:
+            print(f"WARNING: Unknown change '{op}'")
+
+
+    # --- HELPERS ---
+
+    def find_project_id(self, project_name):
+        row = self.connection.execute("SELECT id FROM projects WHERE name = ?", (project_name,)).fetchone()
+        return row[0] if row is not None else None
+
+
+    def find_category_id(self, project_id, category_name):
+        row = self.connection.execute(
+            "SELECT id FROM categories WHERE project_id = ? AND name = ?", (project_id, category_name)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+
+    # The position after the last row with the same parent (projects have no parent, parent_column is None for them)
+    def next_position(self, table, parent_column, parent_id):
+        where, params = parent_filter(parent_column, parent_id)
+
+        row = self.connection.execute(f"SELECT COALESCE(MAX(position) + 1, 0) FROM {table} {where}", params).fetchone()
+        return row[0]
+
+
+    # The position for a row added as the "index"-th row of its parent. The rows from there on are moved down a spot to make room.
+    # (Positions can have gaps after rows were removed, so the position of the row that is currently "index"-th is looked up)
+    def position_for(self, table, parent_column, parent_id, index):
+        if index is None:
+            return self.next_position(table, parent_column, parent_id)
+
+        where, params = parent_filter(parent_column, parent_id)
+
+        row = self.connection.execute(
+            f"SELECT position FROM {table} {where} ORDER BY position LIMIT 1 OFFSET ?", params + (index,)
+        ).fetchone()
+
+        # Nothing at or after that index, so it simply goes at the end
+        if row is None:
+            return self.next_position(table, parent_column, parent_id)
+
+        and_or_where = "AND" if where else "WHERE"
+        self.connection.execute(f"UPDATE {table} SET position = position + 1 {where} {and_or_where} position >= ?", params + (row[0],))
+
+        return row[0]
+
+
+    # Insert a project (and everything in it) from a project dictionary, at the end or as the "index"-th project
+    def insert_project(self, project_data, index=None):
+        position = self.position_for("projects", None, None, index)
+
+        cursor = self.connection.execute(
+            "INSERT INTO projects (uid, name, position) VALUES (?, ?, ?)",
+            (project_data.get("id") or data.new_id(), project_data["name"], position)
+        )
+
+        for category_data in project_data.get("categories", []):
+            self.insert_category(cursor.lastrowid, category_data)
+
+
+    # Insert a category (and its to-do items) from a category dictionary, at the end or as the "index"-th category
+    def insert_category(self, project_id, category_data, index=None):
+        cursor = self.connection.execute(
+            "INSERT INTO categories (project_id, uid, name, theme_name, theme_settings, position) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                project_id,
+                category_data.get("id") or data.new_id(),
+                category_data["name"],
+                category_data["theme_name"],
+                json.dumps(category_data["theme_settings"]),
+                self.position_for("categories", "project_id", project_id, index)
+            )
+        )
+
+        self.connection.executemany(
+            "INSERT INTO todos (category_id, uid, text, is_checked, position) VALUES (?, ?, ?, ?, ?)",
+            [
+                (cursor.lastrowid, todo_data.get("id") or data.new_id(), todo_data["text"], int(todo_data.get("is_checked", False)), position)
+                for position, todo_data in enumerate(category_data.get("todo_items", []))
+            ]
+        )
+
+
+    def insert_todo(self, category_id, todo_data, position):
+        self.connection.execute(
+            "INSERT INTO todos (category_id, uid, text, is_checked, position) VALUES (?, ?, ?, ?, ?)",
+            (category_id, todo_data.get("id") or data.new_id(), todo_data["text"], int(todo_data.get("is_checked", False)), position)
+        )
+
+
+
+# The WHERE part of a query for the rows with the same parent, and its parameters (nothing for projects, which have no parent)
+def parent_filter(parent_column, parent_id):
+    if parent_column is None:
+        return "", ()
+
+    return f"WHERE {parent_column} = ?", (parent_id,)
+
+
+
+# --- MIGRATION ---
+
+def migrate_from_json(json_file, backend):
+    """Copies all the projects from an existing data.json file into the database (in one go)."""
+
+    with open(json_file, "r") as f:
+        projects_data = json.load(f)
+
+    with backend.connection:
+        for project_data in projects_data:
+            backend.insert_project(project_data)
+
+    print(f"Migrated {len(projects_data)} project(s) from '{json_file}' to '{backend.db_file}'")
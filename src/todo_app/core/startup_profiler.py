@@ -0,0 +1,49 @@
+'''
+Measures how long each part of starting the app takes (turned on with TODOAPP_PROFILE_STARTUP=1).
+
+The time starts when this file is first imported (main.py imports it before anything else).
+Every call to "mark" ends the current phase, e.g. mark("imports") records the time since the previous mark as the "imports" phase.
+When the first frame has been drawn, "report" prints all phases.
+'''
+
+import os
+import time
+
+
+# Print the startup timings
+ENABLED = os.environ.get("TODOAPP_PROFILE_STARTUP", "0") == "1"
+
+# When the app started (this file is imported first) and when the current phase started
+start_time = time.perf_counter()
+phase_start_time = start_time
+
+# The finished phases, in order: (name, milliseconds)
+phases = []
+
+
+
+def mark(phase_name):
+    """Ends the current phase and gives it a name."""
+    global phase_start_time
+
+    if not ENABLED:
+        return
+
+    now = time.perf_counter()
+    phases.append((phase_name, (now - phase_start_time) * 1000))
+    phase_start_time = now
+
+
+
+def report():
+    """Prints how long every phase took, and the total."""
+
+    if not ENABLED:
+        return
+
+    total_ms = (time.perf_counter() - start_time) * 1000
+
+    print("Startup times:")
+    for phase_name, ms in phases:
+        print(f"  {phase_name:<28} {ms:>8.1f} ms")
+    print(f"  {'total':<28} {total_ms:>8.1f} ms")
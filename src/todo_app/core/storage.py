@@ -3,11 +3,23 @@
 
 '''
 This handles the import/export of the data, meaning it saves the existing projects/categories/to-do items so that it doesn't have to be recreated everytime the program is launched.
+
+The actual reading/writing is done by a "backend". Every backend has the same methods (load, iter_load, load_index, prepare_save, save), so the rest of the app doesn't need to know which one is used.
+
+Saving is split in two steps, so the slow part can run on another thread (see save_scheduler.py):
+    - prepare_save: runs on the main thread, takes a quick snapshot of what needs saving and returns a "write" function
+    - the "write" function: turns the snapshot into text and writes it to disk. Can be run on any thread.
 '''
 
+import codecs
 import json
 import os
+import struct
 import appdirs
+from todo_app.core import data
+from todo_app.core import journal
+from todo_app.core import binary_format
+from todo_app.core import json_stream
 
 
 # Get and create path to C:\Users\[YourUsername]\AppData\Local\ToDoApp\
@@ -16,30 +28,802 @@ DATA_DIR = appdirs.user_data_dir("ToDoApp")
 # Add "data.json" to the end of the path created above
 DATA_FILE = os.path.join(DATA_DIR, "data.json")
 
+# The journal that stores changes made since the data file was last written (only used in "journal" mode)
+JOURNAL_FILE = os.path.join(DATA_DIR, "data.journal")
+
+# The undo/redo history, saved when the app closes (see history.py)
+HISTORY_FILE = os.path.join(DATA_DIR, "data.history")
+
+# If the undo/redo history should be kept for the next launch
+KEEP_HISTORY = os.environ.get("TODOAPP_KEEP_HISTORY", "1") != "0"
+
+# The database file (only used in "sqlite" mode)
+DB_FILE = os.path.join(DATA_DIR, "data.db")
+
+# The compact binary data file (only used in "binary" mode)
+BINARY_FILE = os.path.join(DATA_DIR, "data.bin")
+
+# The folder with one file per project plus an index file (only used in "sharded" mode)
+SHARD_DIR = os.path.join(DATA_DIR, "projects")
+
+# How the data is saved:
+    # "json" - re-writes the whole data file on every save
+    # "journal" - appends each change to the journal and only re-writes the data file once in a while
+    # "sqlite" - stores projects, categories and to-do items as rows in a database and only updates the rows that changed
+    # "binary" - like "json", but in a smaller binary format that is faster to read (see binary_format.py)
+    # "sharded" - one file per project plus an index file, only the files of changed projects are re-written
+STORAGE_MODE = os.environ.get("TODOAPP_STORAGE", "json")
+
+# How much is collected before it's written to disk, when a file is written in pieces (in bytes)
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# How many older copies of the data file to keep (data.json.1 is the newest, data.json.3 the oldest)
+BACKUP_COUNT = 3
+
+# If the projects view should only get the project names/counts at launch (the categories and to-do items are loaded when a project is opened)
+LAZY_LOADING = os.environ.get("TODOAPP_LAZY", "1") != "0"
+
+# If the json data file should be read one project at a time (see json_stream.py), instead of all at once with json.load
+STREAMING = os.environ.get("TODOAPP_STREAMING", "1") != "0"
+
+# The backend that is used (created the first time it's needed)
+backend = None
+
+
+
+# --- BACKENDS ---
+
+class JsonBackend():
+    """
+    Saves everything as a single json file
+    """
+
+    # The recorded changes (see data.record_change) aren't used, the projects themselves are saved
+    uses_changes = False
+
+    def __init__(self, data_file, journal_file):
+        self.data_file = data_file
+        self.journal_file = journal_file
+
+        # Where every project is in the data file (project id -> (start, end) in bytes), and the file's size/change time when that was true.
+        # Known after the file was read one project at a time, and kept up to date by every save.
+        self.positions = {}
+        self.file_state = None
+
+        # The version every project had when its text at those positions was written (project id -> version).
+        # A project that was never opened and hasn't changed since then can be copied from the file as it is when saving.
+        self.saved_versions = {}
+
+        # False if data from before ids existed was loaded. Its projects, categories and to-do items get new ids on every launch
+        # until the data file is re-written with them (see JournalBackend.prepare_save).
+        self.ids_saved = True
+
+
+    # Read all the projects (as dictionaries)
+    def load(self):
+
+        # If data file doesn't exist, check the backups (and otherwise start with an empty list)
+        if not os.path.exists(self.data_file):
+            projects_data = None
+
+        else:
+            # Load/read the data. This is a list/array of dictionaries. Each dictionary is a seperate project.
+            projects_data = self.read_file(self.data_file)
+
+        # If the file is missing or broken (e.g. the computer crashed mid-save), use the newest backup that can be read instead
+        if projects_data is None:
+            projects_data = load_newest_backup(self.data_file, self.read_file)
+
+        # Apply the changes that were saved to the journal after the data file was written.
+        # (Done in every mode, so switching from "journal" to "json" mode doesn't lose the last changes)
+        if os.path.exists(self.journal_file) or os.path.exists(self.journal_file + ".old"):
+            projects_data = journal.replay(projects_data, journal.load_changes(self.journal_file, self.data_file))
+
+        if not all(has_ids(project_data) for project_data in projects_data):
+            self.ids_saved = False
+
+        return projects_data
+
+
+    # Read a data file, returns None if it's broken
+    def read_file(self, path):
+        return read_json_file(path)
+
+
+    # Check if the data file can be read one project at a time: it has to be there, not be cut off,
+    # and there can't be a journal (its changes can only be applied to all the projects at once)
+    def can_stream(self):
+        if not STREAMING or not os.path.exists(self.data_file):
+            return False
+
+        if os.path.exists(self.journal_file) or os.path.exists(self.journal_file + ".old"):
+            return False
+
+        return json_stream.ends_like_list(self.data_file)
+
+
+    # Read the projects one at a time (as dictionaries). Each one can be turned into objects before the next one is read.
+    def iter_load(self):
+        if not self.can_stream():
+            yield from self.load()
+            return
+
+        read_any = False
+
+        try:
+            for project_data, start, end in json_stream.iter_list(self.data_file):
+                read_any = True
+
+                if not has_ids(project_data):
+                    self.ids_saved = False
+
+                yield project_data
+
+        except ValueError as error:
+            # Nothing has been handed over yet, so the normal way (which falls back to the backups) can still be used
+            if read_any:
+                raise
+
+            print(f"WARNING: '{self.data_file}' could not be read one project at a time ({error})")
+            yield from self.load()
+
+
+    # Read the name and counts of every project. The full project is returned by the "loader" function when it's needed.
+    def load_index(self):
+        if self.can_stream():
+            try:
+                return self.stream_index()
+            except ValueError as error:
+                print(f"WARNING: '{self.data_file}' could not be read one project at a time ({error})")
+
+        index = []
+
+        for project_data in self.load():
+            index.append({
+                "id": project_data.get("id"),
+                "name": project_data["name"],
+                "category_count": len(project_data["categories"]),
+                # (Counted again instead of using the saved counts, the journal's changes may have been applied to the dictionary)
+                "todo_count": count_todos(project_data),
+                "done_count": count_done(project_data),
+                # The file has already been read, so the loader just hands back the dictionary
+                "loader": lambda project_data=project_data: project_data
+            })
+
+        return index
+
+
+    # Read the name and counts of every project one at a time, only keeping where each project is in the file (not its dictionary).
+    # The loader reads the project from there again when it's opened.
+    def stream_index(self):
+        index = []
+        positions = {}
+        saved_versions = {}
+        file_state = get_file_state(self.data_file)
+
+        for project_data, start, end in json_stream.iter_list(self.data_file):
+
+            # Projects from before ids existed get one here, so the loader can still find them after the file was re-written with it
+            project_id = project_data.get("id") or data.new_id()
+            positions[project_id] = (start, end)
+
+            if not has_ids(project_data):
+                self.ids_saved = False
+
+            # (Only streamed when there is no journal, so the counts saved with the project are up to date. Files from before they were saved are counted.)
+            if "todo_count" in project_data and "done_count" in project_data:
+                todo_count, done_count = project_data["todo_count"], project_data["done_count"]
+            else:
+                todo_count, done_count = count_todos(project_data), count_done(project_data)
+
+            # If the project's text already has everything a save would write (its id and counts), it can be copied as it is while it isn't opened
+            # (a project stub starts at version 0)
+            if "id" in project_data and "todo_count" in project_data and "done_count" in project_data:
+                saved_versions[project_id] = 0
+
+            index.append({
+                "id": project_id,
+                "name": project_data["name"],
+                "category_count": len(project_data["categories"]),
+                "todo_count": todo_count,
+                "done_count": done_count,
+                "loader": lambda project_id=project_id: self.read_project(project_id)
+            })
+
+        self.positions = positions
+        self.file_state = file_state
+        self.saved_versions = saved_versions
+
+        return index
+
+
+    # Read a project from where it is in the file.
+    # If the file has been changed by something else in the meantime, the positions are wrong, so the project is looked up by its id instead.
+    def read_project(self, project_id):
+        position = self.positions.get(project_id)
+
+        if position is not None and get_file_state(self.data_file) == self.file_state:
+            try:
+                project_data = self.read_item(*position)
+            except ValueError:
+                project_data = None
+
+            # (Checking the id too, in case a save replaced the file right while it was being read)
+            if isinstance(project_data, dict) and project_data.get("id", project_id) == project_id:
+                project_data["id"] = project_id
+                return project_data
+
+        for project_data in self.iter_load():
+            if project_data.get("id") == project_id:
+                return project_data
+
+        print(f"ERROR: The project with the id '{project_id}' could not be found in '{self.data_file}', the project will be empty")
+        return None
+
+
+    # Read a single project from its start/end position in the data file
+    def read_item(self, start, end):
+        return json_stream.read_item(self.data_file, start, end)
+
+
+    # Snapshot the project objects and return the function that writes them
+    def prepare_save(self, all_projects, changes):
+
+        # Projects that didn't change just hand over their cached text (or where their text is in the current file)
+        snapshots = [self.snapshot_project(project) for project in all_projects]
+
+        project_ids = [project.id for project in all_projects]
+        versions = [project.version for project in all_projects]
+
+        def write():
+            # Write the json text of every project to the file, piece by piece as it's made
+            positions = []
+            atomic_write(self.data_file, iter_json_text(snapshots, positions), BACKUP_COUNT)
+
+            # Remember where every project ended up, so the projects that were never opened can still be read (and copied) from the new file
+            self.positions = dict(zip(project_ids, positions))
+            self.file_state = get_file_state(self.data_file)
+            self.saved_versions = dict(zip(project_ids, versions))
+
+            # If a journal was left behind from running in journal mode, it's now part of the data file
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+
+        return write
+
+
+    # The snapshot of a project to save.
+    # The text of a project that was never opened isn't kept in memory (that's what lazy loading is for), so if it hasn't changed since it was
+    # written, its text is copied from where it is in the current data file. Otherwise it's made from the project (see Project.snapshot).
+    def snapshot_project(self, project):
+        position = self.positions.get(project.id)
+
+        if not project.is_loaded() and position is not None and self.saved_versions.get(project.id) == project.version:
+            return FileSlice(self.data_file, *position, self.file_state, data.ProjectSnapshot(project))
+
+        return project.snapshot()
+
+
+    # Save the project objects right away
+    def save(self, all_projects, changes):
+        self.prepare_save(all_projects, changes)()
+
+
+
+class FileSlice():
+    """
+    The text of a project, copied piece by piece from where it is in the data file (see JsonBackend.snapshot_project).
+    If the file was re-written by something else in the meantime, the text is made from the "fallback" snapshot instead.
+    """
+    def __init__(self, path, start, end, file_state, fallback):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.file_state = file_state
+        self.fallback = fallback
+
+
+    def iter_json(self):
+        if get_file_state(self.path) != self.file_state:
+            yield from self.fallback.iter_json()
+            return
+
+        # (Read in chunks, so even a huge project never has to be in memory at once. The text decoder handles characters split between chunks.)
+        text_decoder = codecs.getincrementaldecoder("utf-8")()
+
+        with open(self.path, "rb") as f:
+            f.seek(self.start)
+            remaining = self.end - self.start
+
+            while remaining > 0:
+                chunk = f.read(min(WRITE_BUFFER_SIZE, remaining))
+
+                if not chunk:
+                    raise ValueError(f"'{self.path}' is shorter than expected")
+
+                remaining -= len(chunk)
+                yield text_decoder.decode(chunk, final = remaining == 0)
+
+
+
+class JournalBackend(JsonBackend):
+    """
+    Saves each change as a line in the journal, and only re-writes the json file once the journal gets big
+    """
+    uses_changes = True
+
+    # Return the function that appends the changes to the journal
+    def prepare_save(self, all_projects, changes):
+
+        # Once the journal gets big, it gets folded into a new data file, so a snapshot of everything is needed.
+        # Data from before ids existed is folded in on the first save right away, otherwise it gets new ids on the next launch
+        # (and the saved undo/redo history, which finds things by id, can't find them anymore).
+        compact_now = not self.ids_saved and changes and not journal.is_compacting()
+
+        ids_saved = self.ids_saved
+
+        if journal.needs_compaction(self.journal_file) or compact_now:
+            self.ids_saved = True
+
+            snapshots = [self.snapshot_project(project) for project in all_projects]
+            project_ids = [project.id for project in all_projects]
+            versions = [project.version for project in all_projects]
+            positions = []
+        else:
+            snapshots = None
+
+        def write_snapshot_file(text):
+            atomic_write(self.data_file, text, BACKUP_COUNT)
+
+            # Remember where every project ended up in the new data file, like a normal json save does
+            # (otherwise the positions point into the old file, and every project that was never opened has to be looked up by reading the whole file)
+            self.positions = dict(zip(project_ids, positions))
+            self.file_state = get_file_state(self.data_file)
+            self.saved_versions = dict(zip(project_ids, versions))
+
+        def write():
+            # Only add the changes to the end of the journal
+            journal.append_changes(self.journal_file, changes)
+
+            # Fold the journal into a new data file in the background.
+            # (If that can't be started, the changes are still in the journal, so the save didn't fail. The next save tries again.)
+            if snapshots is not None:
+                try:
+                    journal.compact(self.journal_file, iter_json_text(snapshots, positions), write_snapshot_file)
+                except OSError as error:
+                    print(f"WARNING: The journal could not be folded into '{self.data_file}' ({error})")
+                    self.ids_saved = ids_saved
+
+        return write
+
+
+
+class BinaryBackend(JsonBackend):
+    """
+    Saves everything as a single file in the compact binary format
+    """
+    def __init__(self, data_file, journal_file, json_file=None):
+        super().__init__(data_file, journal_file)
+
+        # The first time, convert the old json file (if there is one)
+        if not os.path.exists(data_file) and json_file is not None and os.path.exists(json_file):
+            binary_format.json_to_binary(json_file, data_file)
+            print(f"Converted '{json_file}' to '{data_file}'")
+
+        # The format version of the file the positions are in (version 1 files are read differently, see binary_format.py)
+        self.format_version = binary_format.FORMAT_VERSION
+
+
+    # The json way of streaming doesn't work on a binary file (the index is read one project block at a time instead, see load_index)
+    def can_stream(self):
+        return False
+
+
+    # Read the name and counts of every project, one project block at a time, only keeping where each block is in the file.
+    # The loader decodes its block again when the project is opened (so the dictionaries of the unopened projects are never kept in memory).
+    def load_index(self):
+
+        # (A journal left behind from running in journal mode has to be applied to all the projects at once)
+        if not os.path.exists(self.data_file) or os.path.exists(self.journal_file) or os.path.exists(self.journal_file + ".old"):
+            return super().load_index()
+
+        index = []
+        positions = {}
+        saved_versions = {}
+        file_state = get_file_state(self.data_file)
+
+        try:
+            for block, start, end, format_version in binary_format.iter_blocks(self.data_file):
+                summary = binary_format.summarize_project(block, format_version)
+
+                # Projects from before ids existed get one here (like in JsonBackend.stream_index)
+                project_id = summary.get("id") or data.new_id()
+                positions[project_id] = (start, end)
+
+                # A block in the current format with an id can be copied as it is while the project isn't opened (a project stub starts at version 0)
+                if format_version == binary_format.FORMAT_VERSION and "id" in summary:
+                    saved_versions[project_id] = 0
+
+                index.append({
+                    "id": project_id,
+                    "name": summary["name"],
+                    "category_count": summary["category_count"],
+                    "todo_count": summary["todo_count"],
+                    "done_count": summary["done_count"],
+                    "loader": lambda project_id=project_id: self.read_project(project_id)
+                })
+
+        except (ValueError, IndexError, struct.error, UnicodeDecodeError) as error:
+            # The normal way falls back to the backups
+            print(f"WARNING: '{self.data_file}' could not be read one project at a time ({error})")
+            return super().load_index()
+
+        self.positions = positions
+        self.file_state = file_state
+        self.saved_versions = saved_versions
+        self.format_version = format_version if index else binary_format.FORMAT_VERSION
+
+        return index
 
-def save_data(all_projects_data):
-    """Saves the projects data to a JSON file."""
+
+    # Read a single project block from its start/end position in the data file
+    def read_item(self, start, end):
+        return binary_format.read_block(self.data_file, start, end, self.format_version)
+
+
+    # Read a binary data file, returns None if it's broken
+    def read_file(self, path):
+        try:
+            with open(path, "rb") as f:
+                return binary_format.decode(f.read())
+
+        except (ValueError, IndexError, struct.error, UnicodeDecodeError):
+            print(f"WARNING: '{path}' is damaged and could not be read")
+            return None
+
+
+    # Snapshot the project objects and return the function that writes them
+    def prepare_save(self, all_projects, changes):
+        parts = []
+
+        project_ids = [project.id for project in all_projects]
+        versions = [project.version for project in all_projects]
+        file_state = self.file_state
+
+        for project in all_projects:
+            position = self.positions.get(project.id)
+
+            # Projects that didn't change hand over the block from the last save
+            if project.binary_cache is not None and project.binary_cache[0] == project.version:
+                parts.append(project.binary_cache[1])
+
+            # Projects that were never opened and didn't change are copied from where their block is in the current file
+            # (their block isn't kept in memory, that's what lazy loading is for)
+            elif not project.is_loaded() and position is not None and self.saved_versions.get(project.id) == project.version:
+                parts.append((project, position))
+
+            # The others hand over a copy of their data, which is turned into a block on the save thread
+            else:
+                parts.append((project, project.version, project.to_dict()))
+
+        def write():
+            blocks = []
+
+            # (Only copy blocks if the file wasn't replaced by something else in the meantime)
+            can_copy = os.path.exists(self.data_file) and get_file_state(self.data_file) == file_state
+
+            for part in parts:
+                if isinstance(part, bytes):
+                    blocks.append(part)
+
+                elif len(part) == 2:
+                    project, (start, end) = part
+
+                    if can_copy:
+                        with open(self.data_file, "rb") as f:
+                            f.seek(start)
+                            blocks.append(f.read(end - start))
+                    else:
+                        blocks.append(binary_format.encode_project(project.to_dict()))
+
+                else:
+                    project, version, project_data = part
+                    block = binary_format.encode_project(project_data)
+
+                    # Cache the block, marked with the version it was made from (same idea as the json text cache)
+                    project.binary_cache = (version, block)
+                    blocks.append(block)
+
+            atomic_write(self.data_file, binary_format.iter_file(blocks), BACKUP_COUNT)
+
+            # Remember where every block ended up (after the 9 byte header, every block comes after its 4 byte size),
+            # so the projects that were never opened can still be read (and copied) from the new file
+            positions = []
+            position = 9
+            for block in blocks:
+                positions.append((position + 4, position + 4 + len(block)))
+                position += 4 + len(block)
+
+            self.positions = dict(zip(project_ids, positions))
+            self.file_state = get_file_state(self.data_file)
+            self.saved_versions = dict(zip(project_ids, versions))
+            self.format_version = binary_format.FORMAT_VERSION
+
+            # If a journal was left behind from running in journal mode, it's now part of the data file
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+
+        return write
+
+
+
+def get_backend():
+    """Returns the backend for the selected storage mode (and creates it the first time)."""
+    global backend
+
+    if backend is None:
+
+        if STORAGE_MODE == "sqlite":
+            # Only import sqlite when it's actually used
+            from todo_app.core.sqlite_storage import SQLiteBackend
+            backend = SQLiteBackend(DB_FILE, DATA_FILE)
+
+        elif STORAGE_MODE == "journal":
+            backend = JournalBackend(DATA_FILE, JOURNAL_FILE)
+
+        elif STORAGE_MODE == "sharded":
+            # Imported here since sharded_storage uses functions from this file
+            from todo_app.core.sharded_storage import ShardedBackend
+            backend = ShardedBackend(SHARD_DIR, DATA_FILE)
+
+        elif STORAGE_MODE == "binary":
+            backend = BinaryBackend(BINARY_FILE, JOURNAL_FILE, DATA_FILE)
+
+        else:
+            backend = JsonBackend(DATA_FILE, JOURNAL_FILE)
+
+        # Only describe every change if the backend saves them
+        data.recording_changes = backend.uses_changes
+
+    return backend
+
+
+
+# --- SAVING ---
+
+def prepare_save(all_projects, changes=None):
+    """
+    Takes a snapshot of the project objects (on the main thread) and returns a function that writes it (on any thread).
+    The changes made since the last save are taken here, unless they're given (see SaveScheduler.save_now).
+    """
 
     # Create the folder(s) if it/they dont exist
     os.makedirs(DATA_DIR, exist_ok=True)
 
-    # Write the data to the JSON file
-        # open the file in "write" mode and store the file as an object called f
-    with open(DATA_FILE, "w") as f:
-        # Write json style text, using infor stored in all_projects_data, to the object f
-        json.dump(all_projects_data, f, indent=4)
+    # Get the changes made since the last save (used by the journal and sqlite backends)
+    if changes is None:
+        changes = data.take_changes()
+
+    return get_backend().prepare_save(all_projects, changes)
+
+
+
+def save_projects(all_projects):
+    """Saves the project objects right away, only re-serializing/re-writing the projects/categories that changed."""
+    prepare_save(all_projects)()
+
+
+
+def iter_json_text(snapshots, positions=None):
+    """
+    Hands over the text of the whole data file piece by piece, made from project snapshots, so it can be written while it's being made
+    (instead of first gluing the text of every project together into one big string).
+    If a "positions" list is given, the (start, end) byte positions of every project in the file are added to it.
+    """
+    yield "[\n"
+    position = 2
+
+    for number, snapshot in enumerate(snapshots):
+        if number > 0:
+            yield ",\n"
+            position += 2
+
+        start = position
+
+        # Projects that haven't changed since the last save are already text
+        for piece in data.snapshot_iter_json(snapshot):
+            position += len(piece) if piece.isascii() else len(piece.encode("utf-8"))
+            yield piece
+
+        if positions is not None:
+            positions.append((start, position))
+
+    yield "\n]"
+
+
+
+# --- SAFE WRITING ---
+
+def atomic_write(path, text, backup_count=0):
+    """
+    Writes the text to the file in a way that never leaves a half written file behind.
+    The text is first written to a temporary file and forced onto the disk, then swapped in place of the old file in a single step.
+    The text can also be given in pieces (e.g. from a generator), which are written as they come, so the whole text never has to be in memory at once.
+    """
+
+    temp_file = path + ".tmp"
+
+    pieces = iter([text] if isinstance(text, (str, bytes)) else text)
+    first_piece = next(pieces, "")
+
+    # Bytes (binary format) have to be written in binary mode.
+    # (newline="" writes line breaks as they are on every system, so the byte positions of the projects are the same everywhere)
+    if isinstance(first_piece, bytes):
+        f = open(temp_file, "wb", buffering=WRITE_BUFFER_SIZE)
+    else:
+        f = open(temp_file, "w", buffering=WRITE_BUFFER_SIZE, newline="")
+
+    # Write to the temporary file first, the real file is untouched until the very end
+    with f:
+        f.write(first_piece)
+        f.writelines(pieces)
+
+        # Make sure the text has actually reached the disk, not just the operating system's memory
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Keep the old file as the newest backup
+    if backup_count > 0 and os.path.exists(path):
+        rotate_backups(path, backup_count)
+
+    # Swap the new file in (renaming is all-or-nothing, so the file is either the old or the new one, never a mix)
+    os.replace(temp_file, path)
 
+    # On Linux/Mac the folder also has to be synced for the rename itself to survive a crash (not possible/needed on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        folder = os.open(os.path.dirname(path), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(folder)
+        finally:
+            os.close(folder)
 
 
+
+def rotate_backups(path, backup_count):
+    """Moves every backup one step older (data.json.1 -> data.json.2 ...) and the current file to data.json.1"""
+
+    # Start with the oldest one, so nothing gets overwritten before it has been moved. The oldest one is overwritten/dropped.
+    for number in range(backup_count - 1, 0, -1):
+        older = f"{path}.{number}"
+        if os.path.exists(older):
+            os.replace(older, f"{path}.{number + 1}")
+
+    # Renaming (instead of copying) keeps this fast no matter how big the file is
+    os.replace(path, f"{path}.1")
+
+
+
+def get_file_state(path):
+    """The size and last change time of a file, to notice if it has been re-written since."""
+    file_stats = os.stat(path)
+    return (file_stats.st_size, file_stats.st_mtime_ns)
+
+
+
+def read_json_file(path):
+    """Reads a json file, returns None if it is broken/cut off."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        print(f"WARNING: '{path}' is damaged and could not be read")
+        return None
+
+
+
+def load_newest_backup(path, read_file=read_json_file):
+    """Returns the data of the newest backup that can be read with the read_file function (or an empty list if there is none)."""
+
+    for number in range(1, BACKUP_COUNT + 1):
+        backup_file = f"{path}.{number}"
+
+        if os.path.exists(backup_file):
+            projects_data = read_file(backup_file)
+
+            if projects_data is not None:
+                print(f"Loaded the backup '{backup_file}' instead")
+                return projects_data
+
+    return []
+
+
+
+# --- LOADING ---
+
 def load_data():
-    """Loads projects data from a JSON file."""
+    """Loads all the projects data (a list of dictionaries, one per project)."""
+
+    # Create the folder(s) if it/they dont exist
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+    return get_backend().load()
+
+
+
+def iter_data():
+    """
+    Loads the projects data one project at a time (yields a dictionary per project), so each one can be turned into objects before the next is read.
+    Raises a ValueError if the data file turns out to be damaged after some projects were already handed over.
+    """
+
+    # Create the folder(s) if it/they dont exist
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+    return get_backend().iter_load()
+
+
+
+def load_index():
+    """Loads the name and counts of every project (a list of dictionaries) plus a "loader" function that returns the full project."""
+
+    # Create the folder(s) if it/they dont exist
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+    return get_backend().load_index()
+
+
+
+def count_todos(project_data):
+    """The number of to-do items in a project's dictionary"""
+    return sum(len(category["todo_items"]) for category in project_data["categories"])
+
+
+
+def count_done(project_data):
+    """The number of checked/done to-do items in a project's dictionary"""
+    return sum(1 for category in project_data["categories"] for todo in category["todo_items"] if todo.get("is_checked", False))
+
+
+
+def has_ids(project_data):
+    """Checks if a project's dictionary has the ids of the project and every category/to-do item in it (files from before ids existed don't)"""
+    return "id" in project_data and all(
+        "id" in category and all("id" in todo for todo in category["todo_items"])
+        for category in project_data["categories"]
+        )
+
+
+
+# --- EXPORT ---
+# (Importing/exporting is done through the service, see TodoService.import_json/export_json, which works with every storage mode)
+
+def write_readable_json(json_file, projects_data):
+    """Writes project dictionaries to a readable (indented) json file one at a time, so they never all have to exist at once."""
+    with open(json_file, "w") as f:
+        f.write("[\n")
+
+        for number, project_data in enumerate(projects_data):
+            if number > 0:
+                f.write(",\n")
+            json.dump(project_data, f, indent=4)
+
+        f.write("\n]")
+
+
+
+# --- UNDO/REDO HISTORY ---
+
+def save_history(history_data):
+    """Writes the undo/redo history (a dictionary, see history.py) next to the data file."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    atomic_write(HISTORY_FILE, json.dumps(history_data))
+
+
 
-    # If data file doesn't exist, return an empty list
-    if not os.path.exists(DATA_FILE):
-        return []
-    
-    # If file does exist, open it in read mode
-    with open(DATA_FILE, "r") as f:
+def load_history():
+    """Returns the saved undo/redo history, or None if there is none (or it can't be read)."""
+    if not os.path.exists(HISTORY_FILE):
+        return None
 
-        # Load/read the data and return it. This is being returned as a list/array of dictionaries. Each dictionary is a seperate project.
-        return json.load(f)
\ No newline at end of file
+    return read_json_file(HISTORY_FILE)
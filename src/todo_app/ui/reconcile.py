@@ -0,0 +1,69 @@
+'''
+Keeps a set of widgets in sync with a list of data objects, without destroying and re-creating all of them every time.
+
+Every data object (e.g. a project) gets one widget (e.g. a project button), remembered by the object itself.
+When the list changes, only the widgets for new objects are created, the ones for removed objects destroyed, and only widgets that moved are placed again.
+'''
+
+
+class Reconciler():
+    """
+    Matches widgets to data objects (by the object itself, not by name) and only changes what is needed
+    """
+    def __init__(self, create, destroy, place, update=None):
+        # Functions that do the actual widget work
+        self.create = create # create(item) -> widget
+        self.destroy = destroy # destroy(widget)
+        self.place = place # place(widget, position), e.g. put it in the right row/column of a grid
+        self.update = update # update(item, widget), e.g. change the text if the name changed (optional)
+
+        # item -> [widget, position]
+        self.entries = {}
+
+        # Counters for how much widget work was done (for profiling/benchmarks)
+        self.created = 0
+        self.destroyed = 0
+        self.placed = 0
+
+
+    # Bring the widgets in line with the list of items
+    def reconcile(self, items):
+        new_entries = {}
+
+        for position, item in enumerate(items):
+            entry = self.entries.pop(item, None)
+
+            # New item: create a widget for it
+            if entry is None:
+                entry = [self.create(item), None]
+                self.created += 1
+
+            # Existing item: let it update itself if something about it changed
+            elif self.update is not None:
+                self.update(item, entry[0])
+
+            # Only place the widget if it's new or has moved
+            if entry[1] != position:
+                self.place(entry[0], position)
+                entry[1] = position
+                self.placed += 1
+
+            new_entries[item] = entry
+
+        # Whatever is left over belongs to items that are no longer in the list
+        for widget, position in self.entries.values():
+            self.destroy(widget)
+            self.destroyed += 1
+
+        self.entries = new_entries
+
+
+    # The widget for an item (or None if it doesn't have one)
+    def widget_for(self, item):
+        entry = self.entries.get(item)
+        return entry[0] if entry is not None else None
+
+
+    # A short summary of the counters
+    def stats_text(self):
+        return f"created: {self.created}, destroyed: {self.destroyed}, placed: {self.placed}"
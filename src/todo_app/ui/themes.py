@@ -1,12 +1,14 @@
+import json
+import os
+from types import MappingProxyType
+
 # Define the main background color for all views
 MAIN_FRAME_COLOR = "#202020"
 
-# Function for returning settings based on themes
-def get_theme(theme):
-    """Returns the a dictionary with settings for the requested theme"""
 
-    # Define settings for different themes
-    default_theme = {
+# The settings of the themes that come with the app
+BUILTIN_THEMES = {
+    "Default": {
         "main" : "#303030",
         "active_category" : "#404040", # Temp color
         "accent" : "#404040",
@@ -15,9 +17,9 @@ def get_theme(theme):
         "checkbox_border" : "#9C3939",
         "checkbox_hover" : "#C4C4C4",
         "checkbox_done" : "#349e31"
-    }
+    },
 
-    red_theme = {
+    "Red": {
         "main" : "#352929",
         "active_category" : "#493030",
         "accent" : "#ad5050",
@@ -26,9 +28,9 @@ def get_theme(theme):
         "checkbox_border" : "#9C3939",
         "checkbox_hover" : "#C4C4C4",
         "checkbox_done" : "#349e31"
-    }
+    },
 
-    green_theme = {
+    "Green": {
         "main" : "#3B5541",
         "active_category" : "#3C6946",
         "accent" : "#43852f",
@@ -37,9 +39,9 @@ def get_theme(theme):
         "checkbox_border" : "#9C3939",
         "checkbox_hover" : "#C4C4C4",
         "checkbox_done" : "#349e31"
-    }
+    },
 
-    blue_theme = {
+    "Blue": {
         "main" : "#3B4155",
         "active_category" : "#3A4569",
         "accent" : "#4173be",
@@ -48,9 +50,9 @@ def get_theme(theme):
         "checkbox_border" : "#9C3939",
         "checkbox_hover" : "#C4C4C4",
         "checkbox_done" : "#349e31"
-    }
+    },
 
-    yellow_theme = {
+    "Yellow": {
         "main" : "#52553B",
         "active_category" : "#595E36",
         "accent" : "#858b2c",
@@ -59,9 +61,9 @@ def get_theme(theme):
         "checkbox_border" : "#9C3939",
         "checkbox_hover" : "#C4C4C4",
         "checkbox_done" : "#349e31"
-    }
+    },
 
-    purple_theme = {
+    "Purple": {
         "main" : "#4E3B55",
         "active_category" : "#593964",
         "accent" : "#8648a3",
@@ -71,22 +73,70 @@ def get_theme(theme):
         "checkbox_hover" : "#C4C4C4",
         "checkbox_done" : "#349e31"
     }
+}
+
+
+# The theme registry: theme name -> read-only settings.
+# Built once when the app starts, so getting a theme is a single dictionary lookup and everyone shares the same settings object.
+# (Read-only so one category/widget can't accidentally change the colors of everything else using the same theme)
+THEMES = {name: MappingProxyType(settings) for name, settings in BUILTIN_THEMES.items()}
+
+
+
+# Function for returning settings based on themes
+def get_theme(theme):
+    """Returns the (read-only, shared) settings for the requested theme, or None if the theme doesn't exist"""
+    return THEMES.get(theme)
+
+
+
+def theme_names():
+    """Returns the names of all themes, the built-in ones first"""
+    return list(THEMES)
+
+
+
+def is_builtin(theme):
+    """Checks if a theme comes with the app (user themes might not exist anymore the next time the app starts)"""
+    return theme in BUILTIN_THEMES
+
+
+
+def register_theme(name, settings):
+    """Adds a theme to the registry. Colors that are missing are taken from the "Default" theme."""
+
+    # Fill in the missing colors, and ignore anything that isn't a color setting
+    full_settings = dict(BUILTIN_THEMES["Default"])
+    full_settings.update({key: value for key, value in settings.items() if key in full_settings})
+
+    THEMES[name] = MappingProxyType(full_settings)
+
+
+
+def load_user_themes(themes_file):
+    """
+    Adds the user's own themes from a json file, e.g. {"Ocean": {"main": "#1E3A4C", "accent": "#2E86AB", ...}}.
+    Does nothing if the file doesn't exist. Built-in themes can't be replaced.
+    """
+
+    if not os.path.exists(themes_file):
+        return
+
+    try:
+        with open(themes_file, "r") as f:
+            user_themes = json.load(f)
 
+    except (json.JSONDecodeError, UnicodeDecodeError, OSError):
+        print(f"WARNING: '{themes_file}' could not be read, no user themes were loaded")
+        return
 
-    if theme == "Default":
-        return default_theme
-    
-    elif theme == "Red":
-        return red_theme
+    if not isinstance(user_themes, dict):
+        print(f"WARNING: '{themes_file}' should contain a dictionary of themes, no user themes were loaded")
+        return
 
-    elif theme == "Green":
-        return green_theme
+    for name, settings in user_themes.items():
+        if is_builtin(name) or not isinstance(settings, dict):
+            print(f"WARNING: Skipped the user theme '{name}'")
+            continue
 
-    elif theme == "Blue":
-        return blue_theme
-    
-    elif theme == "Yellow":
-        return yellow_theme
-    
-    elif theme == "Purple":
-        return purple_theme
\ No newline at end of file
+        register_theme(name, settings)
@@ -1,15 +1,110 @@
 # A portion of this code was written with the help of an AI tool to help with debugging and explaining/teaching new concepts while the logic and structure were my own.
 
+import os
 import customtkinter as ctk
+from todo_app.ui import themes
 
 DEFAULT_THEME = "default"
 
+# The most hidden widgets a pool keeps around for re-use (the rest are destroyed), can be changed with TODOAPP_POOL_CAP
+POOL_CAP = int(os.environ.get("TODOAPP_POOL_CAP", "50"))
+
+# Every pool that is in use (used to print the hit/miss counters)
+all_pools = []
+
+# The counters of pools that were closed, added together by pool name (so the stats still include them)
+closed_pool_counts = {}
+
 
 def confirmation_print():
     """Just to show that the button works"""
     print("This works - But you need to assign a command to it!")
 
 
+
+# --- WIDGET POOL ---
+class WidgetPool():
+    """
+    Keeps widgets that are no longer needed hidden instead of destroying them, so they can be re-used.
+    Creating a widget is slow compared to re-configuring one, so re-using is much faster when e.g. switching projects.
+    The widgets need a "reuse" method that takes the same arguments as "create" (except master) and re-configures the widget.
+    """
+    def __init__(self, create, name, cap = None):
+        self.create = create # create(**settings) -> new widget
+        self.name = name # Shown in the stats
+        self.cap = POOL_CAP if cap is None else cap
+
+        # The hidden widgets, ready to be re-used
+        self.free = []
+
+        # Counters for profiling: re-used widgets (hits), newly created widgets (misses) and widgets destroyed because the pool was full
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+        all_pools.append(self)
+
+
+    # Get a widget: a re-used one if there is one, otherwise a new one
+    def acquire(self, **settings):
+        if self.free:
+            widget = self.free.pop()
+            widget.reuse(**settings)
+            self.hits += 1
+        else:
+            widget = self.create(**settings)
+            self.misses += 1
+
+        return widget
+
+
+    # Hide a widget and keep it for later (or destroy it if the pool is full)
+    def release(self, widget):
+        if len(self.free) < self.cap:
+            widget.grid_remove()
+            self.free.append(widget)
+        else:
+            widget.destroy()
+            self.discarded += 1
+
+
+    # Stop using the pool (e.g. the widget it belongs to is destroyed): forget the hidden widgets and stop listing it in the stats
+    def close(self):
+        self.free.clear()
+
+        if self in all_pools:
+            all_pools.remove(self)
+
+            counts = closed_pool_counts.setdefault(self.name, [0, 0, 0])
+            counts[0] += self.hits
+            counts[1] += self.misses
+            counts[2] += self.discarded
+
+
+
+def pool_stats_text():
+    """A short summary of the counters of all pools (pools with the same name are added together)."""
+
+    totals = {name: list(counts) for name, counts in closed_pool_counts.items()}
+    for pool in all_pools:
+        counts = totals.setdefault(pool.name, [0, 0, 0])
+        counts[0] += pool.hits
+        counts[1] += pool.misses
+        counts[2] += pool.discarded
+
+    return "\n".join(
+        f"{name}: {hits} re-used, {misses} created, {discarded} destroyed (pool full)"
+        for name, (hits, misses, discarded) in totals.items()
+    )
+
+
+# The text of a project/tab button: the name plus how many to-do items are done, e.g. "Groceries" and "12/40 done".
+# The counts are kept up to date by the project/category (see data.py), so this never has to go through the to-do items.
+def progress_text(name, done_count, todo_count, separator = "\n"):
+    return f"{name}{separator}{done_count}/{todo_count} done"
+
+
+
 # --- PROJECT BUTTON ---
 class ProjectButton(ctk.CTkButton):
     """
@@ -25,7 +120,7 @@ class ProjectButton(ctk.CTkButton):
             "width": 130,
             "border_width": 1,
             "corner_radius": 15,
-            "text": self.project_data.project_name,
+            "text": progress_text(project_data.project_name, project_data.done_count(), project_data.todo_count()),
             "font": ctk.CTkFont(size=16, weight="bold"),
             "command": command,
             "fg_color": theme["accent"],
@@ -46,6 +141,22 @@ class ProjectButton(ctk.CTkButton):
             hover_color = new_theme["hover"],
             text_color = new_theme["text"]
             )
+
+
+    # Update the button if the project's data changed (only re-configures when something is actually different)
+    def update_data(self, project_data):
+        self.project_data = project_data
+        text = progress_text(project_data.project_name, project_data.done_count(), project_data.todo_count())
+
+        if self.cget("text") != text:
+            self.configure(text = text)
+
+
+    # Re-configure a pooled button for another project (see WidgetPool)
+    def reuse(self, theme, command, project_data):
+        self.configure(command = command)
+        self.update_data(project_data)
+        self.update_theme(theme)
         
 
 
@@ -297,7 +408,68 @@ class ProjectsGrid(ctk.CTkFrame):
         self.grid_rowconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1)
         self.grid_columnconfigure(0, weight=1)
-        
+
+
+
+# --- SEARCH RESULTS ---
+class SearchResults(ctk.CTkScrollableFrame):
+    """The list of search results that shows instead of the grid of projects while something is typed in the search box"""
+
+    def __init__(self, master, theme, **kwargs):
+        defaults = {
+        "fg_color": "#252525",
+        "border_width": 1,
+        "border_color": "#505050"
+        }
+
+        # Allow user-provided arguments to override the defaults
+        defaults.update(kwargs)
+
+        super().__init__(master=master, **defaults)
+
+        self.theme = theme
+
+        self.grid_columnconfigure(0, weight=1)
+
+        # Shown when nothing matches
+        self.no_results_label = ctk.CTkLabel(
+            master = self,
+            text = "Nothing found",
+            text_color = "#707070",
+            font = ("", 18, "bold"),
+        )
+
+        # One button per result. The buttons are kept (hidden) when there are fewer results, and re-used for the next search.
+        self.result_buttons = []
+
+
+    # Show the results: a list of (text, command) pairs, one per result
+    def show(self, results):
+
+        # Create more buttons if there aren't enough
+        while len(self.result_buttons) < len(results):
+            button = ctk.CTkButton(
+                master = self,
+                anchor = "w",
+                fg_color = self.theme["accent"],
+                hover_color = self.theme["hover"],
+                text_color = self.theme["text"]
+            )
+            self.result_buttons.append(button)
+
+        for row, button in enumerate(self.result_buttons):
+            if row < len(results):
+                text, command = results[row]
+                button.configure(text = text, command = command)
+                button.grid(row=row, column=0, padx=10, pady=5, sticky="ew")
+            else:
+                button.grid_remove()
+
+        if results:
+            self.no_results_label.grid_remove()
+        else:
+            self.no_results_label.grid(row=0, column=0, pady=20)
+
 
 
 # --- NO TABS / CATEGORIES FRAME ---
@@ -348,11 +520,12 @@ class TabsButton(ctk.CTkButton):
     """
     The buttons above the scrollable frame, acting as folder tabs
     """
-    def __init__(self, master, theme, **kwargs):
+    def __init__(self, master, theme, category, **kwargs):
         
         defaults = {
             "height": 40,
             "width": 120,
+            "text": progress_text(category.category_name, category.done_count, len(category.todo_items), separator = "  "),
             "corner_radius": 0,
             "font": ctk.CTkFont(size=14),
             # No need for a command as it already exists from creating the button in tabs_view.py
@@ -377,6 +550,21 @@ class TabsButton(ctk.CTkButton):
             )
 
 
+    # Update the text if the category's name or counts changed (only re-configures when something is actually different)
+    def update_data(self, category):
+        text = progress_text(category.category_name, category.done_count, len(category.todo_items), separator = "  ")
+
+        if self.cget("text") != text:
+            self.configure(text = text)
+
+
+    # Re-configure a pooled button for another category (see WidgetPool)
+    def reuse(self, theme, category, command):
+        self.configure(command = command)
+        self.update_data(category)
+        self.update_theme(theme)
+
+
 
 # --- TABS/CATEOGRY BAR ---
 class TabsCategories (ctk.CTkFrame):
@@ -403,7 +591,7 @@ class TabsBody(ctk.CTkFrame):
     """
     The main/big frame that holds all the to-do items
     """
-    def __init__ (self, master, theme, on_add_click, **kwargs):
+    def __init__ (self, master, theme, on_add_click, on_toggle, on_delete, delete_theme, **kwargs):
 
         defaults = {
             "width": 250,
@@ -424,11 +612,14 @@ class TabsBody(ctk.CTkFrame):
         self.grid_columnconfigure(1, weight=0)
         self.grid_columnconfigure(2, weight=1)
 
-        self.todo_frame = ctk.CTkScrollableFrame(
+        # The list of to-do items. Only the rows that fit on screen are created, no matter how many items there are.
+        self.todo_frame = VirtualTodoList(
             master = self,
-            #height = 200,
             width = 250,
-            fg_color = theme["main"]
+            theme = theme,
+            on_toggle = on_toggle,
+            on_delete = on_delete,
+            delete_theme = delete_theme
         )
 
         self.todo_frame.grid(row=0, column=0, columnspan=3, sticky="nsew", padx = 0, pady = 0)
@@ -454,10 +645,11 @@ class TabsBody(ctk.CTkFrame):
     # Method/function for updating the theme
     def update_theme(self, new_theme):
 
-        # Update the scrollable frame color
+        # Update the scrollable frame color (and the checkboxes in it)
         self.todo_frame.configure(
             fg_color = new_theme["main"]
             )
+        self.todo_frame.update_theme(new_theme)
         
         # Update the add button colors
         self.button_add.configure(
@@ -490,6 +682,288 @@ class ToDoItem(ctk.CTkCheckBox):
         
 
 
+# --- TO DO ROW ---
+class TodoRow(ctk.CTkFrame):
+    """
+    A single row in the to-do list: a delete button and the to-do item checkbox.
+    The row isn't tied to one to-do item, it can be "bound" to any item (see VirtualTodoList).
+    """
+
+    def __init__(self, master, theme, delete_theme, on_toggle, on_delete, **kwargs):
+
+        defaults = {
+            "fg_color": "transparent"
+        }
+
+        defaults.update(kwargs)
+
+        super().__init__(master=master, **defaults)
+
+        # The to-do item (data object) currently shown in this row, and if the row is on the grid
+        self.todo = None
+        self.is_shown = False
+
+        # Functions from tabs_view.py, called with the row's current to-do item
+        self.on_toggle = on_toggle
+        self.on_delete = on_delete
+
+        # The checkbox state. The same variable is re-used for every item the row shows.
+        self.checkbox_state_var = ctk.BooleanVar(value = False)
+
+        # Create a delete button that will be next to the to-do item
+        self.button_delete = SquareButton(
+            master = self,
+            text = "X",
+            width = 25,
+            height = 25,
+            font = ("", 12, "normal"),
+            theme = delete_theme,
+            corner_radius = 5,
+            command = lambda: self.on_delete(self.todo, self)
+        )
+
+        self.button_delete.grid(column = 0, row = 0)
+
+        # Create the to-do item/checkbox UI widget
+        self.checkbox = ToDoItem(
+            master = self,
+            theme = theme,
+            text = "",
+            variable = self.checkbox_state_var,
+            command = lambda: self.on_toggle(self.todo, self.checkbox_state_var)
+        )
+
+        self.checkbox.grid(column = 1, row = 0, padx = (20, 0))
+
+
+    # Show a (new) to-do item in this row. Only touches the checkbox if what it shows is actually different.
+    def bind_todo(self, todo):
+        self.todo = todo
+
+        # Setting the variable updates the checkbox, without calling its command
+        if self.checkbox_state_var.get() != todo.is_checked:
+            self.checkbox_state_var.set(todo.is_checked)
+
+        if self.checkbox.cget("text") != todo.text:
+            self.checkbox.configure(text = todo.text)
+
+
+    # Method/function for updating the theme
+    def update_theme(self, new_theme):
+        self.checkbox.configure(
+            fg_color = new_theme["checkbox_done"],
+            hover_color = new_theme["checkbox_hover"],
+            border_color = new_theme["checkbox_border"]
+        )
+
+
+    # Re-use a pooled row (see WidgetPool). The item itself is set with bind_todo.
+    def reuse(self, theme):
+        self.todo = None
+        self.update_theme(theme)
+
+
+
+# --- VIRTUAL TO-DO LIST ---
+class VirtualTodoList(ctk.CTkFrame):
+    """
+    A scrollable list of to-do items that only creates rows for the items that fit on screen.
+    When scrolling, the same rows are re-used ("bound") to show other items, so showing a list of
+    thousands of items takes just as long as showing a handful.
+    """
+
+    # Used until a row has been drawn and its real height is known
+    DEFAULT_ROW_HEIGHT = 35
+
+    def __init__(self, master, theme, on_toggle, on_delete, delete_theme, top_padding = 30, **kwargs):
+
+        defaults = {
+            "fg_color": theme["main"]
+        }
+
+        defaults.update(kwargs)
+
+        super().__init__(master=master, **defaults)
+
+        self.theme = theme
+        self.delete_theme = delete_theme
+        self.on_toggle = on_toggle
+        self.on_delete = on_delete
+
+        # The list of to-do items (data objects) to show, and the index of the item shown in the top row
+        self.items = []
+        self.first_index = 0
+
+        # The rows currently in use (never more than fit on screen)
+        self.rows = []
+
+        # Rows that aren't needed right now (e.g. the list got shorter) are kept here to be re-used.
+        # (Only by this list: a tkinter widget can't be moved to another parent, so rows can't be shared between categories)
+        self.row_pool = WidgetPool(create = self.create_row, name = "to-do rows")
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_columnconfigure(1, weight=0)
+
+        # The frame that holds the rows
+        self.rows_frame = ctk.CTkFrame(master=self, fg_color="transparent")
+        self.rows_frame.grid(row=0, column=0, sticky="nsew", padx=5, pady=(top_padding, 5))
+
+        # Don't let the rows change the size of the frame (the list decides how many rows fit, not the other way around)
+        self.rows_frame.grid_propagate(False)
+
+        # The scrollbar tells "scroll_command" where to move to, and gets told by "update_scrollbar" where we are
+        self.scrollbar = ctk.CTkScrollbar(master=self, command=self.scroll_command)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        # Re-calculate how many rows fit whenever the size of the list changes
+        self.bind("<Configure>", lambda event: self.refresh())
+
+        # Scroll with the mouse wheel (Windows/Mac send "MouseWheel", Linux sends Button-4/5)
+        self.bind_scrolling(self)
+        self.bind_scrolling(self.rows_frame)
+
+
+    # --- SCROLLING ---
+
+    def bind_scrolling(self, widget):
+        widget.bind("<MouseWheel>", self.on_mouse_wheel)
+        widget.bind("<Button-4>", lambda event: self.scroll_to(self.first_index - 1))
+        widget.bind("<Button-5>", lambda event: self.scroll_to(self.first_index + 1))
+
+
+    def on_mouse_wheel(self, event):
+        # One "notch" of the wheel scrolls 1 item (delta is 120 per notch on Windows, 1 on Mac)
+        steps = int(event.delta / 120) if abs(event.delta) >= 120 else event.delta
+        self.scroll_to(self.first_index - steps)
+
+
+    # Called by the scrollbar, either with ("moveto", fraction) or ("scroll", amount, "units"/"pages")
+    def scroll_command(self, action, *args):
+        if action == "moveto":
+            self.scroll_to(round(float(args[0]) * len(self.items)))
+
+        elif action == "scroll":
+            amount = int(args[0])
+
+            if len(args) > 1 and args[1] == "pages":
+                amount *= self.visible_row_count()
+
+            self.scroll_to(self.first_index + amount)
+
+
+    # Make the item with this index the top row (kept within the list)
+    def scroll_to(self, first_index):
+        last_possible = max(0, len(self.items) - self.visible_row_count())
+        self.first_index = min(max(0, first_index), last_possible)
+
+        self.refresh()
+
+
+    def update_scrollbar(self):
+        if self.items:
+            start = self.first_index / len(self.items)
+            end = min(1.0, (self.first_index + self.visible_row_count()) / len(self.items))
+        else:
+            start, end = 0.0, 1.0
+
+        self.scrollbar.set(start, end)
+
+
+    # --- ROWS ---
+
+    # The height of one row (measured from a real row once there is one)
+    def row_height(self):
+        if self.rows and self.rows[0].winfo_height() > 1:
+            return self.rows[0].winfo_height() + 10 # + the padding between rows
+
+        return self.DEFAULT_ROW_HEIGHT
+
+
+    # Create a new row (called by the row pool when it has no row to re-use)
+    def create_row(self, theme):
+        row = TodoRow(
+            master = self.rows_frame,
+            theme = theme,
+            delete_theme = self.delete_theme,
+            on_toggle = self.on_toggle,
+            on_delete = self.on_delete
+        )
+        self.bind_scrolling(row)
+        self.bind_scrolling(row.checkbox)
+
+        return row
+
+
+    # How many rows fit in the list right now
+    def visible_row_count(self):
+        height = self.rows_frame.winfo_height()
+
+        # Before the list has been drawn its height is unknown, show a screenful of rows until then
+        if height <= 1:
+            height = 600
+
+        return max(1, height // self.row_height())
+
+
+    # Show a list of items. A different list (e.g. another category) starts from the top, the same list keeps its scroll position.
+    def set_items(self, items, theme):
+        if items is not self.items:
+            self.items = items
+            self.first_index = 0
+
+        if theme is not self.theme:
+            self.update_theme(theme)
+
+        self.refresh()
+
+
+    # Bind the rows to the items that are currently scrolled into view
+    def refresh(self):
+
+        # Keep the top row within the list (e.g. after items were removed)
+        last_possible = max(0, len(self.items) - self.visible_row_count())
+        self.first_index = min(self.first_index, last_possible)
+
+        visible_items = self.items[self.first_index:self.first_index + self.visible_row_count()]
+
+        # Get more rows if needed (re-used from the pool if possible)
+        while len(self.rows) < len(visible_items):
+            self.rows.append(self.row_pool.acquire(theme = self.theme))
+
+        # Hand back the rows that aren't needed (e.g. the list got shorter), they are hidden by the pool
+        while len(self.rows) > len(visible_items):
+            row = self.rows.pop()
+            row.is_shown = False
+            self.row_pool.release(row)
+
+        # Bind every row to its item. Rows are only placed on the grid when they aren't already, the rest just get their new item.
+        for number, row in enumerate(self.rows):
+            row.bind_todo(visible_items[number])
+
+            if not row.is_shown:
+                row.grid(row = number, column = 0, sticky = "w", pady = 5)
+                row.is_shown = True
+
+        self.update_scrollbar()
+
+
+    # Method/function for updating the theme (pooled rows get the new theme when they are re-used)
+    def update_theme(self, new_theme):
+        self.theme = new_theme
+
+        for row in self.rows:
+            row.update_theme(new_theme)
+
+
+    # The rows are destroyed together with the list, so the pool is closed too (otherwise the list of all pools keeps them alive)
+    def destroy(self):
+        self.row_pool.close()
+        self.rows = []
+        super().destroy()
+
+
+
 # --- TABS FOOTER ---
 class TabsFooter (ctk.CTkFrame):
     def __init__(self, master, theme, on_back_click, on_add_click, on_remove_click, theme_select, **kwargs):
@@ -566,7 +1040,7 @@ class TabsFooter (ctk.CTkFrame):
             dropdown_fg_color = theme["main"],
             dropdown_hover_color = theme["hover"],
             height = 40,
-            values = ["Default", "Red", "Green", "Blue", "Yellow", "Purple"],
+            values = themes.theme_names(), # The built-in themes plus the user's own (see themes.load_user_themes)
             command = self.theme_select # use the function passed through the __init__ with the selected option (e.g., "red" or "blue") as arguments to that function.
         )
 
@@ -2,16 +2,23 @@
 
 """The tabs view module that shows the tabs/categories and to-do items in each project"""
 
-import tkinter as tk
+import os
+import time
+from collections import OrderedDict
 import customtkinter as ctk
 from todo_app.ui import widgets as ui
 from todo_app.ui import themes
-from todo_app.core import data as data
 from todo_app.core.utils import resource_path
 
 # Import the main frame color for all frames
 from todo_app.ui.themes import MAIN_FRAME_COLOR
 
+# Only create a category's body/to-do list the first time it's opened (TODOAPP_LAZY_BODIES=0 creates all of them when the project is opened)
+LAZY_BODIES = os.environ.get("TODOAPP_LAZY_BODIES", "1") != "0"
+
+# How many bodies of categories that aren't shown are kept alive (the least recently used ones are destroyed first)
+BODY_CACHE_SIZE = int(os.environ.get("TODOAPP_BODY_CACHE", "5"))
+
 # --- MAIN CLASS ---
 class TabsView(ctk.CTkFrame):
     """Main class"""
@@ -33,6 +40,12 @@ class TabsView(ctk.CTkFrame):
         # Create empty dict that later holds info about categories that exist
         self.category_components = {}
 
+        # The ids of the categories that have a body, least recently shown first
+        self.bodies_in_use = OrderedDict()
+
+        # How long opening each project took (in milliseconds), printed when the app closes with TODOAPP_SAVE_STATS=1
+        self.open_times = []
+
         # Set start counter for the tab buttons
         self.current_tab_column = 0
 
@@ -82,6 +95,12 @@ class TabsView(ctk.CTkFrame):
             theme = self.theme_settings # Use returned dictionary as argument
         )
 
+            # Tab buttons of the previous project/removed categories are kept (hidden) and re-used
+        self.tab_pool = ui.WidgetPool(
+            create = lambda **settings: ui.TabsButton(master = self.tabs, **settings),
+            name = "tab buttons"
+        )
+
 
         # ERROR FRAME
             # Create the main frame that holds the error elements
@@ -140,11 +159,15 @@ class TabsView(ctk.CTkFrame):
     # LOAD PROJECT - changes UI elements based on which project whas selected
     def load_project(self, project_data):
 
+        # Time how long opening the project takes
+        start_time = time.perf_counter()
 
         # If there was an active category from previous project
         if self.active_category is not None:
             # Remove it's body/to-do list from the main grid
-            self.category_components[self.active_category.category_name]["body"].grid_remove()
+            active_body = self.category_components[self.active_category.id]["body"]
+            if active_body is not None:
+                active_body.grid_remove()
 
 
         # Reset variables
@@ -152,16 +175,22 @@ class TabsView(ctk.CTkFrame):
         self.current_tab_column = 0
 
 
-        # Remove the old category components (tab/button and body/frame) from the GUI
-        for category_name, components in self.category_components.items():
-            components["tab"].destroy()
-            components["body"].destroy()
+        # Remove the old category components (tab/button and body/frame) from the GUI. The tabs are kept in the pool for the next project.
+        for category_id, components in self.category_components.items():
+            self.tab_pool.release(components["tab"])
+
+            if components["body"] is not None:
+                components["body"].destroy()
 
 
         # Clear the main dictionary
         self.category_components = {}
+        self.bodies_in_use.clear()
 
         self.active_project = project_data # Store the project data
+
+        # Create the project's category/to-do objects, if they haven't been already (lazy loading)
+        self.active_project.load()
         self.header.set_text(project_data) # Tell the header widget to change it's text to display the correct project name
 
         # If project has categories, set the first one to be active
@@ -176,83 +205,75 @@ class TabsView(ctk.CTkFrame):
         # Update the UI
         self.update_ui()
 
+        self.open_times.append((time.perf_counter() - start_time) * 1000)
+
+
+
+    # RELOAD THE PROJECT (e.g. after undo/redo changed it), keeping the same category active if it still exists
+    def reload(self):
+        if self.active_project is None:
+            return
+
+        active_category_id = self.active_category.id if self.active_category is not None else None
+
+        self.load_project(self.active_project)
+
+        if active_category_id is not None:
+            self.change_category(active_category_id)
+
 
 
     # CREATE UI COMPONENTS (TAB BUTTON, BODY)
     def create_category_components(self, category):
             
-            # CREATE A TAB BUTTON
-            category_button = ui.TabsButton(
-                master = self.tabs,
+            # CREATE A TAB BUTTON (or re-use one from the pool)
+            category_button = self.tab_pool.acquire(
                 theme = self.theme_settings,
-                text = category.category_name,
-                command = lambda: self.change_category(category.category_name) # The button stores the category name (input_text) as argument for it's command.
+                category = category, # Shows the name and how many to-do items are done
+                command = lambda: self.change_category(category.id) # The button stores the category's id as argument for it's command (so renaming the category doesn't break it).
             )
 
-            # CREATE BODY / TO-DO LIST
-                # Create the "body"/scrollable frame that holds the to-do items
-            body = ui.TabsBody(
-                master = self,
-                on_add_click = self.open_add_item,
-                theme = self.theme_settings # Use returned dictionary as argument
-            )
-
-
-            # Store the components of that category in a dictionary
-            self.category_components[category.category_name] = {
+            # Store the components of that category in a dictionary.
+            # The body is created the first time the category is shown (see get_body)
+            self.category_components[category.id] = {
                 "tab": category_button,
-                "body": body,
+                "body": None,
                 "data": category
             }
 
+            if not LAZY_BODIES:
+                self.get_body(category)
 
 
-    def create_todo_item(self, object, master):
-        
-        # Get current theme settings
-        theme_settings = self.active_category.theme_settings
-
-        # Convert the true/false state stored in the to-do items data object to a tkinter boolean
-        checkbox_state_var = tk.BooleanVar(value = object.is_checked)
 
-        # Get/store the default theme
-        default_theme = themes.get_theme("Default")
+    # GET THE BODY / TO-DO LIST OF A CATEGORY (creates it the first time)
+    def get_body(self, category):
+        components = self.category_components[category.id]
 
+        if components["body"] is None:
 
-        # Create a frame that will act as a row for each item with buttons etc.
-        self.item_frame = ctk.CTkFrame(
-            master = master,
-            fg_color = "transparent"
-        )
+            # Create the "body"/scrollable frame that holds the to-do items
+            components["body"] = ui.TabsBody(
+                master = self,
+                on_add_click = self.open_add_item,
+                on_toggle = self.checkbox_clicked,
+                on_delete = self.delete_todo_confirmation,
+                delete_theme = themes.get_theme("Default"),
+                theme = self.theme_settings # Use returned dictionary as argument
+            )
 
-        # Create a delete button that will be next to the to-do item
-        self.button_delete_todo = ui.SquareButton(
-            master = self.item_frame,
-            text = "X",
-            width = 25,
-            height = 25,
-            font = ("", 12, "normal"),
-            theme = default_theme,
-            corner_radius = 5,
-            command = lambda i=object, v=self.item_frame: self.delete_todo_confirmation(i,v)
-        )
+        # Mark the body as the most recently used one
+        self.bodies_in_use[category.id] = True
+        self.bodies_in_use.move_to_end(category.id)
 
-        self.button_delete_todo.grid(column = 0, row = 0)
+        # Destroy the least recently used bodies, if more than the shown one + BODY_CACHE_SIZE are alive
+        if LAZY_BODIES:
+            while len(self.bodies_in_use) > BODY_CACHE_SIZE + 1:
+                oldest_id, _ = self.bodies_in_use.popitem(last = False)
+                self.category_components[oldest_id]["body"].destroy()
+                self.category_components[oldest_id]["body"] = None
 
-
-        # Create the to-do item/checkbox UI widget
-        self.todo_item = ui.ToDoItem(
-            master = self.item_frame,
-            theme = theme_settings,
-            text = object.text,
-            variable = checkbox_state_var,
-            command = lambda i=object, v=checkbox_state_var: self.checkbox_clicked(i, v)
-        )
-        
-        self.todo_item.grid(column = 1, row = 0, padx = (20, 0))
-
-        
-        return self.item_frame
+        return components["body"]
 
 
 
@@ -298,11 +319,13 @@ class TabsView(ctk.CTkFrame):
                 # Get the theme settings for it
                 theme_settings = category.theme_settings
 
-                # Get the current categories UI components
-                components = self.category_components[category.category_name]
-                body = components["body"]
+                # Get the current categories UI components (the body only exists if the category has been shown)
+                components = self.category_components[category.id]
                 tab = components["tab"]
 
+                # Show the current name and done/total counts (only re-configured if they changed)
+                tab.update_data(category)
+
                 # Store font object (which contains the settings) for the buttons text
                 font_object = tab.cget("font")
                 
@@ -314,6 +337,9 @@ class TabsView(ctk.CTkFrame):
                     # If category is the active category, and names match
                 if self.active_category and self.active_category == category:
 
+                    # Get the body, it's created here the first time the category is shown
+                    body = self.get_body(category)
+
                     # Update the footer with the new settings
                     self.footer.update_theme(theme_settings)
 
@@ -339,33 +365,9 @@ class TabsView(ctk.CTkFrame):
                     # Add the body frame to the main grid
                     body.grid(row=2, column=0, padx=20, sticky="nsew")
 
-                    # Store the to-do items that already exist in the frame, in a list
-                    old_items = body.todo_frame.winfo_children()
-                    
-                    # Go through the list and delete the items (because we re-add them later)
-                    for item in old_items:
-                        item.destroy()
-
-                    # Initialize the counter for the to-do items
-                    row = 0
-
-                    # For every to-do item in the active category
-                    for item in self.active_category.todo_items:
-
-                        # If it's the first item, increase the padding on top to create a gap between tab buttons and the first to-do item.
-                        if row == 0:
-                            pad_top = 30
-                        else:
-                            pad_top = 5
-                        
-                        # Create the to do item
-                        new_todo_item = self.create_todo_item(item, body.todo_frame)
-
-                        # Add the new to-do object to the scrollable frame
-                        new_todo_item.grid(row=row, column = 0, sticky = "w", padx = 5, pady = (pad_top, 5))
-
-                        # Increment the row counter
-                        row += 1
+                    # Show the category's to-do items in the list.
+                    # The list only creates/re-uses rows for the items that fit on screen, so this is just as fast for 10 items as for 10 000.
+                    body.todo_frame.set_items(self.active_category.todo_items, theme_settings)
 
 
 
@@ -373,8 +375,9 @@ class TabsView(ctk.CTkFrame):
                 # If category name is NOT the same as the category we want to be active
                 else:
                     
-                    # Hide the stored "body" from the UI.
-                    body.grid_remove()
+                    # Hide the stored "body" from the UI (if it has been created).
+                    if components["body"] is not None:
+                        components["body"].grid_remove()
 
                     # Change the font object so it's normal text
                     font_object.configure(weight = "normal")
@@ -428,22 +431,18 @@ class TabsView(ctk.CTkFrame):
 
 
     # CHANGE CATEGORY
-    def change_category(self, to_category):
+    def change_category(self, to_category_id):
 
-        # Loop through the active projects categories
-        for category in self.active_project.categories:
+        # Look up the category by its id
+        category = self.active_project.get_category_by_id(to_category_id)
 
-            # If category objects name matches name we want to switch to
-            if category.category_name == to_category:
-                
-                # Update what is considered the active category
-                self.active_category = category
+        if category is not None:
 
-                # Update the UI
-                self.update_ui()
+            # Update what is considered the active category
+            self.active_category = category
 
-                # Once found and updated, abort
-                break
+            # Update the UI
+            self.update_ui()
 
 
     # UPDATES / CHANGES THE THEME OF A TAB
@@ -453,16 +452,13 @@ class TabsView(ctk.CTkFrame):
         # Check if we have an active category
         if self.active_category is not None:
             
-            # Store the new theme NAME in the category object
-            self.active_category.theme_name = selected_theme_name
-
-            # Get and store the new theme SETTINGS in the category object
-            self.active_category.theme_settings = themes.get_theme(selected_theme_name)
+            # Store the new theme NAME and SETTINGS in the category object
+            self.master.service.set_theme(self.active_category, selected_theme_name)
 
             # Go into category_components (which holds all the dictionaries of stored widgets per category), get the dictionary that is our current category, then get the button associated with it's "tab" key.
-            active_button_object = self.category_components[self.active_category.category_name]["tab"]
+            active_button_object = self.category_components[self.active_category.id]["tab"]
             
-            active_body_object = self.category_components[self.active_category.category_name]["body"]
+            active_body_object = self.get_body(self.active_category)
 
             # Get the new theme settings from the category object and store in local variable
             new_theme = self.active_category.theme_settings
@@ -473,7 +469,7 @@ class TabsView(ctk.CTkFrame):
             self.footer.update_theme(new_theme)
 
             # Change category as an easy way to make it "active" and get it to use the active colors
-            self.change_category(self.active_category.category_name)
+            self.change_category(self.active_category.id)
 
             # Save all the data to file
             self.master.save()
@@ -527,42 +523,27 @@ class TabsView(ctk.CTkFrame):
         if input_text == None:
             pass
 
-        # Else if dialog is closed with OK, but category is missing name
-        elif input_text == "" or None:
-
-            # Update UI to show error text
-            self.update_ui("Category needs a name!")
-
-
-
         # CREATE NEW CATEGORY
         else:
 
-            # Check if category name is already being used
-            for existing_category in self.active_project.categories:
-                if existing_category.category_name == input_text:
-                    
-                    # Update UI to show error text
-                    self.update_ui("Name is taken")
-                    return
+            # Create the category and add it to the project (in a way that can be undone)
+            try:
+                category = self.master.service.add_category(self.active_project, input_text)
+
+            # The name is missing or already being used
+            except ValueError as error:
+
+                # Update UI to show error text
+                self.update_ui(str(error))
+                return
 
             # Reset theme settings back to default theme
             self.theme_settings = themes.get_theme("Default")
 
-            # Create a category data object
-            category = data.Category(
-                name = input_text,
-                theme_name = "Default",
-                theme_settings = self.theme_settings
-            )
-
             # Set newly created category as the active one
             self.active_category = category
-            
-            # Add the category object to list of categories inside the project instance (from data.py) 
-            self.active_project.categories.append(self.active_category)
 
-            # Create the tab button and body that will hold to-do items
+            # Create the tab button (the body that will hold to-do items is created when the UI is updated)
             self.create_category_components(category)
 
             # Save all the data to file
@@ -612,29 +593,31 @@ class TabsView(ctk.CTkFrame):
 
 
             # Store the tab/button as a variable
-            button = self.category_components[self.active_category.category_name]["tab"]
+            button = self.category_components[self.active_category.id]["tab"]
 
-            # Remove the tab/button
-            button.destroy()
+            # Remove the tab/button (hidden and kept for re-use)
+            self.tab_pool.release(button)
             
             # Store the body/scrollable frame as a variable
-            body = self.category_components[self.active_category.category_name]["body"]
+            body = self.category_components[self.active_category.id]["body"]
 
-            # Remove the body/scrollable frame
-            body.destroy()
+            # Remove the body/scrollable frame (if it was ever created)
+            if body is not None:
+                body.destroy()
 
             # Remove the category from the UI components dictionary as well
-            self.category_components.pop(self.active_category.category_name, None)
+            self.category_components.pop(self.active_category.id, None)
+            self.bodies_in_use.pop(self.active_category.id, None)
 
-            # Remove the active category object from the active projects list of categories
-            self.active_project.categories.remove(self.active_category)
+            # Remove the active category object from the active projects list of categories (can be undone)
+            self.master.service.remove_category(self.active_project, self.active_category)
 
             # Switch to a new category
                 # If index is None, then there is no category left to switch to
             if index != None:
 
                 # Change to the new category
-                self.change_category(new_category.category_name)
+                self.change_category(new_category.id)
 
             # Save all the data to file
             self.master.save()
@@ -683,25 +666,19 @@ class TabsView(ctk.CTkFrame):
         if input_text == None:
             pass
 
-        # Else if dialog is closed with OK, but item is missing name
-        elif input_text == "":
-            
-            # Display the error text
-            self.update_ui("To-do item needs a name!")
-
         # CREATE NEW TO-DO ITEM
         else:
 
-            # Store the body which will be the items master
-            body = self.category_components[self.active_category.category_name]["body"]
+            # Create the to-do item and add it to the active category's list of to-do's (can be undone)
+            try:
+                self.master.service.add_todo(self.active_category, input_text)
 
-            # Create the to-do item/checkbox OBJECT
-            data_item = data.Todo(
-                text = input_text,
-            )
+            # The item is missing a name
+            except ValueError as error:
 
-            # Add new data item to active categories list of to-do's
-            self.active_category.todo_items.append(data_item)
+                # Display the error text
+                self.update_ui(str(error))
+                return
 
             # Save all the data to file
             self.master.save()
@@ -718,7 +695,13 @@ class TabsView(ctk.CTkFrame):
         current_state_bool = tk_boolean.get()
 
         # Use the checkbox item/data object that was passed through, and change its internal "is_checked" value
-        checkbox.is_checked = current_state_bool
+        self.master.service.set_checked(self.active_category, checkbox, current_state_bool)
+
+        # Show the new done count on the category's tab (the category keeps count, so nothing is counted here)
+        self.category_components[self.active_category.id]["tab"].update_data(self.active_category)
+
+        # Save the data to file
+        self.master.save()
 
 
 
@@ -729,11 +712,12 @@ class TabsView(ctk.CTkFrame):
 
         
         # Function that the "yes" button in the popup calls
-        def delete_item(data, frame):
+        def delete_item(data, row):
 
-            self.active_category.todo_items.remove(data)
+            self.master.service.remove_todo(self.active_category, data)
 
             # Save all the data to file
             self.master.save()
 
-            frame.destroy()
+            # The row is re-used for other items, so instead of destroying it, refresh the list
+            self.update_ui()
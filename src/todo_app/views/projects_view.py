@@ -5,18 +5,22 @@
 import customtkinter as ctk
 from todo_app.ui import widgets as ui
 from todo_app.ui import themes
-from todo_app.core import data as data_module
+from todo_app.ui.reconcile import Reconciler
 from todo_app.core.utils import resource_path
+from todo_app.core import search
 
 # Import the main frame color for all frames
 from todo_app.ui.themes import MAIN_FRAME_COLOR
 
+# How long to wait after the last key press in the search box before searching (in milliseconds)
+SEARCH_DELAY = 150
+
 
 # --- MAIN UI/LANDING "PAGE" CLASS ---
 class ProjectsView(ctk.CTkFrame):
     """Main class"""
 
-    def __init__(self, master, loaded_data, **kwargs):
+    def __init__(self, master, service, **kwargs):
     # Self: When this/a ProjectClass 'object' is created/instanced, it will
     # automatically call the __init__ method and pass itself as the first and 
     # argument/self.
@@ -27,23 +31,20 @@ class ProjectsView(ctk.CTkFrame):
         self.default_theme = themes.get_theme("Default")
 
 
-        # Unpack the dictionary and create a 'project' object from it
-            # Create new list variable (self.all_projects = [])
-            # Inside [] we create a project object (data.Project)
-            # which will hold the data that gets unpacked (**data)..
-            # .. for every data/item in the loaded_data list of dictionaries
-
-            # Basically a for loop inside the [], ie do this for every item in loaded_data
-        self.all_projects = [data_module.Project(**item_data) for item_data in loaded_data]
+        # The service makes every change to the projects (see core/service.py), the view only shows them
+        self.service = service
 
+            # The ProjectCollection keeps the list in order, and also lets us find a project by name instantly
+        self.all_projects = service.projects
 
-        # Create an empty list that will store all the project BUTTONS
-        self.all_project_buttons = []
 
-
-        # Set start variables for placing projects in order
-        self.current_projects_row = 0
-        self.current_projects_column = 0
+        # Keeps one project BUTTON per project. When the list of projects changes, only the buttons that need it are created/destroyed/moved.
+        self.project_buttons = Reconciler(
+            create = self.create_project_button,
+            destroy = lambda button: self.button_pool.release(button), # Hidden and kept for re-use instead of destroyed
+            place = self.place_project_button,
+            update = lambda project, button: button.update_data(project)
+        )
 
         # Start value for checking if projects exist
             # If the list constains projects
@@ -62,13 +63,41 @@ class ProjectsView(ctk.CTkFrame):
         super().__init__(master, **defaults)
 
         # Fix main grid configuration
-        self.grid_rowconfigure(0, weight=1)
-        self.grid_rowconfigure(1, weight=0)
+        self.grid_rowconfigure(0, weight=0)
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_rowconfigure(2, weight=0)
 
         self.grid_columnconfigure(0, weight=1)
 
 
 
+        # --- SEARCH BOX ---
+            # Searches all projects, categories and to-do items while typing. The results show instead of the projects.
+        self.search_entry = ctk.CTkEntry(
+            master = self,
+            placeholder_text = "Search...",
+            width = 300
+        )
+
+        self.search_entry.grid(row=0, column=0, padx=20, pady=(20, 0))
+
+            # Search a short moment after the last key press, instead of after every key
+        self.search_after_id = None
+        self.search_entry.bind("<KeyRelease>", lambda event: self.schedule_search())
+
+            # Escape clears the search
+        self.search_entry.bind("<Escape>", lambda event: self.clear_search())
+
+            # The list of results (hidden while the search box is empty)
+        self.search_results = ui.SearchResults(
+            master = self,
+            theme = self.default_theme,
+            width = 500,
+            height = 450
+        )
+
+
+
         # --- NO PROJECTS FRAME / TEXT ---
             # If there are no projects, this text will show
 
@@ -78,7 +107,7 @@ class ProjectsView(ctk.CTkFrame):
         )
         
             # Place it in the main projects view grid
-        self.no_projects_frame.grid(row=0, column=0)
+        self.no_projects_frame.grid(row=1, column=0)
 
 
 
@@ -91,7 +120,13 @@ class ProjectsView(ctk.CTkFrame):
         )
 
             # Place it in the main projects view grid
-        self.projects_grid.grid(row=0, column=0)
+        self.projects_grid.grid(row=1, column=0)
+
+            # Buttons of removed projects are kept (hidden) and re-used for new projects
+        self.button_pool = ui.WidgetPool(
+            create = lambda **settings: ui.ProjectButton(master = self.projects_grid.projects_grid, **settings),
+            name = "project buttons"
+        )
 
 
 
@@ -104,7 +139,7 @@ class ProjectsView(ctk.CTkFrame):
         )
 
             # Add it/new frame to the projects view frame 
-        self.add_remove_frame.grid(row=1, column=0, padx=20, pady=20)
+        self.add_remove_frame.grid(row=2, column=0, padx=20, pady=20)
 
             # Fix it's configuration
         self.add_remove_frame.grid_rowconfigure(0, weight=1)
@@ -215,38 +250,24 @@ class ProjectsView(ctk.CTkFrame):
         if input_text == None:
             pass
 
-        # Else if dialog is closed with OK, but project is missing name
-        elif input_text == "" or input_text is None:
-            self.error_text.configure(text = "Project needs a name!")
-
-            # Show the error frame/text
-            self.error_text_frame.grid(row=2, column=0, padx=20, pady=(0, 20))
-
-
-        # Else create a new project button.
+        # Else create a new project
         else:
 
-            # Check if a project with that name already exists
-            for project in self.all_projects:
-                if project.project_name == input_text:
+            # Create the project and add it to the list of projects (this also lets the storage know about the change, and can be undone)
+            try:
+                self.service.add_project(input_text)
 
-                    # Change the error text
-                    self.error_text.configure(text = "A project with that name already exists!")
-                    
-                    # Show the error frame/text
-                    self.error_text_frame.grid(row=2, column=0, padx=20, pady=(0, 20))
-                    
-                    # Stop the entire project creation function.
-                    return
+            # The name is missing or taken
+            except ValueError as error:
 
+                # Change the error text
+                self.error_text.configure(text = str(error))
 
-                # Create a project data object
-            project = data_module.Project(
-                name = input_text
-            )
+                # Show the error frame/text
+                self.error_text_frame.grid(row=3, column=0, padx=20, pady=(0, 20))
 
-                # Add the project to the list variable of projects
-            self.all_projects.append(project)
+                # Stop the entire project creation function.
+                return
 
             # Save all the data to file
             self.master.save()
@@ -269,8 +290,8 @@ class ProjectsView(ctk.CTkFrame):
 
         def on_yes(project):
 
-            # Remove the project from the list of projects
-            self.all_projects.remove(project)
+            # Remove the project from the list of projects (this also lets the storage know about the change, and can be undone)
+            self.service.remove_project(project)
 
             # Save all the data to file
             self.master.save()
@@ -358,12 +379,111 @@ class ProjectsView(ctk.CTkFrame):
 
 
 
+    # SEARCH
+        # Wait until no key has been pressed for a short moment before searching
+    def schedule_search(self):
+        if self.search_after_id is not None:
+            self.after_cancel(self.search_after_id)
+
+        self.search_after_id = self.after(SEARCH_DELAY, self.run_search)
+
+
+        # Search for the text in the search box and show the results (or the projects again if the box is empty)
+    def run_search(self):
+        self.search_after_id = None
+        query = self.search_entry.get().strip()
+
+        # Empty search box: hide the results and show the projects again
+        if not query:
+            self.search_results.grid_remove()
+            self.update_ui()
+            return
+
+        # The index is only built the first time something is searched for, after that it's kept up to date by the data objects
+        if not search.index.is_built:
+            search.index.build(self.all_projects)
+
+        results = search.index.search(query)
+
+        self.search_results.show([
+            (self.describe_search_result(result), lambda r=result: self.open_search_result(r))
+            for result in results
+        ])
+
+        # Show the results instead of the projects
+        self.projects_grid.grid_remove()
+        self.no_projects_frame.grid_remove()
+        self.search_results.grid(row=1, column=0, padx=20, pady=(10, 0), sticky="ns")
+
+
+        # The text on the button of a search result, e.g. "Buy milk   (Home > Shopping)"
+    def describe_search_result(self, result):
+        project_name = search.index.name_of(result.project_id)
+
+        if result.kind == "project":
+            return f"Project: {result.text}"
+
+        if result.kind == "category":
+            return f"Category: {result.text}   ({project_name})"
+
+        return f"{result.text}   ({project_name} > {search.index.name_of(result.category_id)})"
+
+
+        # Open the project of a search result, with the result's category active
+    def open_search_result(self, result):
+        project = self.all_projects.get_by_id(result.project_id)
+        if project is None:
+            return
+
+        self.clear_search()
+        self.set_view("tabs", project)
+
+        if result.category_id is not None:
+            self.master.tabs_view.change_category(result.category_id)
+
+
+        # Empty the search box and show the projects again
+    def clear_search(self):
+        self.search_entry.delete(0, "end")
+        self.run_search()
+
+
+
+    # CREATE A PROJECT BUTTON (called by the reconciler for projects that don't have a button yet)
+    def create_project_button(self, project):
+        return self.button_pool.acquire(
+            theme = self.default_theme,
+            command = lambda p=project: self.set_view("tabs", p),
+            project_data = project # Send the data about the project to this button
+        )
+
+
+    # REFRESH THE BUTTON OF A SINGLE PROJECT (e.g. its done/total counts after it was open in the tabs view)
+    def refresh_project(self, project):
+        button = self.project_buttons.widget_for(project)
+
+        if button is not None:
+            button.update_data(project)
+
+
+
+    # PLACE A PROJECT BUTTON IN THE GRID (called by the reconciler for new buttons, or buttons that moved)
+    def place_project_button(self, button, position):
+
+        # 3 buttons per row: e.g. position 4 is the second button (column 1) on the second row (row 1)
+        button.grid(
+            row = position // 3,
+            column = position % 3,
+            padx=20,
+            pady=(10, 10)
+            )
+
+
     # UDPATE / REFRESH THE UI
     def update_ui(self):
 
-        # Delete every button
-        for button in self.all_project_buttons[:]: # Using duplicate list here
-            button.destroy()
+        # Create/destroy/move only the project buttons that changed
+        self.project_buttons.reconcile(self.all_projects)
 
         # If list of projects contains projects
         if self.all_projects:
@@ -375,43 +495,6 @@ class ProjectsView(ctk.CTkFrame):
             # Show the "Remove projects button"
             self.button_remove_project.grid()
 
-            # Reset counters
-            self.current_projects_row = 0
-            self.current_projects_column = 0
-
-            # Go through all of the projects
-            for project in self.all_projects:
-
-                # Create the project button
-                project_button = ui.ProjectButton(
-                    master = self.projects_grid.projects_grid,
-                    theme = self.default_theme,
-                    command = lambda p=project: self.set_view("tabs", p),
-                    project_data = project # Send the data about the project to this button
-                )
-
-                # Add the button to the list of buttons
-                self.all_project_buttons.append(project_button)
-
-                # Add the button to the grid
-                project_button.grid(
-                    row = self.current_projects_row,
-                    column = self.current_projects_column,
-                    padx=20,
-                    pady=(10, 10)
-                    )
-                
-                
-                # Increment up the counters
-                    # If we are not currently on the last column, increment it
-                if self.current_projects_column < 2:
-                    self.current_projects_column += 1
-
-                    # If we are on the last column, increase to row counter and reset column counter
-                else:
-                    self.current_projects_row += 1
-                    self.current_projects_column = 0
-
         # If no projects exist
         else:
             # Hide the grid of projects
@@ -421,4 +504,6 @@ class ProjectsView(ctk.CTkFrame):
             # Hide the "Remove projects button"
             self.button_remove_project.grid_remove()
 
-            
+        # While searching, the results show instead of the projects (searched again, in case a project was added/removed)
+        if self.search_entry.get().strip():
+            self.run_search()
@@ -0,0 +1,153 @@
+"""The binary data format: encoding and decoding (version 2, and version 1 files from before ids existed) and theme settings."""
+
+import struct
+from array import array
+import pytest
+from todo_app.core import binary_format
+from todo_app.ui import themes
+
+
+
+def make_category(name, theme_name="Default", theme_settings=None, todo_items=()):
+    return {
+        "name": name,
+        "id": f"{name}-id",
+        "theme_name": theme_name,
+        "theme_settings": dict(theme_settings or themes.get_theme(theme_name)),
+        "todo_items": [{"text": text, "is_checked": is_checked, "id": f"{text}-id"} for text, is_checked in todo_items]
+    }
+
+
+PROJECTS = [
+    {"name": "Home", "id": "home-id", "categories": [
+        make_category("Kitchen", todo_items=[("Buy milk", False), ("Ünïcode ✓", True), ("Buy milk", True)]),
+        make_category("Garden", "Red")
+    ]},
+    {"name": "Empty", "id": "empty-id", "categories": []},
+]
+
+
+# Writes a version 1 block (no ids) the way the app did before ids existed (see the layout in binary_format.py)
+def encode_version_1(project_data):
+    strings = []
+
+    def string_number(text):
+        if text not in strings:
+            strings.append(text)
+        return strings.index(text)
+
+    ints = [string_number(project_data["name"]), len(project_data["categories"])]
+
+    for category in project_data["categories"]:
+        ints.extend((string_number(category["name"]), string_number(category["theme_name"]), 0, len(category["todo_items"])))
+
+        for todo in category["todo_items"]:
+            ints.append(string_number(todo["text"]) * 2 + todo["is_checked"])
+
+    encoded_strings = [text.encode("utf-8") for text in strings]
+    blob = b"".join(encoded_strings)
+    numbers = array("I", ints)
+
+    return (
+        struct.pack("<III", len(strings), len(blob), len(numbers))
+        + array("I", [len(text) for text in encoded_strings]).tobytes() + blob + numbers.tobytes()
+    )
+
+
+# The same data, without the ids
+def without_ids(projects_data):
+    return [
+        {"name": project["name"], "categories": [
+            {**{key: value for key, value in category.items() if key != "id"},
+             "todo_items": [{"text": todo["text"], "is_checked": todo["is_checked"]} for todo in category["todo_items"]]}
+            for category in project["categories"]
+        ]}
+        for project in projects_data
+    ]
+
+
+def test_encode_and_decode():
+    assert binary_format.decode(binary_format.encode(PROJECTS)) == PROJECTS
+
+
+def test_decode_version_1():
+    content = b"".join((binary_format.MAGIC, struct.pack("<BI", 1, len(PROJECTS)), *(
+        struct.pack("<I", len(block)) + block for block in map(encode_version_1, PROJECTS)
+    )))
+
+    assert binary_format.decode(content) == without_ids(PROJECTS)
+
+
+def test_data_without_ids():
+    assert binary_format.decode(binary_format.encode(without_ids(PROJECTS))) == without_ids(PROJECTS)
+
+
+def test_built_in_theme_settings_are_not_stored():
+    block = binary_format.encode_project(PROJECTS[0])
+
+    assert b"#" not in block # (no colors)
+    assert binary_format.decode_project(block)["categories"][1]["theme_settings"] == themes.get_theme("Red")
+
+
+def test_changed_theme_settings_are_stored():
+    settings = {**themes.get_theme("Red"), "main": "#123456"}
+    project = {"name": "Home", "id": "home-id", "categories": [make_category("Kitchen", "Red", settings)]}
+
+    assert binary_format.decode_project(binary_format.encode_project(project)) == project
+
+
+def test_user_theme_settings_are_stored(monkeypatch):
+    monkeypatch.setattr(themes, "THEMES", dict(themes.THEMES))
+    themes.register_theme("Ocean", {"main": "#1E3A4C", "accent": "#2E86AB"})
+    project = {"name": "Home", "id": "home-id", "categories": [make_category("Kitchen", "Ocean")]}
+
+    block = binary_format.encode_project(project)
+
+    # Still read correctly once the user's theme file is gone
+    del themes.THEMES["Ocean"]
+    assert binary_format.decode_project(block) == project
+
+
+def test_not_a_binary_file():
+    with pytest.raises(ValueError):
+        binary_format.decode(b"[]")
+
+    with pytest.raises(ValueError):
+        binary_format.decode(binary_format.MAGIC + struct.pack("<BI", 99, 0))
+
+
+@pytest.mark.parametrize("format_version", [1, 2])
+def test_one_block_at_a_time(tmp_path, format_version):
+    path = str(tmp_path / "data.bin")
+    encode = encode_version_1 if format_version == 1 else binary_format.encode_project
+    expected = without_ids(PROJECTS) if format_version == 1 else PROJECTS
+
+    with open(path, "wb") as f:
+        f.write(binary_format.MAGIC + struct.pack("<BI", format_version, len(PROJECTS)))
+        for block in map(encode, PROJECTS):
+            f.write(struct.pack("<I", len(block)) + block)
+
+    blocks = list(binary_format.iter_blocks(path))
+
+    for (block, start, end, block_format_version), project in zip(blocks, expected):
+        assert block_format_version == format_version
+        assert binary_format.read_block(path, start, end, format_version) == project
+
+        # The name and counts, without decoding the whole block
+        summary = binary_format.summarize_project(block, format_version)
+        assert summary.get("id") == project.get("id")
+        assert summary["name"] == project["name"]
+        assert summary["category_count"] == len(project["categories"])
+        assert summary["todo_count"] == sum(len(category["todo_items"]) for category in project["categories"])
+        assert summary["done_count"] == sum(todo["is_checked"] for category in project["categories"] for todo in category["todo_items"])
+
+
+def test_cut_off_file(tmp_path):
+    path = str(tmp_path / "data.bin")
+    content = binary_format.encode(PROJECTS)
+
+    with open(path, "wb") as f:
+        f.write(content[:-10])
+
+    with pytest.raises(ValueError):
+        list(binary_format.iter_blocks(path))
@@ -0,0 +1,76 @@
+"""The command line tool, mostly "batch": everything is saved once at the end, and nothing at all if a line fails."""
+
+import pytest
+from todo_app.__main__ import main
+from todo_app.core.service import TodoService
+from test_storage import projects_data
+from conftest import close_backend
+
+
+
+def run_batch(tmp_path, lines):
+    batch_file = tmp_path / "commands.txt"
+    batch_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return main(["batch", str(batch_file)])
+
+
+# What's saved, as the app would load it
+def saved_data():
+    close_backend()
+    return projects_data(TodoService())
+
+
+def test_batch(storage_mode, tmp_path):
+    result = run_batch(tmp_path, [
+        "# Comments and empty lines are skipped",
+        "",
+        'add project "Home"',
+        'add category "Home" "Kitchen" --theme Red',
+        'add todo "Home" "Kitchen" "Buy milk"',
+        'add todo "Home" "Kitchen" "Buy eggs"',
+        'toggle "Home" "Kitchen" 2',
+        'rename category "Home" "Kitchen" "Cooking"',
+        'rename project "Home" "House"',
+    ])
+
+    assert result == 0
+
+    [project] = saved_data()
+    assert project["name"] == "House"
+    assert project["categories"][0]["name"] == "Cooking"
+    assert project["categories"][0]["theme_name"] == "Red"
+    assert [(todo["text"], todo["is_checked"]) for todo in project["categories"][0]["todo_items"]] == [("Buy milk", False), ("Buy eggs", True)]
+
+
+def test_failing_line_saves_nothing(storage_mode, tmp_path, capsys):
+    assert main(["add", "project", "Home"]) == 0
+    close_backend()
+    before = saved_data()
+
+    result = run_batch(tmp_path, [
+        'add project "Work"',
+        'add category "Home" "Kitchen"',
+        'remove project "Missing"',
+        'add project "Never run"',
+    ])
+
+    assert result == 1
+    assert "line 3" in capsys.readouterr().err
+    assert saved_data() == before
+
+
+@pytest.mark.parametrize("line", ["not a command", 'batch "other.txt"'])
+def test_wrong_line_saves_nothing(data_dir, tmp_path, line):
+    assert run_batch(tmp_path, ['add project "Home"', line]) == 1
+    assert saved_data() == []
+
+
+def test_check_all(data_dir, tmp_path):
+    run_batch(tmp_path, ['add project "Home"', 'add category "Home" "Kitchen"', 'add todo "Home" "Kitchen" "Buy milk"', 'add todo "Home" "Kitchen" "Buy eggs"'])
+    close_backend()
+
+    assert main(["check-all", "Home", "Kitchen"]) == 0
+    assert all(todo["is_checked"] for todo in saved_data()[0]["categories"][0]["todo_items"])
+
+    assert main(["uncheck-all", "Home", "Kitchen"]) == 0
+    assert not any(todo["is_checked"] for todo in saved_data()[0]["categories"][0]["todo_items"])
@@ -0,0 +1,170 @@
+"""Undo and redo put everything back the way it was, also after the history was saved and loaded again."""
+
+import json
+import pytest
+from todo_app.core import storage
+from todo_app.ui import themes
+from todo_app.core.service import TodoService
+from test_storage import make_service, projects_data, reload
+
+
+
+def test_undo_and_redo(data_dir):
+    service = make_service()
+    project = service.get_project("Project 0")
+    category = service.get_category(project, "Category 0")
+    service.history.clear()
+    before = projects_data(service)
+
+    # One of every kind of change
+    service.add_todo(category, "New to-do")
+    service.toggle(category, category.todo_items[0])
+    service.remove_todo(category, category.todo_items[1])
+    service.set_theme(category, "Default")
+    service.set_all_checked(category, True)
+    service.rename_category(project, category, "Renamed category")
+    service.rename_project(project, "Renamed project")
+    service.add_category(project, "New category")
+    service.remove_category(project, service.get_category(project, "Category 1"))
+    service.add_project("New project")
+    service.remove_project(service.get_project("Project 2"))
+    after = projects_data(service)
+
+    while service.undo() is not None:
+        pass
+
+    assert projects_data(service) == before
+
+    while service.redo() is not None:
+        pass
+
+    assert projects_data(service) == after
+
+
+def test_undo_gives_back_the_same_objects(data_dir):
+    service = make_service()
+    category = service.get_category(service.get_project("Project 0"), "Category 0")
+    todo = service.add_todo(category, "New to-do")
+
+    service.undo()
+    assert todo not in category.todo_items
+
+    service.redo()
+    assert category.todo_items[-1] is todo
+
+
+def test_new_change_clears_redo(data_dir):
+    service = make_service()
+    category = service.get_category(service.get_project("Project 0"), "Category 0")
+
+    service.add_todo(category, "First")
+    service.undo()
+    service.add_todo(category, "Second")
+
+    assert service.redo() is None
+    assert [todo.text for todo in category.todo_items][-1] == "Second"
+
+
+def test_saved_history(storage_mode):
+    service = make_service()
+    project = service.get_project("Project 0")
+    category = service.get_category(project, "Category 0")
+
+    service.add_todo(category, "New to-do")
+    service.add_category(project, "New category")
+    service.remove_project(service.get_project("Project 1"))
+    service.undo()
+    after = projects_data(service)
+
+    # What the app does when it closes and launches again
+    storage.save_history(json.loads(json.dumps(service.history.to_dict())))
+    loaded = reload(service)
+    loaded.history.load_dict(storage.load_history())
+
+    assert projects_data(loaded) == after
+
+    loaded.redo()
+    assert [project.project_name for project in loaded.projects] == ["Project 0", "Project 2"]
+
+    loaded.undo()
+    loaded.undo()
+    loaded.undo()
+    loaded_category = loaded.get_category(loaded.get_project("Project 0"), "Category 0")
+    assert [todo.text for todo in loaded_category.todo_items][-1] != "New to-do"
+    assert not loaded.get_project("Project 0").has_category("New category")
+
+    # Redoing the add puts back the same to-do item as before the restart
+    loaded.redo()
+    loaded.redo()
+    assert [todo.text for todo in loaded_category.todo_items][-1] == "New to-do"
+
+
+def test_saved_history_doesnt_grow_with_the_project(data_dir):
+    service = TodoService()
+    project = service.add_project("Project")
+    category = service.add_category(project, "Category")
+
+    for number in range(50):
+        service.add_todo(category, f"To-do {number}")
+
+    # The saved add steps keep the project/category as they were when they were added (still empty)
+    steps = service.history.to_dict()["undo"]
+    add_steps = [step for step in steps if step["label"] in ("add project", "add category")]
+
+    assert len(add_steps) == 2
+    assert "To-do" not in json.dumps(add_steps)
+
+
+def test_saved_history_with_data_from_before_ids(storage_mode):
+    # A data file written before projects, categories and to-do items had ids
+    with open(storage.DATA_FILE, "w") as f:
+        json.dump([
+            {"name": "Project", "categories": [
+                {"name": "Category", "theme_name": "Default", "theme_settings": dict(themes.get_theme("Default")), "todo_items": [{"text": "To-do", "is_checked": False}]}
+            ]}
+        ], f)
+
+    service = TodoService()
+    category = service.get_category(service.get_project("Project"), "Category")
+    service.toggle(category, category.todo_items[0])
+    storage.save_history(service.history.to_dict())
+
+    # After a restart, the ids have to be the same ones the history uses
+    loaded = reload(service)
+    loaded.history.load_dict(storage.load_history())
+
+    assert loaded.undo() is not None
+    loaded_category = loaded.get_category(loaded.get_project("Project"), "Category")
+    assert not loaded_category.todo_items[0].is_checked
+
+
+def test_undo_check_all_only_changes_back_what_it_changed(data_dir):
+    service = make_service()
+    category = service.get_category(service.get_project("Project 0"), "Category 0")
+    checked_before = [todo.is_checked for todo in category.todo_items]
+
+    service.set_all_checked(category, True)
+    assert all(todo.is_checked for todo in category.todo_items)
+
+    service.undo()
+    assert [todo.is_checked for todo in category.todo_items] == checked_before
+    assert category.count_checked() == checked_before.count(True)
+
+
+def test_rename_to_a_taken_name(data_dir):
+    service = make_service()
+    project = service.get_project("Project 0")
+
+    with pytest.raises(ValueError):
+        service.rename_project(project, "Project 1")
+
+    with pytest.raises(ValueError):
+        service.rename_category(project, service.get_category(project, "Category 0"), "Category 1")
+
+    # The old name can be found again after undoing
+    service.rename_project(project, "Renamed")
+    service.undo()
+    assert service.get_project("Project 0") is project
+
+    service.redo()
+    assert service.get_project("Renamed") is project
@@ -0,0 +1,133 @@
+"""The journal: appending changes, replaying them on top of the data file, and compaction."""
+
+import os
+import json
+from todo_app.core import journal
+
+
+
+def test_append_is_on_the_disk(tmp_path, monkeypatch):
+    journal_file = str(tmp_path / "data.journal")
+    synced = []
+
+    original_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: (synced.append(fd), original_fsync(fd)))
+
+    journal.append_changes(journal_file, [{"op": "add_project", "project": {"name": "Project", "categories": []}}])
+
+    assert len(synced) == 1
+    assert journal.read_changes(journal_file) == [{"op": "add_project", "project": {"name": "Project", "categories": []}}]
+
+
+def test_append_nothing(tmp_path):
+    journal_file = str(tmp_path / "data.journal")
+
+    journal.append_changes(journal_file, [])
+
+    assert not os.path.exists(journal_file)
+
+
+SNAPSHOT = [
+    {"name": "Home", "categories": [
+        {"name": "Kitchen", "theme_name": "Default", "theme_settings": {}, "todo_items": [
+            {"text": "Buy milk", "is_checked": False},
+            {"text": "Buy eggs", "is_checked": False}
+        ]}
+    ]}
+]
+
+
+def test_replay():
+    changes = [
+        {"op": "add_project", "project": {"name": "Work", "categories": []}},
+        {"op": "add_todo", "project": "Home", "category": "Kitchen", "todo": {"text": "Clean", "is_checked": False}, "index": 0},
+        {"op": "set_checked", "project": "Home", "category": "Kitchen", "index": 1, "is_checked": True},
+        {"op": "remove_todo", "project": "Home", "category": "Kitchen", "index": 2},
+        {"op": "rename_category", "project": "Home", "category": "Kitchen", "name": "Cooking"},
+        {"op": "rename_project", "project": "Home", "name": "House"},
+        {"op": "add_category", "project": "Work", "category": {"name": "Emails", "todo_items": []}},
+        {"op": "set_all_checked", "project": "House", "category": "Cooking", "is_checked": True},
+        # Changes about things that don't exist (anymore) are skipped
+        {"op": "set_checked", "project": "Nope", "category": "Kitchen", "index": 0, "is_checked": True},
+    ]
+
+    projects_data = journal.replay(json_copy(SNAPSHOT), changes)
+
+    assert [project["name"] for project in projects_data] == ["House", "Work"]
+    assert projects_data[0]["categories"][0]["name"] == "Cooking"
+    assert projects_data[0]["categories"][0]["todo_items"] == [{"text": "Clean", "is_checked": True}, {"text": "Buy milk", "is_checked": True}]
+    assert projects_data[1]["categories"] == [{"name": "Emails", "todo_items": []}]
+
+
+def test_broken_line_is_skipped(tmp_path):
+    journal_file = str(tmp_path / "data.journal")
+    change = {"op": "rename_project", "project": "Home", "name": "House"}
+
+    journal.append_changes(journal_file, [change])
+    with open(journal_file, "a") as f:
+        f.write('{"op": "remove_pro') # (the app crashed mid-write)
+
+    assert journal.read_changes(journal_file) == [change]
+
+
+# A compaction that was interrupted: the journal was moved to ".old", but the new data file was never written
+def test_interrupted_compaction_is_replayed(tmp_path):
+    data_file = str(tmp_path / "data.json")
+    journal_file = str(tmp_path / "data.journal")
+    old_change = {"op": "rename_project", "project": "Home", "name": "House"}
+    new_change = {"op": "add_project", "project": {"name": "Work", "categories": []}}
+
+    write_json(data_file, SNAPSHOT)
+    journal.append_changes(journal_file + ".old", [old_change])
+    journal.append_changes(journal_file, [new_change])
+    make_older(data_file, journal_file + ".old")
+
+    assert journal.load_changes(journal_file, data_file) == [old_change, new_change]
+    assert os.path.exists(journal_file + ".old")
+
+
+# The new data file was written, only removing ".old" was missed: its changes are already in the data file
+def test_finished_compaction_removes_old_journal(tmp_path):
+    data_file = str(tmp_path / "data.json")
+    journal_file = str(tmp_path / "data.journal")
+
+    journal.append_changes(journal_file + ".old", [{"op": "rename_project", "project": "Home", "name": "House"}])
+    write_json(data_file, SNAPSHOT)
+    make_older(journal_file + ".old", data_file)
+
+    assert journal.load_changes(journal_file, data_file) == []
+    assert not os.path.exists(journal_file + ".old")
+
+
+def test_compaction_after_an_interrupted_one(tmp_path):
+    data_file = str(tmp_path / "data.json")
+    journal_file = str(tmp_path / "data.journal")
+    old_change = {"op": "rename_project", "project": "Home", "name": "House"}
+    new_change = {"op": "add_project", "project": {"name": "Work", "categories": []}}
+
+    journal.append_changes(journal_file + ".old", [old_change])
+    journal.append_changes(journal_file, [new_change])
+    written = []
+
+    # The journal is added to the end of the old one, and only removed once the snapshot is written
+    journal.compact(journal_file, "snapshot text", written.append)
+    journal.compaction_thread.join()
+
+    assert written == ["snapshot text"]
+    assert not os.path.exists(journal_file)
+    assert not os.path.exists(journal_file + ".old")
+
+
+def json_copy(value):
+    return json.loads(json.dumps(value))
+
+
+def write_json(path, value):
+    with open(path, "w") as f:
+        json.dump(value, f)
+
+
+# Makes the first file's last change time a minute older than the second one's
+def make_older(older_path, newer_path):
+    newer_time = os.path.getmtime(newer_path)
+    os.utime(older_path, (newer_time - 60, newer_time - 60))
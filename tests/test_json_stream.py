@@ -0,0 +1,84 @@
+"""Reading a json list one item at a time (and reading an item again from its position), also with damaged files."""
+
+import json
+import pytest
+from todo_app.core import json_stream
+
+
+
+ITEMS = [
+    {"name": "First", "categories": []},
+    {"name": "Ünïcode ✓", "categories": [{"name": "Kitchen", "todo_items": [{"text": "Buy milk 🥛", "is_checked": True}]}]},
+    {"name": "Last", "text": "a" * 5000},
+]
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(ITEMS, indent=4), encoding="utf-8")
+    return str(path)
+
+
+# A small chunk size, so items (and characters that take more than one byte) are split between chunks
+@pytest.mark.parametrize("chunk_size", [7, json_stream.CHUNK_SIZE])
+def test_iter_list(data_file, chunk_size):
+    items = list(json_stream.iter_list(data_file, chunk_size))
+
+    assert [item for item, start, end in items] == ITEMS
+
+    # The positions are where the items are in the file (in bytes)
+    for item, start, end in items:
+        assert json_stream.read_item(data_file, start, end) == item
+
+
+def test_empty_list(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("  [ ]\n")
+
+    assert list(json_stream.iter_list(str(path))) == []
+
+
+def test_not_a_list(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text('{"name": "Not a list"}')
+
+    with pytest.raises(ValueError):
+        list(json_stream.iter_list(str(path)))
+
+
+def test_damaged_in_the_middle(data_file):
+    with open(data_file, "r", encoding="utf-8") as f:
+        text = f.read()
+    with open(data_file, "w", encoding="utf-8") as f:
+        f.write(text.replace('"Last"', '"Last" @'))
+
+    # Still ends like a list, so the damage is only noticed once reading gets there (after the first items were handed over)
+    assert json_stream.ends_like_list(data_file)
+
+    read = []
+    with pytest.raises(ValueError):
+        for item, start, end in json_stream.iter_list(data_file, 16):
+            read.append(item)
+
+    assert read == ITEMS[:2]
+
+
+def test_missing_comma(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text('[{"name": "First"} {"name": "Second"}]')
+
+    with pytest.raises(ValueError):
+        list(json_stream.iter_list(str(path)))
+
+
+def test_cut_off(data_file):
+    with open(data_file, "rb") as f:
+        content = f.read()
+    with open(data_file, "wb") as f:
+        f.write(content[:len(content) // 2])
+
+    assert not json_stream.ends_like_list(data_file)
+
+    with pytest.raises(ValueError):
+        list(json_stream.iter_list(data_file, 16))
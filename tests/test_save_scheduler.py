@@ -0,0 +1,76 @@
+"""A save that fails keeps its changes, so the next save writes them (in the storage modes that save change by change)."""
+
+import pytest
+from todo_app.core import data
+from todo_app.core import storage
+from todo_app.core import journal
+from todo_app.core.save_scheduler import SaveScheduler
+from todo_app.core.service import TodoService
+from test_storage import make_service, projects_data, reload
+
+
+
+# Stands in for the window, which runs the "after" functions (they're never run here, the tests call flush instead)
+class FakeMaster():
+    def after(self, delay_ms, function):
+        return "after#1"
+
+    def after_cancel(self, after_id):
+        pass
+
+
+
+# Makes the next write fail, like a full disk would
+def fail_once(storage_mode, monkeypatch):
+    if storage_mode == "journal":
+        target, name = journal, "append_changes"
+    else:
+        target, name = storage.get_backend(), "apply_change"
+
+    original = getattr(target, name)
+
+    def failing(*args):
+        monkeypatch.setattr(target, name, original)
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(target, name, failing)
+
+
+@pytest.mark.parametrize("storage_mode", ["journal", "sqlite"], indirect=True)
+def test_failed_save_is_written_by_the_next_one(storage_mode, monkeypatch):
+    service = reload(make_service())
+    errors = []
+    scheduler = SaveScheduler(FakeMaster(), lambda: service.projects, delay_ms=0, on_error=errors.append)
+
+    category = service.get_category(service.get_project("Project 0"), "Category 0")
+    service.add_todo(category, "First")
+
+    fail_once(storage_mode, monkeypatch)
+    scheduler.request_save()
+
+    assert len(errors) == 1
+    # The changes are waiting for the next save again
+    assert len(data.pending_changes) == 1
+
+    # The next change saves both
+    service.add_todo(category, "Second")
+    scheduler.request_save()
+
+    assert len(errors) == 1
+    assert projects_data(reload(service)) == projects_data(service)
+
+
+@pytest.mark.parametrize("storage_mode", ["journal", "sqlite"], indirect=True)
+def test_flush_tells_if_saving_failed(storage_mode, monkeypatch):
+    service = reload(make_service())
+    scheduler = SaveScheduler(FakeMaster(), lambda: service.projects, delay_ms=60_000, on_error=lambda error: None)
+
+    service.add_project("New project")
+    scheduler.request_save()
+    fail_once(storage_mode, monkeypatch)
+    assert scheduler.flush() is False
+
+    # Trying again (like closing the app a second time) saves it
+    scheduler.request_save()
+    assert scheduler.flush() is True
+    assert "New project" in [project.project_name for project in reload(service).projects]
@@ -0,0 +1,93 @@
+"""The search index finds words (and the start of words), and stays up to date when things are added, removed or renamed."""
+
+import pytest
+from todo_app.core import search
+from todo_app.core.service import TodoService
+from test_storage import reload
+
+
+
+@pytest.fixture
+def service(data_dir, monkeypatch):
+    # A new, empty index for every test
+    monkeypatch.setattr(search, "index", search.SearchIndex())
+
+    service = TodoService()
+    home = service.add_project("Home")
+    kitchen = service.add_category(home, "Kitchen")
+    service.add_todo(kitchen, "Buy milk")
+    service.add_todo(kitchen, "Buy eggs and milk")
+    service.add_todo(kitchen, "Clean the fridge")
+
+    work = service.add_project("Work")
+    service.add_category(work, "Milestones")
+
+    search.index.build(service.projects)
+    return service
+
+
+# The texts of everything that matches, the projects/categories first
+def found(query):
+    return [result.text for result in search.index.search(query)]
+
+
+def test_whole_and_start_of_words(service):
+    assert found("fridge") == ["Clean the fridge"]
+    assert found("fri") == ["Clean the fridge"]
+    assert found("CLEAN") == ["Clean the fridge"]
+    assert found("nothing") == []
+
+
+def test_every_word_has_to_match(service):
+    assert sorted(found("buy milk")) == ["Buy eggs and milk", "Buy milk"]
+    assert found("mil egg") == ["Buy eggs and milk"]
+    assert found("milk fridge") == []
+
+
+def test_names_come_first(service):
+    results = found("mil")
+
+    # (the to-do items themselves come in no particular order)
+    assert results[0] == "Milestones"
+    assert sorted(results[1:]) == ["Buy eggs and milk", "Buy milk"]
+
+
+def test_result_limit(service):
+    assert len(search.index.search("buy", limit=1)) == 1
+
+
+def test_kept_up_to_date(service):
+    home = service.get_project("Home")
+    kitchen = service.get_category(home, "Kitchen")
+
+    todo = service.add_todo(kitchen, "Water the plants")
+    assert found("plants") == ["Water the plants"]
+
+    service.remove_todo(kitchen, todo)
+    assert found("plants") == []
+
+    service.rename_project(home, "House")
+    assert found("house") == ["House"]
+    assert found("home") == []
+
+    service.rename_category(home, kitchen, "Cooking")
+    assert found("cook") == ["Cooking"]
+    assert found("kitchen") == []
+
+    service.remove_category(home, kitchen)
+    assert found("milk") == []
+
+    # Undo puts them back in the index too
+    service.undo()
+    assert sorted(found("milk")) == ["Buy eggs and milk", "Buy milk"]
+
+    service.remove_project(service.get_project("Work"))
+    assert found("milestones") == []
+
+
+def test_unopened_projects_stay_unopened(service):
+    loaded = reload(service)
+    search.index.build(loaded.projects)
+
+    assert found("fridge") == ["Clean the fridge"]
+    assert not any(project.is_loaded() for project in loaded.projects)
@@ -0,0 +1,153 @@
+"""Saving and loading again gives back the same projects, in every storage mode."""
+
+import pytest
+from todo_app.core import storage
+from todo_app.core import binary_format
+from todo_app.core.service import TodoService
+from conftest import close_backend
+
+
+
+# A few projects with categories, to-do items (some done) and a custom theme
+def make_service():
+    service = TodoService()
+
+    for project_number in range(3):
+        project = service.add_project(f"Project {project_number}")
+
+        for category_number in range(2):
+            category = service.add_category(project, f"Category {category_number}", theme_name="Default")
+
+            for todo_number in range(4):
+                todo = service.add_todo(category, f"To-do {todo_number} (ünïcode)")
+                service.set_checked(category, todo, todo_number % 2 == 0)
+
+    return service
+
+
+# Everything about the projects (loading each one if it's only a stub)
+def projects_data(service):
+    return [project.to_dict() for project in service.projects]
+
+
+# Save, "close the app" and load everything again
+def reload(service):
+    service.save()
+    close_backend()
+    return TodoService()
+
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_save_and_reload(storage_mode, monkeypatch, lazy):
+    monkeypatch.setattr(storage, "LAZY_LOADING", lazy)
+    service = make_service()
+
+    loaded = reload(service)
+
+    assert projects_data(loaded) == projects_data(service)
+
+
+def test_counts_without_opening(storage_mode):
+    service = make_service()
+
+    loaded = reload(service)
+
+    for project in loaded.projects:
+        assert (project.todos_total, project.todos_done) == (8, 4)
+
+
+def test_save_after_changes(storage_mode):
+    loaded = reload(make_service())
+
+    # Change one project, leave the others unopened (they're copied as they are) and remove one
+    project = loaded.get_project("Project 1")
+    category = loaded.get_category(project, "Category 0")
+    loaded.add_todo(category, "New to-do")
+    loaded.toggle(category, category.todo_items[0])
+    loaded.set_theme(category, "Default")
+    loaded.set_all_checked(loaded.get_category(project, "Category 1"), True)
+    loaded.rename_category(project, category, "Renamed category")
+    loaded.remove_project(loaded.get_project("Project 2"))
+    loaded.add_project("Project 3")
+
+    # A project that was never opened can be renamed too
+    loaded.rename_project(loaded.get_project("Project 0"), "Renamed project")
+
+    reloaded = reload(loaded)
+
+    assert [project.project_name for project in reloaded.projects] == ["Renamed project", "Project 1", "Project 3"]
+    assert projects_data(reloaded) == projects_data(loaded)
+
+
+def test_save_twice_without_opening(storage_mode):
+    service = make_service()
+    expected = projects_data(service)
+    loaded = reload(service)
+
+    loaded.add_project("Project 3")
+    loaded.save()
+
+    # The second save copies the projects that were never opened from the file the first save wrote
+    loaded.add_project("Project 4")
+    reloaded = reload(loaded)
+
+    assert projects_data(reloaded)[:3] == expected
+    assert [project.project_name for project in reloaded.projects][3:] == ["Project 3", "Project 4"]
+
+
+def test_export_and_import(storage_mode, tmp_path):
+    service = make_service()
+    export_file = str(tmp_path / "export.json")
+    service.export_json(export_file)
+
+    empty = reload(TodoService())
+    empty.import_json(export_file)
+    reloaded = reload(empty)
+
+    assert strip_ids(projects_data(reloaded)) == strip_ids(projects_data(service))
+
+
+# Imported projects keep their ids, but compare without them in case a storage mode makes new ones
+def strip_ids(projects_data):
+    return [{key: value for key, value in project_data.items() if key != "id"} for project_data in projects_data]
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_damaged_in_the_middle(data_dir, monkeypatch, lazy):
+    monkeypatch.setattr(storage, "LAZY_LOADING", lazy)
+    service = make_service()
+    expected = projects_data(service)
+
+    # Saved twice, so the backup (data.json.1) has everything too
+    service.save()
+    service.save()
+    close_backend()
+
+    # Damage the second project, the file still ends like a list so it's read one project at a time until it gets there
+    with open(storage.DATA_FILE, "r") as f:
+        text = f.read()
+    with open(storage.DATA_FILE, "w") as f:
+        f.write(text.replace('"name": "Project 1"', '"name": "Project 1" @', 1))
+
+    loaded = TodoService()
+
+    assert projects_data(loaded) == expected
+
+
+def test_binary_index_decodes_one_project_at_a_time(data_dir, monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_MODE", "binary")
+    service = make_service()
+    expected = projects_data(service)
+    loaded = reload(service)
+
+    # Reading the whole file at once isn't needed, neither for the index nor for opening a project or saving
+    monkeypatch.setattr(binary_format, "decode", None)
+
+    assert not any(project.is_loaded() for project in loaded.projects)
+    assert loaded.get_project("Project 1").to_dict() == expected[1]
+
+    loaded.add_project("Project 3")
+    reloaded = reload(loaded)
+
+    assert projects_data(reloaded)[:3] == expected
@@ -0,0 +1,115 @@
+"""TodoArray works like a list of to-do items, and finds items by id even after items were added/removed in the middle."""
+
+import random
+import pytest
+from todo_app.core import data
+
+
+
+def make_array(count):
+    return data.TodoArray([{"id": f"id{number}", "text": f"To-do {number}", "is_checked": number % 3 == 0} for number in range(count)])
+
+
+def test_like_a_list():
+    array = make_array(5)
+
+    assert len(array) == 5
+    assert [todo.text for todo in array] == [f"To-do {number}" for number in range(5)]
+    assert array[-1].id == "id4"
+    assert [todo.id for todo in array[1:3]] == ["id1", "id2"]
+    assert array.count_checked() == 2
+    assert array.to_dicts()[3] == {"id": "id3", "text": "To-do 3", "is_checked": True}
+
+
+def test_index_and_get():
+    array = make_array(5)
+
+    assert array.index(array[3]) == 3
+    assert array.index(data.Todo(text="Same id", id="id2")) == 2
+    assert array.get("id4").text == "To-do 4"
+    assert array.get("missing") is None
+
+    with pytest.raises(ValueError):
+        array.index(data.Todo(text="Not in the list"))
+
+
+def test_insert_and_delete():
+    array = make_array(5)
+    ref = array[4]
+
+    array.insert(1, data.Todo(text="New", id="new"))
+    assert [todo.id for todo in array] == ["id0", "new", "id1", "id2", "id3", "id4"]
+
+    # A reference taken before finds its item at its new position
+    assert ref.text == "To-do 4"
+    assert array.index(ref) == 5
+
+    del array[0]
+    del array[-1]
+    assert [todo.id for todo in array] == ["new", "id1", "id2", "id3"]
+    assert array.get("id0") is None
+    assert array.get("id4") is None
+
+    # A position past the end adds at the end, a negative one counts from the end (like list.insert)
+    array.insert(100, data.Todo(text="Last", id="last"))
+    array.insert(-1, data.Todo(text="Second to last", id="second"))
+    assert [todo.id for todo in array][-2:] == ["second", "last"]
+
+
+def test_positions_are_repaired():
+    array = make_array(10)
+
+    # Removing/adding in the middle only marks the positions after it as maybe wrong
+    del array[2]
+    array.insert(5, data.Todo(text="New", id="new"))
+    assert array.correct_until == 2
+
+    # The first lookup after that point fixes all of them at once
+    assert array.position_of("id9") == 9
+    assert array.correct_until == len(array)
+    assert all(array.positions[todo_id] == position for position, todo_id in enumerate(array.ids))
+
+    # Positions before the change didn't need fixing
+    del array[7]
+    assert array.position_of("id1") == 1
+    assert array.correct_until == 7
+
+
+def test_same_as_a_list():
+    random_generator = random.Random(1)
+    array = make_array(50)
+    items = [data.Todo(**todo_data) for todo_data in array.to_dicts()]
+
+    # The same random changes to a TodoArray and a plain list, then every item is looked up by its id
+    for number in range(500):
+        choice = random_generator.random()
+
+        if choice < 0.4 and items:
+            index = random_generator.randrange(-len(items), len(items))
+            del array[index]
+            del items[index]
+        elif choice < 0.8:
+            index = random_generator.randrange(-len(items) - 1, len(items) + 2)
+            todo = data.Todo(text=f"New {number}", id=f"new{number}")
+            array.insert(index, todo)
+            items.insert(index, todo)
+        else:
+            todo = data.Todo(text=f"Appended {number}", id=f"appended{number}")
+            array.append(todo)
+            items.append(todo)
+
+        if number % 10 == 0:
+            assert array.ids == [todo.id for todo in items]
+
+            for position, todo in enumerate(items):
+                assert array.position_of(todo.id) == position
+
+
+def test_set_all_checked():
+    array = make_array(6)
+
+    array.set_all_checked(True)
+    assert array.count_checked() == 6
+
+    array.set_all_checked(False)
+    assert not any(todo.is_checked for todo in array)